@@ -14,12 +14,84 @@ class Behaviors(str, Enum):
     EXPECT_COLUMN_VALUES_TO_BE_IN_SET = "expect_column_values_to_be_in_set"
     EXPECT_COLUMN_VALUES_TO_MATCH_REGEX = "expect_column_values_to_match_regex"
     EXPECT_COLUMN_VALUES_TO_MATCH_LIKE = "expect_column_values_to_match_like"
+    EXPECT_COLUMN_VALUES_TO_MATCH_ANY_LIKE = "expect_column_values_to_match_any_like"
+    EXPECT_COLUMN_VALUES_TO_MATCH_ANY_REGEX = "expect_column_values_to_match_any_regex"
     EXPECT_COLUMN_VALUES_LENGTH_TO_BE = "expect_column_values_length_to_be"
     EXPECT_COLUMN_VALUES_LENGTH_TO_BE_BETWEEN = "expect_column_values_length_to_be_between"
+    EXPECT_COLUMN_VALUES_TO_BE_LESS_THAN_COLUMN = "expect_column_values_to_be_less_than_column"
+    EXPECT_COLUMN_VALUES_TO_SUM_TO = "expect_column_values_to_sum_to"
+    EXPECT_COLUMN_NULLITY_TO_MATCH_COLUMN = "expect_column_nullity_to_match_column"
+    EXPECT_EXPRESSION_TO_BE_TRUE = "expect_expression_to_be_true"
+    EXPECT_COLUMN_MEAN_TO_BE_BETWEEN = "expect_column_mean_to_be_between"
+    EXPECT_COLUMN_STDEV_TO_BE_BETWEEN = "expect_column_stdev_to_be_between"
+    EXPECT_COLUMN_MIN_TO_BE_BETWEEN = "expect_column_min_to_be_between"
+    EXPECT_COLUMN_MAX_TO_BE_BETWEEN = "expect_column_max_to_be_between"
+    EXPECT_COLUMN_NULL_RATIO_TO_BE_LESS_THAN = "expect_column_null_ratio_to_be_less_than"
+    EXPECT_COLUMN_DISTINCT_COUNT_TO_BE_BETWEEN = "expect_column_distinct_count_to_be_between"
+    EXPECT_COLUMN_QUANTILE_TO_BE_BETWEEN = "expect_column_quantile_to_be_between"
+    EXPECT_COLUMN_VALUES_TO_BE_UNIQUE = "expect_column_values_to_be_unique"
+    EXPECT_COLUMN_NULL_RATIO_IN_WINDOW_TO_BE_LESS_THAN = "expect_column_null_ratio_in_window_to_be_less_than"
+    EXPECT_COLUMN_MEAN_IN_WINDOW_TO_BE_BETWEEN = "expect_column_mean_in_window_to_be_between"
+    EXPECT_COLUMN_GAPS_TO_BE_AT_MOST = "expect_column_gaps_to_be_at_most"
+    EXPECT_COLUMN_VALUES_TO_BE_UNIQUE_WITHIN_WINDOW = "expect_column_values_to_be_unique_within_window"
 
 
 from data_expectations.internals.expectations import Expectations
+from data_expectations.internals.registry import register_expectation
+from data_expectations.internals.registry import register_lazily
 from data_expectations.internals.models import Expectation
+from data_expectations.internals.models import Violation
 
+from data_expectations.internals.evaluate import evaluate_aggregates
 from data_expectations.internals.evaluate import evaluate_list
+from data_expectations.internals.evaluate import evaluate_list_mask
 from data_expectations.internals.evaluate import evaluate_record
+from data_expectations.internals.evaluate import find_violations
+
+# the aggregate and windowed expectations are registered when one is first used
+register_lazily(
+    "data_expectations.internals.aggregates",
+    (
+        Behaviors.EXPECT_COLUMN_MEAN_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_STDEV_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_MIN_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_MAX_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_NULL_RATIO_TO_BE_LESS_THAN,
+        Behaviors.EXPECT_COLUMN_DISTINCT_COUNT_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_QUANTILE_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_VALUES_TO_BE_UNIQUE,
+    ),
+)
+register_lazily(
+    "data_expectations.internals.windows",
+    (
+        Behaviors.EXPECT_COLUMN_NULL_RATIO_IN_WINDOW_TO_BE_LESS_THAN,
+        Behaviors.EXPECT_COLUMN_MEAN_IN_WINDOW_TO_BE_BETWEEN,
+        Behaviors.EXPECT_COLUMN_GAPS_TO_BE_AT_MOST,
+        Behaviors.EXPECT_COLUMN_VALUES_TO_BE_UNIQUE_WITHIN_WINDOW,
+    ),
+)
+
+# less often used parts of the package, imported when they are first used
+_LAZY = {
+    "FailureBudget": "data_expectations.internals.budget",
+    "evaluate_dataframe": "data_expectations.internals.dataframes",
+    "PartialResult": "data_expectations.internals.partial",
+    "evaluate_shard": "data_expectations.internals.partial",
+    "MetricsCollector": "data_expectations.internals.metrics",
+    "disable_metrics": "data_expectations.internals.metrics",
+    "enable_metrics": "data_expectations.internals.metrics",
+    "QuarantineSink": "data_expectations.internals.quarantine",
+    "ColumnStatistics": "data_expectations.internals.proofs",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'data_expectations' has no attribute '{name}'")
+    from importlib import import_module
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
@@ -15,6 +15,20 @@ from typing import Dict
 from typing import Optional
 
 
+def format_failure(expectation: str, record: Any, details: Optional[str] = None) -> str:
+    """Format the message describing a record which didn't meet an expectation."""
+    base_message = f"Record didn't meet expectation '{expectation}'"
+    if details:
+        base_message += f": {details}"
+
+    # Truncate very long records for readability
+    record_str = str(record)
+    if len(record_str) > 200:
+        record_str = record_str[:200] + "..."
+
+    return f"{base_message}\nRecord: {record_str}"
+
+
 class ExpectationNotMetError(Exception):
     """Raised when an expectation has failed to be met."""
 
@@ -22,18 +36,12 @@ class ExpectationNotMetError(Exception):
         self.expectation = expectation
         self.record = record
         self.details = details
+        # the message is only formatted if it is asked for, formatting the record is
+        # expensive and is wasted when the error is caught and discarded
+        super().__init__(expectation)
 
-        base_message = f"Record didn't meet expectation '{expectation}'"
-        if details:
-            base_message += f": {details}"
-
-        # Truncate very long records for readability
-        record_str = str(record)
-        if len(record_str) > 200:
-            record_str = record_str[:200] + "..."
-
-        message = f"{base_message}\nRecord: {record_str}"
-        super().__init__(message)
+    def __str__(self) -> str:
+        return format_failure(self.expectation, self.record, self.details)
 
 
 class ExpectationNotUnderstoodError(Exception):
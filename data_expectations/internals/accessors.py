@@ -0,0 +1,292 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Column accessors.
+
+The column of an expectation is usually a flat key in the record, but it can also be
+a path into a nested document, either dotted (`payload.user.id`, `items[0].sku`) or
+a JSON pointer (`/payload/user/id`). Paths are parsed once, when a plan is compiled,
+into accessor callables which fetch the value from the record in place - there is no
+need to flatten nested records before they are evaluated.
+
+Missing levels anywhere along the path are treated as null.
+
+Records don't have to be dictionaries, accessors are built for the layout of the
+record - namedtuples and tuples with a schema are read by position, dataclasses
+and other objects (including those with `__slots__`) are read by attribute - so
+records can be evaluated without first being converted to dictionaries.
+"""
+import re
+from collections.abc import Mapping
+from dataclasses import fields as dataclass_fields
+from dataclasses import is_dataclass
+from operator import attrgetter
+from operator import itemgetter
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+PathStep = Union[str, int]
+Accessor = Callable[[Any], Any]
+
+_PATH_PART = re.compile(r"([^\[\]]*)((?:\[\d+\])*)")
+_INDEX = re.compile(r"\[(\d+)\]")
+
+
+class _Missing:
+    """Marker for a value which isn't in the record at all, as distinct from a null."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+MAPPING = "mapping"
+ATTRIBUTE = "attribute"
+SEQUENCE = "sequence"
+
+
+class RecordLayout:
+    """
+    How columns are read from records of a given type.
+
+    Mapping records are read by key, attribute records by attribute name (`fields`
+    holding the attributes which are always set) and sequence records by position
+    (`positions` mapping column names to indices, `fixed` when every record has all
+    of the positions, as namedtuples do).
+    """
+
+    __slots__ = ("kind", "fields", "positions", "fixed")
+
+    def __init__(
+        self,
+        kind: str,
+        fields: FrozenSet[str] = frozenset(),
+        positions: Optional[Dict[str, int]] = None,
+        fixed: bool = False,
+    ):
+        self.kind = kind
+        self.fields = fields
+        self.positions = positions or {}
+        self.fixed = fixed
+
+
+MAPPING_LAYOUT = RecordLayout(MAPPING)
+
+
+def record_layout(record_type: type, schema: Optional[Sequence[str]] = None) -> RecordLayout:
+    """
+    Work out how to read columns from records of a type.
+
+    Parameters:
+        record_type: type
+            The type of the records.
+        schema: Sequence[str] (optional)
+            The column names, in order, for tuple or list records.
+
+    Returns: RecordLayout
+
+    Raises:
+        TypeError: If records of this type can't be evaluated.
+    """
+    if issubclass(record_type, Mapping):
+        return MAPPING_LAYOUT
+    if schema is not None and issubclass(record_type, (tuple, list)):
+        return RecordLayout(SEQUENCE, positions={column: i for i, column in enumerate(schema)})
+    if issubclass(record_type, tuple) and hasattr(record_type, "_fields"):
+        # namedtuples, reading by position is quicker than going through the properties
+        positions = {column: i for i, column in enumerate(record_type._fields)}
+        return RecordLayout(SEQUENCE, positions=positions, fixed=True)
+    if is_dataclass(record_type):
+        return RecordLayout(ATTRIBUTE, fields=frozenset(f.name for f in dataclass_fields(record_type) if f.init))
+    if hasattr(record_type, "__slots__") or getattr(record_type, "__dictoffset__", 0):
+        return RecordLayout(ATTRIBUTE)
+    raise TypeError(
+        f"Record must be a dictionary, namedtuple, dataclass or object, or a tuple with a schema, got {record_type}"
+    )
+
+
+class RecordView:
+    """
+    A read-only, dictionary-like view of a record which isn't a dictionary.
+
+    Only used for expectations which are called with the whole record.
+    """
+
+    __slots__ = ("record", "layout")
+
+    def __init__(self, record: Any, layout: RecordLayout):
+        self.record = record
+        self.layout = layout
+
+    def get(self, column: str, default: Any = None) -> Any:
+        if self.layout.kind == SEQUENCE:
+            index = self.layout.positions.get(column)
+            if index is None or index >= len(self.record):
+                return default
+            return self.record[index]
+        return getattr(self.record, column, default)
+
+    def __getitem__(self, column: str) -> Any:
+        value = self.get(column, MISSING)
+        if value is MISSING:
+            raise KeyError(column)
+        return value
+
+    def __contains__(self, column: str) -> bool:
+        return self.get(column, MISSING) is not MISSING
+
+
+def is_path(column: str) -> bool:
+    """Is the column a nested path rather than a flat key."""
+    return column.startswith("/") or "." in column or "[" in column
+
+
+def parse_column_path(column: str) -> Tuple[PathStep, ...]:
+    """
+    Parse a column reference into the steps needed to reach its value.
+
+    Parameters:
+        column: str
+            A flat key, a dotted path (`a.b[0].c`) or a JSON pointer (`/a/b/0/c`).
+
+    Returns: tuple
+        The keys (str) and list indices (int) to follow, in order.
+
+    Raises:
+        ValueError: If the path is malformed.
+    """
+    if column.startswith("/"):
+        tokens = [token.replace("~1", "/").replace("~0", "~") for token in column[1:].split("/")]
+        return tuple(int(token) if token.isdigit() else token for token in tokens)
+
+    if not is_path(column):
+        return (column,)
+
+    steps: list = []
+    for part in column.split("."):
+        match = _PATH_PART.fullmatch(part)
+        if match is None or not (match.group(1) or match.group(2)):
+            raise ValueError(f"Invalid column path: '{column}'")
+        if match.group(1):
+            steps.append(match.group(1))
+        steps.extend(int(index) for index in _INDEX.findall(match.group(2)))
+    return tuple(steps)
+
+
+def _step(container: Any, key: PathStep) -> Any:
+    if isinstance(container, Mapping):
+        value = container.get(key, MISSING)
+        if value is MISSING and isinstance(key, int):
+            value = container.get(str(key), MISSING)
+        return value
+    if isinstance(key, int):
+        if isinstance(container, (list, tuple)):
+            try:
+                return container[key]
+            except IndexError:
+                return MISSING
+        return MISSING
+    if container is None or isinstance(container, (str, bytes, int, float)):
+        return MISSING
+    return getattr(container, key, MISSING)
+
+
+def _top_level(key: PathStep, default: Any, layout: RecordLayout) -> Accessor:
+    """Read the first level of a path from the record itself."""
+    if layout.kind == SEQUENCE:
+        index = layout.positions.get(key)  # type:ignore
+        if index is None:
+            return lambda record: default
+        getter = itemgetter(index)
+        if layout.fixed:
+            return getter
+
+        def positional_accessor(record):
+            # tuples shorter than the schema are missing their trailing columns
+            if len(record) > index:
+                return getter(record)
+            return default
+
+        return positional_accessor
+
+    if layout.kind == ATTRIBUTE:
+        if key in layout.fields:
+            return attrgetter(key)  # type:ignore
+
+        def attribute_accessor(record):
+            return getattr(record, key, default)  # type:ignore
+
+        return attribute_accessor
+
+    def mapping_accessor(record):
+        return record.get(key, default)
+
+    return mapping_accessor
+
+
+def compile_accessor(column: str, default: Any = None, layout: RecordLayout = MAPPING_LAYOUT) -> Accessor:
+    """
+    Build a callable which fetches the value of a column from a record.
+
+    Parameters:
+        column: str
+            The column reference, see `parse_column_path`.
+        default:
+            The value returned when the column, or any level above it, is missing.
+        layout: RecordLayout
+            How the record is read, records are read as mappings by default.
+
+    Returns: callable
+        A function taking the record and returning the value.
+    """
+    path = parse_column_path(column)
+
+    if len(path) == 1 and path[0] == column:
+        return _top_level(column, default, layout)
+
+    first = _top_level(path[0], MISSING, layout)
+    rest = path[1:]
+    literal = layout.kind == MAPPING
+
+    def nested_accessor(record):
+        # a key which literally contains the path wins, so records which were
+        # flattened before nested paths were supported still evaluate the same
+        if literal:
+            value = record.get(column, MISSING)
+            if value is not MISSING:
+                return value
+        value = first(record)
+        for key in rest:
+            if value is MISSING:
+                return default
+            value = _step(value, key)
+        if value is MISSING:
+            return default
+        return value
+
+    return nested_accessor
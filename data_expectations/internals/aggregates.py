@@ -0,0 +1,190 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Aggregate expectations.
+
+These are expectations of a whole dataset rather than of each record, such as the
+mean of a column. They are computed in a single pass with bounded memory, each
+record updates a mergeable sketch (see `sketches`) and never fails on its own, the
+expectation is tested against the sketch once the records have been seen, by
+`evaluate_aggregates` (`evaluate_list` does this when it reaches the end of the
+list).
+
+- expect_column_mean_to_be_between (column, minimum, maximum)
+- expect_column_stdev_to_be_between (column, minimum, maximum)
+- expect_column_min_to_be_between (column, minimum, maximum)
+- expect_column_max_to_be_between (column, minimum, maximum)
+- expect_column_null_ratio_to_be_less_than (column, threshold)
+- expect_column_distinct_count_to_be_between (column, minimum, maximum, precision:12)
+- expect_column_quantile_to_be_between (column, quantile, minimum, maximum, k:200)
+- expect_column_values_to_be_unique (column, mode:exact, max_keys_in_memory:1000000,
+  partitions:16, spill_directory:None, capacity:10000000, false_positive_rate:0.001)
+
+Uniqueness is the exception to records never failing on their own, a record fails
+when its value is known to be a repeat as it is seen. The `exact` mode spills to
+disk beyond `max_keys_in_memory` values, repeats of spilled values are only found
+when the expectation is tested at the end, the `approximate` mode uses a Bloom
+filter sized for `capacity` values, in fixed memory, and finds every repeat as it
+is seen but wrongly fails unique values at about the `false_positive_rate` (see
+`uniqueness`).
+
+Sketches are held in the GLOBAL_TRACKER, like the state of the other stateful
+expectations, so they accumulate across calls until `Expectations.reset` is called.
+Where a statistic can't be calculated, such as the mean of a column with no values,
+the expectation is met when nulls are ignored.
+"""
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from data_expectations.internals import expectations as expectations_module
+from data_expectations.internals.registry import register_expectation
+from data_expectations.internals.sketches import KLL
+from data_expectations.internals.sketches import Extremes
+from data_expectations.internals.sketches import HyperLogLog
+from data_expectations.internals.sketches import Moments
+from data_expectations.internals.sketches import NullCounter
+from data_expectations.internals.uniqueness import Uniqueness
+
+
+class Aggregate:
+    """How an aggregate expectation builds its sketch, reads its statistic and tests it."""
+
+    __slots__ = ("sketch", "statistic", "check")
+
+    def __init__(self, sketch: Callable[..., Any], statistic: Callable[..., Any], check: Callable[..., bool]):
+        self.sketch = sketch
+        self.statistic = statistic
+        self.check = check
+
+
+def between(statistic, *, minimum, maximum, **kwargs) -> bool:
+    """Whether a statistic is between the minimum and maximum, inclusive."""
+    return minimum <= statistic <= maximum
+
+
+def less_than(statistic, *, threshold, **kwargs) -> bool:
+    """Whether a statistic is less than the threshold."""
+    return statistic < threshold
+
+
+def _moments(**kwargs):
+    return Moments()
+
+
+def _extremes(**kwargs):
+    return Extremes()
+
+
+def _nulls(**kwargs):
+    return NullCounter()
+
+
+def _hyperloglog(*, precision: int = 12, **kwargs):
+    return HyperLogLog(precision)
+
+
+def _kll(*, k: int = 200, **kwargs):
+    return KLL(k)
+
+
+def _none(value, **kwargs) -> bool:
+    return value == 0
+
+
+# fmt:off
+AGGREGATES: Dict[str, Aggregate] = {
+    "expect_column_mean_to_be_between": Aggregate(_moments, lambda s, **kw: s.mean if s.count else None, between),
+    "expect_column_stdev_to_be_between": Aggregate(_moments, lambda s, **kw: s.stdev, between),
+    "expect_column_min_to_be_between": Aggregate(_extremes, lambda s, **kw: s.minimum, between),
+    "expect_column_max_to_be_between": Aggregate(_extremes, lambda s, **kw: s.maximum, between),
+    "expect_column_null_ratio_to_be_less_than": Aggregate(_nulls, lambda s, **kw: s.ratio, less_than),
+    "expect_column_distinct_count_to_be_between": Aggregate(_hyperloglog, lambda s, **kw: s.estimate if any(s.registers) else None, between),
+    "expect_column_quantile_to_be_between": Aggregate(_kll, lambda s, *, quantile, **kw: s.quantile(quantile), between),
+    "expect_column_values_to_be_unique": Aggregate(Uniqueness, lambda s, **kw: s.repeats + s.late_repeats, _none),
+}
+# fmt:on
+
+
+def sketch_key(name: str, column: str) -> str:
+    """The key of an aggregate expectation's sketch in the tracker."""
+    return f"{name}/{column}"
+
+
+def get_sketch(name: str, column: str, config: Dict[str, Any]) -> Any:
+    """Get the sketch for an aggregate expectation, creating it if it doesn't exist."""
+    tracker = expectations_module.GLOBAL_TRACKER
+    key = sketch_key(name, column)
+    sketch = tracker.get(key)
+    if sketch is None:
+        sketch = tracker[key] = AGGREGATES[name].sketch(**config)
+    return sketch
+
+
+def compile_update(name: str, column: str, config: Dict[str, Any]) -> Callable[[Any], bool]:
+    """
+    A test for a plan which updates the sketch with each value.
+
+    Values pass unless the sketch's `update` returns False, which only uniqueness does.
+    """
+    tracker = expectations_module.GLOBAL_TRACKER
+    key = sketch_key(name, column)
+    factory = AGGREGATES[name].sketch
+    # build the sketch now so a misconfigured expectation fails when it's compiled
+    get_sketch(name, column, config)
+
+    def update(value):
+        sketch = tracker.get(key)
+        if sketch is None:
+            sketch = tracker[key] = factory(**config)
+        return sketch.update(value) is not False
+
+    return update
+
+
+def check_aggregate(
+    name: str, column: str, config: Dict[str, Any], ignore_nulls: bool = True
+) -> Tuple[bool, Optional[Any]]:
+    """
+    Test an aggregate expectation against the values seen so far.
+
+    Returns: tuple
+        Whether the expectation is met, and the statistic it was tested with.
+    """
+    sketch = expectations_module.GLOBAL_TRACKER.get(sketch_key(name, column))
+    return check_sketch(name, sketch, config, ignore_nulls)
+
+
+def check_sketch(name: str, sketch: Any, config: Dict[str, Any], ignore_nulls: bool = True) -> Tuple[bool, Any]:
+    """Test an aggregate expectation against a sketch, as `check_aggregate` does."""
+    aggregate = AGGREGATES[name]
+    statistic = None if sketch is None else aggregate.statistic(sketch, **config)
+    if statistic is None:
+        return ignore_nulls, None
+    return aggregate.check(statistic, **config), statistic
+
+
+def _row_level(name: str) -> None:
+    def expectation(*, row: dict, column: str, ignore_nulls: bool = True, **kwargs) -> bool:
+        sketch = get_sketch(name, column, {"ignore_nulls": ignore_nulls, **kwargs})
+        return sketch.update(row.get(column)) is not False
+
+    expectation.__name__ = name
+    expectation.__doc__ = f"Update the sketch for {name}, tested once the records have been seen."
+    register_expectation(expectation, name=name)
+
+
+for _name in AGGREGATES:
+    _row_level(_name)
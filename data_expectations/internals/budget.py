@@ -0,0 +1,124 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Failure budgets, for datasets which pass when only a few of their records fail.
+
+A dataset meets a budget when no more than `max_failure_rate` of its records fail.
+As records are counted the outcome can become certain before the end of the data:
+
+- when the number of records is known, the dataset has failed once more records
+  have failed than the budget allows for the whole dataset, and has passed once
+  even the remaining records all failing would keep it within the budget.
+- when it isn't known, the dataset is taken to have failed once, after at least
+  `min_records` records, the lower bound of the Wilson score interval of the
+  failure rate is above the budget - that is, at the `confidence` given the rate
+  the records came from is very unlikely to be within budget.
+
+A dataset isn't decided to have passed without knowing how many records it has,
+as the records yet to be seen could fail.
+
+Without `min_records` the interval of a handful of records is wide enough that a
+single early failure would put its lower bound over a small budget, so a stream
+would fail where the same records in a list pass. Unless it is given, `min_records`
+is `ceil(z * z / max_failure_rate)` - enough records that one failure among them
+is within the budget at the `confidence`.
+"""
+import math
+from statistics import NormalDist
+from typing import Optional
+
+
+class FailureBudget:
+    """
+    Counts passing and failing records against a maximum failure rate.
+
+    Call `add` for each record, `decided` is the outcome once it is certain, and
+    `passed` is whether the records counted so far are within the budget.
+    """
+
+    __slots__ = ("max_failure_rate", "min_records", "total", "confidence", "records", "failures", "_z")
+
+    def __init__(
+        self,
+        max_failure_rate: float,
+        min_records: Optional[int] = None,
+        total: Optional[int] = None,
+        confidence: float = 0.999,
+    ):
+        if not 0 <= max_failure_rate <= 1:
+            raise ValueError("max_failure_rate must be between 0 and 1")
+        if not 0.5 <= confidence < 1:
+            raise ValueError("confidence must be at least 0.5 and less than 1")
+        self.max_failure_rate = max_failure_rate
+        self.total = total
+        self.confidence = confidence
+        self.records = 0
+        self.failures = 0
+        self._z = NormalDist().inv_cdf(confidence)
+        if min_records is None:
+            min_records = math.ceil(self._z * self._z / max_failure_rate) if max_failure_rate else 1
+        self.min_records = min_records
+
+    def __repr__(self) -> str:
+        return f"<FailureBudget failures={self.failures} records={self.records} max_failure_rate={self.max_failure_rate}>"
+
+    def add(self, passed: bool) -> Optional[bool]:
+        """
+        Count a record.
+
+        Returns: bool or None
+            The outcome, if it is now certain.
+        """
+        self.records += 1
+        if not passed:
+            self.failures += 1
+        return self.decided
+
+    @property
+    def allowed(self) -> Optional[int]:
+        """The number of records which can fail, when the number of records is known."""
+        if self.total is None:
+            return None
+        return math.floor(self.max_failure_rate * self.total + 1e-9)
+
+    @property
+    def passed(self) -> bool:
+        """Whether the records counted so far are within the budget."""
+        if self.records == 0:
+            return True
+        return self.failures <= self.max_failure_rate * self.records + 1e-9
+
+    @property
+    def decided(self) -> Optional[bool]:
+        """The outcome if it is already certain, None otherwise."""
+        allowed = self.allowed
+        if allowed is not None:
+            if self.failures > allowed:
+                return False
+            if self.failures + max(0, self.total - self.records) <= allowed:  # type:ignore
+                return True
+            return None
+        if self.records < max(1, self.min_records) or self.failures == 0:
+            return None
+        if self._lower_bound() > self.max_failure_rate:
+            return False
+        return None
+
+    def _lower_bound(self) -> float:
+        # the lower bound of the Wilson score interval of the failure rate
+        n = self.records
+        z = self._z
+        rate = self.failures / n
+        centre = rate + z * z / (2 * n)
+        spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n))
+        return (centre - spread) / (1 + z * z / n)
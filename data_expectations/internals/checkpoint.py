@@ -0,0 +1,200 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Checkpoints of evaluation state.
+
+All of the state of the stateful expectations - the previous values of ordering
+expectations, the sketches of aggregate expectations, the values seen by uniqueness
+expectations and so on - is held in the GLOBAL_TRACKER. A checkpoint is a snapshot
+of the tracker written to a local file, restoring it replaces the tracker's contents
+so a validator can carry on from where it was after a restart. When metrics are
+enabled their totals - the records evaluated and the failures of each expectation -
+are in the checkpoint too, and restoring it replaces the totals of the enabled
+collector.
+
+A `FailureBudget` isn't part of the evaluation state, the budget of `evaluate_list`
+lasts for the call, and a budget counting records one at a time belongs to the
+caller, who can pickle it alongside the checkpoint.
+
+Checkpoints are pickled and compressed, they should only be restored from files
+written by `checkpoint`, as restoring a pickle can run arbitrary code. Values which
+were spilled to disk are written after the pickle, a chunk at a time, rather than
+being read into memory to be pickled.
+"""
+import io
+import os
+import pickle  # nosec - only files written by `checkpoint` should be restored
+import zlib
+from typing import Union
+
+from data_expectations.internals import expectations as expectations_module
+from data_expectations.internals import metrics
+from data_expectations.internals.files import atomic_write
+from data_expectations.internals.uniqueness import SpillFile
+from data_expectations.internals.uniqueness import spill_chunks
+
+MAGIC = b"DEXPCKPT"
+VERSION = 3
+CHUNK_SIZE = 1 << 20
+
+
+class _Pickler(pickle.Pickler):
+    """Pickles spill files as references, their contents are written after the pickle."""
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spills: list = []
+
+    def persistent_id(self, obj):
+        if isinstance(obj, SpillFile):
+            self.spills.append(obj.path)
+            return len(self.spills) - 1
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickles spill files from the files their contents were read into."""
+
+    def __init__(self, file, spills: list):
+        super().__init__(file)
+        self.spills = spills
+
+    def persistent_load(self, pid):
+        return self.spills[pid]
+
+
+class _Decompressed:
+    """Reads from a zlib stream in a file, decompressing a chunk at a time."""
+
+    def __init__(self, file):
+        self.file = file
+        self.decompressor = zlib.decompressobj()
+        self.buffer = bytearray()
+
+    def read(self, size: int) -> bytes:
+        decompressor = self.decompressor
+        while len(self.buffer) < size and not decompressor.eof:
+            data = decompressor.unconsumed_tail or self.file.read(CHUNK_SIZE)
+            if not data:
+                break
+            self.buffer += decompressor.decompress(data, CHUNK_SIZE)
+        if len(self.buffer) < size:
+            raise EOFError("the checkpoint is truncated")
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+def checkpoint(path: Union[str, os.PathLike]) -> int:
+    """
+    Write the evaluation state to a file.
+
+    The file is written alongside its final location and moved into place, so an
+    interrupted checkpoint doesn't replace an earlier one. Files of values spilled
+    to disk are copied into the checkpoint a chunk at a time.
+
+    Parameters:
+        path: str
+            Where to write the checkpoint.
+
+    Returns: int
+        The size of the checkpoint in bytes.
+    """
+    collector = metrics.COLLECTOR
+    state = {
+        "tracker": dict(expectations_module.GLOBAL_TRACKER),
+        "metrics": None if collector is None else collector.totals(),
+    }
+    pickled = io.BytesIO()
+    pickler = _Pickler(pickled)
+    pickler.dump(state)
+    size = 0
+
+    def write(checkpoint_file) -> None:
+        nonlocal size
+        compressor = zlib.compressobj()
+        checkpoint_file.write(MAGIC + bytes([VERSION]))
+        # the pickle, then the contents of each of the spill files it refers to
+        data = pickled.getvalue()
+        checkpoint_file.write(compressor.compress(len(data).to_bytes(8, "little") + data))
+        checkpoint_file.write(compressor.compress(len(pickler.spills).to_bytes(8, "little")))
+        for spill in pickler.spills:
+            checkpoint_file.write(compressor.compress(os.path.getsize(spill).to_bytes(8, "little")))
+            for chunk in spill_chunks(spill):
+                checkpoint_file.write(compressor.compress(chunk))
+        checkpoint_file.write(compressor.flush())
+        size = checkpoint_file.tell()
+
+    atomic_write(path, write, prefix=".checkpoint-", durable=True)
+    return size
+
+
+def _load(checkpoint_file) -> dict:
+    stream = _Decompressed(checkpoint_file)
+    pickled = stream.read(int.from_bytes(stream.read(8), "little"))
+    spills = []
+    try:
+        for _ in range(int.from_bytes(stream.read(8), "little")):
+            spill = SpillFile()
+            spills.append(spill)
+            remaining = int.from_bytes(stream.read(8), "little")
+            with open(spill.path, "wb") as spill_file:
+                while remaining:
+                    chunk = stream.read(min(remaining, CHUNK_SIZE))
+                    spill_file.write(chunk)
+                    remaining -= len(chunk)
+        return _Unpickler(io.BytesIO(pickled), spills).load()  # nosec
+    finally:
+        # spill files are moved into place as they're unpickled, any left weren't used
+        for spill in spills:
+            if os.path.exists(spill.path):
+                os.remove(spill.path)
+
+
+def restore(path: Union[str, os.PathLike]) -> None:
+    """
+    Replace the evaluation state with the state in a checkpoint.
+
+    Parameters:
+        path: str
+            A file written by `checkpoint`.
+
+    Raises:
+        ValueError: If the file isn't a checkpoint, or is from a newer version.
+    """
+    with open(path, "rb") as checkpoint_file:
+        header = checkpoint_file.read(len(MAGIC) + 1)
+        if not header.startswith(MAGIC) or len(header) <= len(MAGIC):
+            raise ValueError(f"'{path}' is not a checkpoint")
+        version = header[len(MAGIC)]
+        if version > VERSION:
+            raise ValueError(f"'{path}' is a version {version} checkpoint, only version {VERSION} can be read")
+        try:
+            if version == 1:
+                # the pickle, including any spilled values, in a single stream
+                state = pickle.loads(zlib.decompress(checkpoint_file.read()))  # nosec
+            else:
+                state = _load(checkpoint_file)
+            if version < 3:
+                # only the tracker
+                state = {"tracker": state, "metrics": None}
+        except (zlib.error, pickle.UnpicklingError, EOFError) as err:
+            raise ValueError(f"'{path}' is not a valid checkpoint: {err}") from err
+
+    # update in place, compiled plans hold a reference to the tracker
+    tracker = expectations_module.GLOBAL_TRACKER
+    tracker.clear()
+    tracker.update(state["tracker"])
+    collector = metrics.COLLECTOR
+    if collector is not None and state["metrics"] is not None:
+        collector.set_totals(state["metrics"])
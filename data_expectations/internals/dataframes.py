@@ -0,0 +1,257 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Evaluating pandas DataFrames.
+
+pandas is optional, it is only imported when a DataFrame is evaluated.
+
+Most of the built-in expectations are run as vectorized operations on the column
+(`notna`, `between`, `isin`, `str.match`, `str.len` and so on) rather than on each
+row. Expectations which can't be vectorized, such as custom expectations and
+aggregates, are tested a value at a time with the compiled plan, and only those
+which need the whole record (custom expectations, nested paths) convert the frame
+to records, once, and only if they are present.
+
+In a DataFrame missing values are NaN, None or NaT, all of these are nulls.
+"""
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+from data_expectations.internals import expectations as expectations_module
+from data_expectations.internals.accessors import is_path
+from data_expectations.internals.expectations import Expectations
+from data_expectations.internals.plan import ORDERINGS
+from data_expectations.internals.plan import Step
+from data_expectations.internals.text import sql_like_to_regex
+from data_expectations.internals.type_names import type_checker
+
+# each takes the column and the expectation's configuration and returns a boolean
+# Series, nulls are dealt with afterwards
+VECTORIZED: Dict[str, Callable[..., Any]] = {}
+
+
+def vectorized(name: str):
+    def decorator(func):
+        VECTORIZED[name] = func
+        return func
+
+    return decorator
+
+
+@vectorized("expect_column_values_to_be_between")
+def _between(series, *, minimum, maximum, **kwargs):
+    return series.between(minimum, maximum)
+
+
+@vectorized("expect_column_values_to_be_more_than")
+def _more_than(series, *, threshold, **kwargs):
+    return series > threshold
+
+
+@vectorized("expect_column_values_to_be_less_than")
+def _less_than(series, *, threshold, **kwargs):
+    return series < threshold
+
+
+@vectorized("expect_column_values_to_be_in_set")
+def _in_set(series, *, symbols, **kwargs):
+    return series.isin(list(symbols))
+
+
+@vectorized("expect_column_values_to_match_regex")
+def _match_regex(series, *, regex, **kwargs):
+    return series.astype(str).str.match(regex)
+
+
+@vectorized("expect_column_values_to_match_like")
+def _match_like(series, *, like, **kwargs):
+    return series.astype(str).str.match(sql_like_to_regex(like).pattern)
+
+
+def _lengths(series):
+    if series.dtype == object:
+        lengths = series.str.len()
+        unsized = lengths.isna() & series.notna()
+        if unsized.any():
+            lengths[unsized] = series[unsized].map(lambda value: len(str(value)))
+        return lengths
+    return series.astype(str).str.len()
+
+
+@vectorized("expect_column_values_length_to_be")
+def _length_to_be(series, *, length, **kwargs):
+    return _lengths(series) == length
+
+
+@vectorized("expect_column_values_length_to_be_between")
+def _length_between(series, *, minimum, maximum, **kwargs):
+    return _lengths(series).between(minimum, maximum)
+
+
+def _of_types(series, expected, subclasses):
+    import pandas
+
+    check = type_checker(expected, subclasses)
+    kind = series.dtype.kind
+    # columns with a numpy dtype hold numpy scalars, check them as the Python values
+    # they would be in records
+    native = {"i": int, "u": int, "f": float, "b": bool, "M": pandas.Timestamp, "m": pandas.Timedelta}.get(kind)
+    if native is not None:
+        return pandas.Series(check(native), index=series.index)
+    return series.map(lambda value: check(type(value)))
+
+
+@vectorized("expect_column_values_to_be_of_type")
+def _of_type(series, *, expected_type, subclasses=False, **kwargs):
+    return _of_types(series, expected_type, subclasses)
+
+
+@vectorized("expect_column_values_to_be_in_type_list")
+def _in_type_list(series, *, type_list, subclasses=False, **kwargs):
+    return _of_types(series, type_list, subclasses)
+
+
+def _ordering(step: Step, series, ignore_nulls: bool):
+    # the same as the streaming check: each value is compared with the last truthy
+    # value before it, starting from (and updating) the tracked value
+    tracker = expectations_module.GLOBAL_TRACKER
+    key = f"{step.name}/{step.definition.column}"
+    in_order = ORDERINGS[step.name]
+    previous = tracker.get(key)
+
+    present = series.notna()
+    values = series[present]
+    try:
+        if previous is None or values.empty or in_order(previous, values.iloc[0]):
+            if step.name == "expect_column_values_to_be_decreasing":
+                monotonic = values.is_monotonic_decreasing
+            else:
+                monotonic = values.is_monotonic_increasing
+            if monotonic:
+                truthy = values[values.astype(bool)]
+                if not truthy.empty:
+                    tracker[key] = truthy.iloc[-1:].tolist()[0]
+                return present.where(present, ignore_nulls)
+    except TypeError:
+        # values which can't be compared, these fail one at a time below
+        pass
+
+    results = []
+    for value in series.astype(object).where(present, None):
+        if value is None:
+            results.append(ignore_nulls)
+            continue
+        try:
+            results.append(previous is None or in_order(previous, value))
+        except TypeError:
+            results.append(False)
+        previous = value or previous
+    tracker[key] = previous
+    return results
+
+
+def _label(step: Step, labels: Dict[str, int]) -> str:
+    label = f"{step.name}/{step.definition.column}"
+    labels[label] = labels.get(label, 0) + 1
+    if labels[label] > 1:
+        label = f"{label}#{labels[label]}"
+    return label
+
+
+def evaluate_dataframe(expectations: Expectations, df) -> Any:
+    """
+    Evaluate a pandas DataFrame, without converting it to records.
+
+    Args:
+        expectations: The Expectations instance.
+        df: The DataFrame to be tested.
+
+    Returns:
+        A boolean DataFrame with the same index as `df` and a column for each
+        expectation, labelled "expectation/column", True where the row met it.
+
+    Raises:
+        ImportError: If pandas isn't installed.
+        ExpectationNotUnderstoodError: If an expectation is not recognized.
+    """
+    import pandas
+
+    plan = expectations.compile()
+    index = df.index
+    results: Dict[str, Any] = {}
+    labels: Dict[str, int] = {}
+    values_cache: Dict[str, list] = {}
+    records = None
+
+    def values(column):
+        # the column's values as Python objects, with None for nulls
+        if column not in values_cache:
+            if column in df.columns:
+                series = df[column]
+                values_cache[column] = series.astype(object).where(series.notna(), None).tolist()
+            else:
+                values_cache[column] = [None] * len(df)
+        return values_cache[column]
+
+    for step in plan.steps:
+        definition = step.definition
+        column = definition.column
+        label = _label(step, labels)
+        ignore_nulls = definition.ignore_nulls
+        nested = column not in df.columns and is_path(column)
+        # steps for a single flat column, a missing column is all nulls
+        columnar = not step.row_level and step.columns is None and not nested
+
+        if columnar:
+            present_column = column in df.columns
+            if step.name == "expect_column_to_exist":
+                results[label] = pandas.Series(present_column, index=index)
+                continue
+            series = df[column] if present_column else pandas.Series(None, index=index, dtype=object)
+            if step.name == "expect_column_values_to_not_be_null":
+                results[label] = series.notna()
+                continue
+            if step.name in ORDERINGS:
+                results[label] = pandas.Series(_ordering(step, series, ignore_nulls), index=index, dtype=bool)
+                continue
+            kernel = VECTORIZED.get(step.name)
+            if kernel is not None:
+                try:
+                    present = series.notna()
+                    tested = kernel(series[present], **definition.config)
+                    result = pandas.Series(ignore_nulls, index=index, dtype=bool)
+                    result[present] = tested.fillna(False).astype(bool)
+                    results[label] = result
+                    continue
+                except (TypeError, ValueError):
+                    # mixed types the vectorized operation can't handle, test each value
+                    pass
+            tested = [_safe(step.test, value) for value in values(column)]
+        elif step.columns is not None:
+            tested = [_safe(step.test, row) for row in zip(*(values(name) for name in step.columns))]
+        else:
+            if records is None:
+                columns = list(df.columns)
+                records = [dict(zip(columns, row)) for row in zip(*(values(name) for name in columns))]
+            tested = [_safe(step.test, step.accessor(record)) for record in records]
+        results[label] = pandas.Series(tested, index=index, dtype=bool)
+
+    return pandas.DataFrame(results, index=index)
+
+
+def _safe(test, value) -> bool:
+    try:
+        return bool(test(value))
+    except Exception:
+        return False
@@ -10,35 +10,53 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 import typing
 from typing import Any
 from typing import Dict
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import TYPE_CHECKING
 
-from data_expectations import Behaviors
 from data_expectations import Expectations
 from data_expectations.errors import ExpectationNotMetError
 from data_expectations.errors import ExpectationNotUnderstoodError
+from data_expectations.internals import metrics
+from data_expectations.internals.masks import Bitmap
+from data_expectations.internals.masks import ValidityMask
+from data_expectations.internals.models import Violation
 
-# Cache the expectations dictionary for better performance
-_EXPECTATIONS_CACHE: Dict[str, Any] = {}
+if TYPE_CHECKING:  # pragma: no cover
+    from data_expectations.internals.proofs import ColumnStatistics
 
+BATCH_SIZE = 4096
+# evaluate_list starts with small batches, so little is tested past an early failure
+FIRST_BATCH_SIZE = 64
 
-def _get_expectations() -> Dict[str, Any]:
-    """Get cached expectations dictionary."""
-    global _EXPECTATIONS_CACHE
-    if not _EXPECTATIONS_CACHE:
-        _EXPECTATIONS_CACHE = Expectations.all_expectations()
-    return _EXPECTATIONS_CACHE
 
-
-def evaluate_record(expectations: Expectations, record: dict, suppress_errors: bool = False) -> bool:
+def evaluate_record(
+    expectations: Expectations,
+    record: Any,
+    suppress_errors: bool = False,
+    schema: Optional[Sequence[str]] = None,
+) -> bool:
     """
     Test a single record against a defined set of expectations.
 
+    Columns can be flat keys or paths into nested records (`payload.user.id`,
+    `items[0].sku` or `/payload/user/id`), missing levels are treated as nulls.
+
+    Records are usually dictionaries, but namedtuples, dataclasses and other objects
+    (including those with `__slots__`) are read directly, as are tuples and lists
+    when a schema naming their columns is provided.
+
     Args:
         expectations: The Expectations instance.
-        record: The dictionary record to be tested.
+        record: The record to be tested.
         suppress_errors: Whether to suppress expectation errors and return False instead.
+        schema: The column names, in order, when records are tuples or lists.
 
     Returns:
         True if all expectations are met, False otherwise.
@@ -46,74 +64,435 @@ def evaluate_record(expectations: Expectations, record: dict, suppress_errors: b
     Raises:
         ExpectationNotUnderstoodError: If an expectation is not recognized.
         ExpectationNotMetError: If an expectation fails and suppress_errors is False.
-        TypeError: If record is not a dictionary.
-    """
-    all_expectations = _get_expectations()
-
-    # Check for unknown expectations first (before type checking record)
-    # This maintains backward compatibility with tests that rely on this behavior
-    for expectation_definition in expectations.set_of_expectations:
-        # get the name of the expectation - handle both Behaviors enum and string names
-        expectation = expectation_definition.expectation
-        if isinstance(expectation, Behaviors):
-            expectation_name = expectation.value
-        else:
-            expectation_name = expectation
-
-        if expectation_name not in all_expectations:
-            available = list(all_expectations.keys())
-            raise ExpectationNotUnderstoodError(expectation_name, available)
-
-    # Now check record type
-    if not isinstance(record, dict):
+        TypeError: If records of this type can't be evaluated.
+    """
+    # compiling the plan checks for unknown expectations, this happens before the
+    # record type is checked to maintain backward compatibility
+    plan = expectations.compile()
+
+    try:
+        steps = plan.record_steps(record, schema)
+    except TypeError:
         if not suppress_errors:
-            raise TypeError(f"Record must be a dictionary, got {type(record)}")
+            raise
         return False
 
-    # Evaluate each expectation against the record
-    for expectation_definition in expectations.set_of_expectations:
-        expectation = expectation_definition.expectation
-        if isinstance(expectation, Behaviors):
-            expectation_name = expectation.value
-        else:
-            expectation_name = expectation
+    return _test_record(steps, record, suppress_errors)
 
-        base_config = {"row": record, "column": expectation_definition.column, **expectation_definition.config}
 
+def _test_record(
+    steps,
+    record: Any,
+    suppress_errors: bool,
+    batch: Optional[list] = None,
+    results: Optional[dict] = None,
+    position: int = 0,
+) -> bool:
+    """
+    Test a record with its steps, stopping at the first which fails.
+
+    The record can be at `position` in a `batch` of records, then a step with a batch
+    kernel tests the whole batch the first time a record reaches it, and `results`
+    holds what it found, by step. Steps the kernel says the record meets aren't tested
+    again, steps it says it doesn't are, so failures are reported as they would have
+    been.
+    """
+    collector = metrics.COLLECTOR
+    for step in steps:
+        if batch is not None and step.batch is not None:
+            step_results = results.get(step)  # type:ignore
+            if step_results is None:
+                step_results = results[step] = _step_results(step, batch)  # type:ignore
+            if step_results[position]:
+                continue
         try:
-            result = all_expectations[expectation_name](**base_config)
-            if not result:
-                if not suppress_errors:
-                    raise ExpectationNotMetError(expectation_name, record)
-                return False  # data failed to meet expectation
+            result = step.test(step.accessor(record))
         except Exception as e:
+            if collector is not None:
+                collector.record(((step.name, step.definition.column),))
             if not suppress_errors:
                 # Wrap unexpected errors with more context
-                raise ExpectationNotMetError(expectation_name, record, str(e)) from e
+                raise ExpectationNotMetError(step.name, record, str(e)) from e
             return False
+        if not result:
+            if collector is not None:
+                collector.record(((step.name, step.definition.column),))
+            if not suppress_errors:
+                raise ExpectationNotMetError(step.name, record)
+            return False  # data failed to meet expectation
 
+    if collector is not None:
+        collector.record()
     return True
 
 
-def evaluate_list(expectations: Expectations, dictset: typing.Iterable[dict], suppress_errors: bool = False) -> bool:
+def _meets_every_step(plan, record: Any, schema: Optional[Sequence[str]]) -> bool:
+    """
+    Test a record with every one of its steps, without stopping at the first which
+    fails, so stateful and aggregate steps see the records which fail other steps.
+    """
+    try:
+        steps = plan.record_steps(record, schema)
+    except TypeError:
+        return False
+    failures = None
+    for step in steps:
+        try:
+            if step.test(step.accessor(record)):
+                continue
+        except Exception:  # nosec - an error fails the step, as in `evaluate_record`
+            pass
+        if failures is None:
+            failures = []
+        failures.append((step.name, step.definition.column))
+
+    collector = metrics.COLLECTOR
+    if collector is not None:
+        collector.record(failures or ())
+    return failures is None
+
+
+def _record_results(plan, dictset: typing.Iterable[Any], suppress_errors: bool, schema) -> typing.Iterator[bool]:
+    """
+    What `evaluate_record` returns for each record, in order.
+
+    Records of a sequence are tested in batches, which start small and grow. A step
+    with a batch kernel tests a whole batch when the first of its records reaches
+    the step. Steps without them, which includes every stateful step, are tested one
+    record at a time, and only up to the record the caller stops at. Records of other
+    iterables are read and tested one at a time, so no more are read than are needed.
+    """
+    record_steps = plan.record_steps
+    if not isinstance(dictset, typing.Sequence):
+        for record in dictset:
+            try:
+                steps = record_steps(record, schema)
+            except TypeError:
+                if not suppress_errors:
+                    raise
+                yield False
+                continue
+            yield _test_record(steps, record, suppress_errors)
+        return
+
+    start = 0
+    size = FIRST_BATCH_SIZE
+    while start < len(dictset):
+        for chunk in _chunks(dictset[start : start + size]):
+            start += len(chunk)
+            try:
+                plan.steps_for(type(chunk[0]), schema)
+            except TypeError:
+                if not suppress_errors:
+                    raise
+                for _ in chunk:
+                    yield False
+                continue
+            results: dict = {}
+            for position, record in enumerate(chunk):
+                yield _test_record(record_steps(record, schema), record, suppress_errors, chunk, results, position)
+        size = min(size * 2, BATCH_SIZE)
+
+
+def find_violations(
+    expectations: Expectations,
+    record: Any,
+    schema: Optional[Sequence[str]] = None,
+) -> Tuple[Violation, ...]:
+    """
+    Find the expectations a record doesn't meet, without raising.
+
+    Every expectation is tested, and a Violation is returned for each one which
+    isn't met. Violations only format their messages when asked for them, so this
+    is much cheaper than catching ExpectationNotMetError when many records fail.
+
+    Args:
+        expectations: The Expectations instance.
+        record: The record to be tested.
+        schema: The column names, in order, when records are tuples or lists.
+
+    Returns:
+        The violations, an empty tuple if all expectations are met.
+
+    Raises:
+        ExpectationNotUnderstoodError: If an expectation is not recognized.
+        TypeError: If records of this type can't be evaluated.
+    """
+    steps = expectations.compile().record_steps(record, schema)
+
+    violations = None
+    for step in steps:
+        details = None
+        try:
+            if step.test(step.accessor(record)):
+                continue
+        except Exception as e:
+            details = str(e)
+        if violations is None:
+            violations = []
+        violations.append(Violation(step.name, step.definition.column, record, details))
+
+    collector = metrics.COLLECTOR
+    if collector is not None:
+        collector.record(() if violations is None else [(v.expectation, v.column) for v in violations])
+    return () if violations is None else tuple(violations)
+
+
+def evaluate_list(
+    expectations: Expectations,
+    dictset: typing.Iterable[Any],
+    suppress_errors: bool = False,
+    schema: Optional[Sequence[str]] = None,
+    max_failure_rate: Optional[float] = None,
+    min_records: Optional[int] = None,
+) -> bool:
     """
     Evaluate a set of records against a defined set of Expectations.
 
+    Aggregate expectations, such as the mean of a column, are tested once all of the
+    records have been evaluated.
+
+    With `max_failure_rate` the set passes when no more than that proportion of its
+    records fail, evaluation stops as soon as the outcome is certain (see
+    `FailureBudget`): when the number of records is known (`dictset` has a length)
+    once the budget is spent, or can't be, otherwise once at least `min_records`
+    have been seen and the failure rate is almost certainly over the budget.
+
+    When `dictset` is a sequence, such as a list, records are tested in batches and
+    expectations with batch kernels test a batch of values at a time, the others test
+    one record at a time. Records of other iterables, and every record with
+    `max_failure_rate`, are read and tested one at a time, so no more records are
+    read than are needed.
+
+    With `max_failure_rate` every expectation is tested against every record, so a
+    record which fails one expectation still counts towards the aggregates, and the
+    state of ordering, uniqueness and window expectations, after it.
+
     Args:
         expectations: The Expectations instance.
-        dictset: The iterable set of dictionary records to be tested.
+        dictset: The iterable set of records to be tested.
         suppress_errors: Whether to suppress expectation errors and return False for the entire set.
+        schema: The column names, in order, when records are tuples or lists.
+        max_failure_rate: The proportion of records which are allowed to fail.
+        min_records: How many records to see before stopping on the failure rate,
+            by default enough that a single failure among them is within the budget.
 
     Returns:
-        True if all records meet all Expectations, False otherwise.
+        True if all records meet all Expectations (or enough of them do), False otherwise.
 
     Raises:
         ExpectationNotUnderstoodError: If an expectation is not recognized.
         ExpectationNotMetError: If an expectation fails and suppress_errors is False.
     """
+    collector = metrics.COLLECTOR
+    if collector is None:
+        return _evaluate_list(expectations, dictset, suppress_errors, schema, max_failure_rate, min_records)
+    started = time.perf_counter()
+    try:
+        return _evaluate_list(expectations, dictset, suppress_errors, schema, max_failure_rate, min_records)
+    finally:
+        collector.observe_batch(time.perf_counter() - started)
+
+
+def _evaluate_list(
+    expectations: Expectations,
+    dictset: typing.Iterable[Any],
+    suppress_errors: bool,
+    schema: Optional[Sequence[str]],
+    max_failure_rate: Optional[float],
+    min_records: Optional[int],
+) -> bool:
+    # compile before iterating so configuration errors are raised even for empty sets
+    plan = expectations.compile()
+    if max_failure_rate is not None:
+        from data_expectations.internals.budget import FailureBudget
+
+        total = len(dictset) if isinstance(dictset, typing.Sized) else None
+        budget = FailureBudget(max_failure_rate, min_records=min_records, total=total)
+        decided = None
+        # one record at a time, so no more records are read than are needed, and with
+        # every step, as failing records still count towards the aggregates and state
+        for record in dictset:
+            decided = budget.add(_meets_every_step(plan, record, schema))
+            # passing early would skip records the aggregates need
+            if decided is False or (decided and not plan.aggregates):
+                break
+        if decided is False or (decided is None and not budget.passed):
+            if not suppress_errors:
+                summary = {"records": budget.records, "failures": budget.failures}
+                details = f"{budget.failures} of {budget.records} records failed, the budget is {max_failure_rate:.4%}"
+                raise ExpectationNotMetError("max_failure_rate", summary, details)
+            return False
+        if plan.aggregates:
+            return evaluate_aggregates(expectations, suppress_errors)
+        return True
     try:
-        return all(evaluate_record(expectations, record, suppress_errors) for record in dictset)
+        if not all(_record_results(plan, dictset, suppress_errors, schema)):
+            return False
     except (ExpectationNotUnderstoodError, ExpectationNotMetError):
         # Re-raise these specific errors even if suppress_errors is True
         # as they indicate configuration issues, not data validation issues
         raise
+    if plan.aggregates:
+        return evaluate_aggregates(expectations, suppress_errors)
+    return True
+
+
+def evaluate_aggregates(expectations: Expectations, suppress_errors: bool = False) -> bool:
+    """
+    Test the aggregate expectations, such as the mean of a column, against the
+    records evaluated since the last `Expectations.reset`.
+
+    `evaluate_list` calls this once it has seen all of the records, when records are
+    evaluated one at a time with `evaluate_record` call this at the end of the data.
+
+    Args:
+        expectations: The Expectations instance.
+        suppress_errors: Whether to suppress expectation errors and return False instead.
+
+    Returns:
+        True if all aggregate expectations are met, False otherwise.
+
+    Raises:
+        ExpectationNotMetError: If an expectation isn't met and suppress_errors is False.
+    """
+    plan = expectations.compile()
+    if not plan.aggregates:
+        return True
+    from data_expectations.internals.aggregates import check_aggregate
+
+    for step in plan.aggregates:
+        definition = step.definition
+        met, statistic = check_aggregate(step.name, definition.column, definition.config, definition.ignore_nulls)
+        if not met:
+            if not suppress_errors:
+                summary = {"column": definition.column, "statistic": statistic}
+                raise ExpectationNotMetError(step.name, summary, f"statistic was {statistic}")
+            return False
+    return True
+
+
+def _step_results(step, chunk: list) -> list:
+    """Test one step against a batch of records, using its batch kernel if it has one."""
+    if step.batch is not None:
+        values = step.values
+        try:
+            results = list(step.batch([values(record) for record in chunk]))
+            if len(results) == len(chunk):
+                return results
+        except Exception:  # nosec - fall back to testing values one at a time
+            pass
+
+    test = step.test
+    accessor = step.accessor
+    results = []
+    for record in chunk:
+        try:
+            results.append(bool(test(accessor(record))))
+        except Exception:
+            results.append(False)
+    return results
+
+
+def _fused_results(step, chunk: list, passing: list) -> list:
+    """Results for a step fused into the schema check, only testing records which failed it."""
+    if all(passing):
+        return [True] * len(chunk)
+    failures = iter(_step_results(step, [record for record, passed in zip(chunk, passing) if not passed]))
+    return [True if passed else next(failures) for passed in passing]
+
+
+def _chunks(dictset: typing.Iterable[Any]) -> typing.Iterator[list]:
+    """Split records into batches, each holding records of a single type."""
+    chunk: list = []
+    chunk_type = None
+    for record in dictset:
+        if type(record) is not chunk_type or len(chunk) == BATCH_SIZE:
+            if chunk:
+                yield chunk
+            chunk = []
+            chunk_type = type(record)
+        chunk.append(record)
+    if chunk:
+        yield chunk
+
+
+def evaluate_list_mask(
+    expectations: Expectations,
+    dictset: typing.Iterable[Any],
+    schema: Optional[Sequence[str]] = None,
+    by_expectation: bool = False,
+    statistics: Optional[Mapping[str, "ColumnStatistics"]] = None,
+) -> ValidityMask:
+    """
+    Evaluate a set of records, returning a compact pass/fail bit for each record.
+
+    Records are evaluated in batches, one expectation at a time, so expectations
+    with batch kernels are tested a batch of values at a time. Every expectation is
+    tested against every record, and nothing is raised for records which don't meet
+    the expectations, the mask records them instead.
+
+    Args:
+        expectations: The Expectations instance.
+        dictset: The iterable set of records to be tested.
+        schema: The column names, in order, when records are tuples or lists.
+        by_expectation: Also build a bitmap for each expectation.
+        statistics: ColumnStatistics of the records, by column. Expectations these
+            prove every record meets aren't tested value by value.
+
+    Returns:
+        A ValidityMask, a Bitmap with the bit for each passing record set.
+
+    Raises:
+        ExpectationNotUnderstoodError: If an expectation is not recognized.
+        TypeError: If records of a type which can't be evaluated are in the set.
+    """
+    collector = metrics.COLLECTOR
+    started = time.perf_counter()
+    plan = expectations.compile()
+    mask = ValidityMask([Bitmap() for _ in plan.steps] if by_expectation else None)
+    append = mask.append
+
+    proven: typing.Set[int] = set()
+    if statistics:
+        from data_expectations.internals.proofs import proven_steps
+
+        proven = proven_steps(plan.steps, statistics)
+
+    for chunk in _chunks(dictset):
+        steps = plan.steps_for(type(chunk[0]), schema)
+        check = plan.schema_for(type(chunk[0]), schema)
+        passing = None if check is None else [check(record) for record in chunk]
+        remaining = set() if check is None else set(check.remaining_indices)
+        results = []
+        for index, step in enumerate(steps):
+            if index in proven:
+                results.append([True] * len(chunk))
+            elif passing is None or index in remaining:
+                results.append(_step_results(step, chunk))
+            else:
+                results.append(_fused_results(step, chunk, passing))
+
+        if by_expectation:
+            for bitmap, step_results in zip(mask.by_expectation, results):  # type:ignore
+                for result in step_results:
+                    bitmap.append(result)
+
+        if collector is not None:
+            failed = len(chunk) - sum(map(all, zip(*results))) if results else 0
+            failures: Dict[Tuple[str, str], int] = {}
+            for step, step_results in zip(steps, results):
+                key = (step.name, step.definition.column)
+                failures[key] = failures.get(key, 0) + len(chunk) - sum(map(bool, step_results))
+            collector.record_batch(len(chunk), failed, failures)
+
+        if not results:
+            for _ in chunk:
+                append(True)
+            continue
+        for flags in zip(*results):
+            append(all(flags))
+
+    if collector is not None:
+        collector.observe_batch(time.perf_counter() - started)
+    return mask
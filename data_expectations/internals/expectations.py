@@ -25,38 +25,37 @@ the values in a set of columns should add to 100, or the values in a column are
 increasing.
 
 This is designed to be applied to streaming data as each record passes through a point
-in a flow - as such it is not intended to test an entire dataset at once to test its
-validity, and some assertions are impractical - for example an expectation of the mean
-of all of the values in a table.
+in a flow - as such most expectations test each record as it is seen. Expectations of
+an entire dataset, for example of the mean of all of the values in a column, are
+computed in the same single pass using mergeable sketches (see `aggregates`) and are
+tested once the records have been seen.
 
 - if data doesn't match, I'm not cross, I'm just disappointed.
 """
 import json
 import re
 from dataclasses import is_dataclass
-from inspect import getmembers
+from functools import wraps
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Union
 
+from data_expectations.internals.expressions import compile_expression
 from data_expectations.internals.models import Expectation
+from data_expectations.internals.registry import get_registered_expectation
+from data_expectations.internals.registry import register_expectation
+from data_expectations.internals.registry import registered_expectations
 from data_expectations.internals.text import sql_like_to_regex
 
-try:
-    # added 3.9
-    from functools import cache
-except ImportError:  # pragma: no cover
-    from functools import lru_cache
-
-    cache = lru_cache(maxsize=1)
-
-
 GLOBAL_TRACKER: Dict[str, Any] = {}
 
 
 def track_previous(func):
+    @wraps(func)
     def wrapper(*args, **kwargs):
         column = kwargs.get("column")
         key = f"{func.__name__}/{str(column)}"
@@ -71,6 +70,45 @@ def track_previous(func):
     return wrapper
 
 
+def _changes(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.version += 1
+        return result
+
+    return wrapper
+
+
+class Definitions(list):
+    """
+    The definitions of a set of Expectations, a list which counts the changes made
+    to it, so a plan compiled from the definitions isn't used after they change.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, definitions: Iterable[Expectation] = ()):
+        super().__init__(definitions)
+        self.version = 0
+
+    def __reduce__(self):
+        return (Definitions, (list(self),))
+
+    __setitem__ = _changes(list.__setitem__)
+    __delitem__ = _changes(list.__delitem__)
+    __iadd__ = _changes(list.__iadd__)
+    __imul__ = _changes(list.__imul__)
+    append = _changes(list.append)
+    extend = _changes(list.extend)
+    insert = _changes(list.insert)
+    pop = _changes(list.pop)
+    remove = _changes(list.remove)
+    clear = _changes(list.clear)
+    sort = _changes(list.sort)
+    reverse = _changes(list.reverse)
+
+
 class Expectations:
     """
     A collection of data expectations that can be evaluated against records.
@@ -93,7 +131,7 @@ class Expectations:
             ValueError: If an expectation definition is invalid
             json.JSONDecodeError: If a JSON string is malformed
         """
-        self.set_of_expectations: List[Expectation] = []
+        self.set_of_expectations = []
         for exp in set_of_expectations:
             try:
                 if isinstance(exp, str):  # Parse JSON string
@@ -108,23 +146,104 @@ class Expectations:
             except (json.JSONDecodeError, ValueError) as e:
                 raise ValueError(f"Failed to parse expectation: {exp}. Error: {str(e)}") from e
 
+    @property
+    def set_of_expectations(self) -> List[Expectation]:
+        """
+        The expectations' definitions.
+
+        Changing the list, or replacing it, is seen by the next evaluation. Changes
+        to the definitions in it aren't, replace a definition to change it.
+        """
+        return self._definitions
+
+    @set_of_expectations.setter
+    def set_of_expectations(self, definitions: Iterable[Expectation]) -> None:
+        self._definitions = Definitions(definitions)
+        self._plan = None
+
+    @classmethod
+    def from_file(cls, path: str) -> "Expectations":
+        """
+        Load a set of expectations from a JSON or JSON lines file.
+
+        This is much quicker than parsing the file and passing the definitions to
+        the constructor for large rule sets, the definitions aren't copied.
+
+        Args:
+            path: A file holding a JSON array of definitions, or one per line.
+
+        Returns:
+            Expectations: The loaded set of expectations.
+
+        Raises:
+            ValueError: If the file or a definition in it is invalid.
+        """
+        from data_expectations.internals.loading import load_definitions
+
+        expectations = cls([])
+        expectations.set_of_expectations = load_definitions(path)
+        return expectations
+
+    def compile(self):
+        """
+        Compile this set of expectations into an evaluation plan.
+
+        The plan is built the first time it is needed and reused until the
+        definitions change, column paths are parsed and expectation configuration is
+        prepared only once.
+
+        Returns:
+            Plan: The compiled plan.
+
+        Raises:
+            ExpectationNotUnderstoodError: If an expectation is not recognized.
+        """
+        version = self._definitions.version
+        if self._plan is None or self._plan_version != version:
+            from data_expectations.internals.plan import compile_plan
+
+            self._plan = compile_plan(self)
+            self._plan_version = version
+        return self._plan
+
     @classmethod
-    @cache
     def all_expectations(cls) -> Dict[str, Any]:
         """
-        Programmatically get the list of expectations and build them into a dictionary.
-        We then use this dictionary to look up the methods to test the expectations in
-        the set of expectations for a dataset.
+        Get every available expectation as a dictionary.
+
+        This includes the registered expectations, those provided by plugins (which
+        are loaded by this call) and those added by subclassing Expectations.
 
         Returns:
             Dict[str, Any]: Dictionary mapping expectation names to their callable methods.
         """
-        expectations = {}
-        for handle, member in getmembers(cls):
-            if callable(member) and handle.startswith("expect_"):
-                expectations[handle] = member
+        expectations = registered_expectations()
+        for klass in reversed(cls.__mro__[: cls.__mro__.index(Expectations)]):
+            for handle in vars(klass):
+                if handle.startswith("expect_") and callable(getattr(cls, handle)):
+                    expectations[handle] = getattr(cls, handle)
         return expectations
 
+    @classmethod
+    def get_expectation(cls, name: str) -> Optional[Callable]:
+        """
+        Get a single expectation by name.
+
+        Unlike `all_expectations` this only loads a plugin when the expectation
+        isn't already registered, and only the plugin which provides it.
+
+        Args:
+            name: The name of the expectation.
+
+        Returns:
+            The expectation, or None if there isn't one with that name.
+        """
+        if name.startswith("expect_"):
+            member = getattr(cls, name, None)
+            if callable(member):
+                return member
+        return get_registered_expectation(name)
+
     @classmethod
     def list_available_expectations(cls) -> List[str]:
         """
@@ -143,8 +262,48 @@ class Expectations:
         This should be called when starting evaluation of a new dataset
         to clear any state from previous evaluations.
         """
-        global GLOBAL_TRACKER
-        GLOBAL_TRACKER = {}
+        # state which holds more than memory, such as spilled unique values, is closed
+        for state in GLOBAL_TRACKER.values():
+            close = getattr(state, "close", None)
+            if close is not None:
+                close()
+        GLOBAL_TRACKER.clear()
+
+    @staticmethod
+    def checkpoint(path: str) -> int:
+        """
+        Write the state of the stateful expectations to a file.
+
+        This includes the previous values of ordering expectations, the sketches
+        of aggregate expectations and the values seen by uniqueness expectations.
+
+        Args:
+            path: Where to write the checkpoint.
+
+        Returns:
+            int: The size of the checkpoint in bytes.
+        """
+        from data_expectations.internals.checkpoint import checkpoint
+
+        return checkpoint(path)
+
+    @staticmethod
+    def restore(path: str) -> None:
+        """
+        Replace the state of the stateful expectations with a checkpoint.
+
+        This lets a stream validator carry on after a restart without replaying
+        the records it has already seen. Only restore checkpoints you wrote.
+
+        Args:
+            path: A file written by `checkpoint`.
+
+        Raises:
+            ValueError: If the file isn't a checkpoint.
+        """
+        from data_expectations.internals.checkpoint import restore
+
+        restore(path)
 
     def validate_configuration(self) -> List[str]:
         """
@@ -157,7 +316,6 @@ class Expectations:
         from data_expectations import Behaviors
 
         errors = []
-        available_expectations = self.all_expectations()
 
         for i, expectation in enumerate(self.set_of_expectations):
             # Handle both Behaviors enum and string expectation names
@@ -165,7 +323,7 @@ class Expectations:
             if isinstance(expectation_name, Behaviors):
                 expectation_name = expectation_name.value
 
-            if expectation_name not in available_expectations:
+            if self.get_expectation(expectation_name) is None:
                 errors.append(f"Expectation {i}: Unknown expectation '{expectation_name}'")
 
             # Basic parameter validation
@@ -187,6 +345,7 @@ class Expectations:
     ###################################################################################
 
     @staticmethod
+    @register_expectation
     def expect_column_to_exist(
         *,
         row: Dict[str, Any],
@@ -213,6 +372,7 @@ class Expectations:
         return column in row
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_not_be_null(
         *,
         row: Dict[str, Any],
@@ -237,11 +397,13 @@ class Expectations:
         return row.get(column) is not None
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_be_of_type(
         *,
         row: Dict[str, Any],
         column: str,
         expected_type: str,
+        subclasses: bool = False,
         ignore_nulls: bool = True,
         **kwargs,
     ) -> bool:
@@ -251,7 +413,9 @@ class Expectations:
         Args:
             row: The record to be checked.
             column: The column's name to validate the type of its value.
-            expected_type: Expected type name (e.g., 'str', 'int', 'float', 'bool').
+            expected_type: Expected type name (e.g., 'str', 'int', 'float', 'bool'), an alias
+                (e.g., 'integer', 'string') or a type.
+            subclasses: If True, values of subclasses of the expected type also match.
             ignore_nulls: If True, null values will not cause the expectation to fail.
             **kwargs: Additional parameters (ignored).
 
@@ -265,14 +429,18 @@ class Expectations:
         value = row.get(column)
         if value is None:
             return ignore_nulls
-        return type(value).__name__ == expected_type
+        from data_expectations.internals.type_names import type_checker
+
+        return type_checker(expected_type, subclasses)(type(value))
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_be_in_type_list(
         *,
         row: dict,
         column: str,
         type_list: Iterable,
+        subclasses: bool = False,
         ignore_nulls: bool = True,
         **kwargs,
     ):
@@ -285,7 +453,9 @@ class Expectations:
             column: str
                 The column's name to validate the type of its value.
             type_list: Iterable
-                List of expected types for the column value.
+                List of expected types for the column value, by name, alias or type.
+            subclasses: bool
+                If True, values of subclasses of the expected types also match.
             ignore_nulls: bool
                 If True, null values will not cause the expectation to fail.
 
@@ -294,10 +464,13 @@ class Expectations:
         """
         value = row.get(column)
         if value is not None:
-            return type(value).__name__ in type_list
+            from data_expectations.internals.type_names import type_checker
+
+            return type_checker(type_list, subclasses)(type(value))
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_be_between(
         *,
         row: dict,
@@ -331,6 +504,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     @track_previous
     def expect_column_values_to_be_increasing(
         *,
@@ -362,6 +536,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     @track_previous
     def expect_column_values_to_be_decreasing(
         *,
@@ -393,6 +568,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_be_in_set(
         *,
         row: dict,
@@ -423,6 +599,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_match_regex(
         *,
         row: dict,
@@ -453,6 +630,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_match_like(
         *,
         row: dict,
@@ -483,6 +661,73 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
+    def expect_column_values_to_match_any_like(
+        *,
+        row: dict,
+        column: str,
+        likes: Iterable[str],
+        ignore_nulls: bool = True,
+        **kwargs,
+    ):
+        """
+        Confirms that the value in a specific column matches at least one of a set of SQL-like patterns.
+
+        Parameters:
+            row: dict
+                The record to validate.
+            column: str
+                The column's name to validate its value.
+            likes: iterable of str
+                The SQL-like patterns to match against the column's value.
+            ignore_nulls: bool
+                If True, null values will not cause the expectation to fail.
+
+        Returns: bool
+            True if the value matches any of the patterns or if the value is null and ignore_nulls is True, False otherwise.
+        """
+        value = row.get(column)
+        if value is not None:
+            from data_expectations.internals.multimatch import multi_pattern
+
+            return multi_pattern(likes=tuple(likes)).any(str(value))
+        return ignore_nulls
+
+    @staticmethod
+    @register_expectation
+    def expect_column_values_to_match_any_regex(
+        *,
+        row: dict,
+        column: str,
+        regexes: Iterable[str],
+        ignore_nulls: bool = True,
+        **kwargs,
+    ):
+        """
+        Confirms that the value in a specific column matches at least one of a set of regular expressions.
+
+        Parameters:
+            row: dict
+                The record to validate.
+            column: str
+                The column's name to validate its value.
+            regexes: iterable of str
+                The regular expression patterns to match against the column's value.
+            ignore_nulls: bool
+                If True, null values will not cause the expectation to fail.
+
+        Returns: bool
+            True if the value matches any of the regexes or if the value is null and ignore_nulls is True, False otherwise.
+        """
+        value = row.get(column)
+        if value is not None:
+            from data_expectations.internals.multimatch import multi_pattern
+
+            return multi_pattern(regexes=tuple(regexes)).any(str(value))
+        return ignore_nulls
+
+    @staticmethod
+    @register_expectation
     def expect_column_values_length_to_be(
         *,
         row: dict,
@@ -515,6 +760,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_length_to_be_between(
         *,
         row: dict,
@@ -550,6 +796,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_be_more_than(
         *,
         row: dict,
@@ -580,6 +827,7 @@ class Expectations:
         return ignore_nulls
 
     @staticmethod
+    @register_expectation
     def expect_column_values_to_be_less_than(
         *,
         row: dict,
@@ -608,3 +856,136 @@ class Expectations:
         if value is not None:
             return value < threshold
         return ignore_nulls
+
+    @staticmethod
+    @register_expectation
+    def expect_column_values_to_be_less_than_column(
+        *,
+        row: dict,
+        column: str,
+        other_column: str,
+        or_equal: bool = False,
+        ignore_nulls: bool = True,
+        **kwargs,
+    ):
+        """
+        Confirms that the value in a specific column is less than the value in another column.
+
+        Parameters:
+            row: dict
+                The record to validate.
+            column: str
+                The column's name to validate its value.
+            other_column: str
+                The name of the column to compare with.
+            or_equal: bool
+                If True, the values may also be equal.
+            ignore_nulls: bool
+                If True, null values in either column will not cause the expectation to fail.
+
+        Returns: bool
+            True if the value is less than the other column's value or if either value is null and ignore_nulls is True, False otherwise.
+        """
+        value = row.get(column)
+        other = row.get(other_column)
+        if value is not None and other is not None:
+            return value <= other if or_equal else value < other
+        return ignore_nulls
+
+    @staticmethod
+    @register_expectation
+    def expect_column_values_to_sum_to(
+        *,
+        row: dict,
+        column: str,
+        other_columns: list,
+        total,
+        tolerance=0,
+        ignore_nulls: bool = True,
+        **kwargs,
+    ):
+        """
+        Confirms that the value in a specific column and the values in other columns add up to a total.
+
+        Parameters:
+            row: dict
+                The record to validate.
+            column: str
+                The column's name to validate its value.
+            other_columns: list
+                The names of the other columns in the sum.
+            total:
+                The expected sum.
+            tolerance:
+                How far the sum may be from the total, for example for rounding.
+            ignore_nulls: bool
+                If True, null values in any of the columns will not cause the expectation to fail.
+
+        Returns: bool
+            True if the sum is within the tolerance of the total or if any value is null and ignore_nulls is True, False otherwise.
+        """
+        values = [row.get(column)] + [row.get(other) for other in other_columns]
+        if None not in values:
+            return abs(sum(values) - total) <= tolerance
+        return ignore_nulls
+
+    @staticmethod
+    @register_expectation
+    def expect_column_nullity_to_match_column(
+        *,
+        row: dict,
+        column: str,
+        other_column: str,
+        **kwargs,
+    ):
+        """
+        Confirms that a specific column and another column are either both null or both set.
+
+        Parameters:
+            row: dict
+                The record to validate.
+            column: str
+                The column's name to validate its value.
+            other_column: str
+                The name of the column which must be null when this column is null.
+
+        Returns: bool
+            True if both values are null or both values are not null, False otherwise.
+        """
+        return (row.get(column) is None) == (row.get(other_column) is None)
+
+    @staticmethod
+    @register_expectation
+    def expect_expression_to_be_true(
+        *,
+        row: dict,
+        column: str,
+        expression: str,
+        ignore_nulls: bool = True,
+        **kwargs,
+    ):
+        """
+        Confirms that an expression over the columns of the record is true.
+
+        Parameters:
+            row: dict
+                The record to validate.
+            column: str
+                The column failures are reported against.
+            expression: str
+                The expression, for example "net + tax == gross and qty > 0", names
+                in the expression are columns (see `expressions` for what is allowed).
+            ignore_nulls: bool
+                If True, null values in any of the expression's columns will not cause the expectation to fail.
+
+        Returns: bool
+            True if the expression is true or if any value is null and ignore_nulls is True, False otherwise.
+        """
+        compiled = compile_expression(expression)
+        values = [row.get(name) for name in compiled.columns]
+        if ignore_nulls and None in values:
+            return True
+        try:
+            return bool(compiled.function(*values))
+        except (ArithmeticError, TypeError, ValueError):
+            return False
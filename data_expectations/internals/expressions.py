@@ -0,0 +1,120 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Expressions for `expect_expression_to_be_true`, such as "net + tax == gross and qty > 0".
+
+Expressions are parsed with `ast` and every node is checked against a whitelist:
+arithmetic (but not powers), comparisons, boolean logic, conditional expressions,
+literals, subscripts and calls to a few builtins. Attributes, comprehensions,
+lambdas and everything else are refused, so an expression can't reach anything
+other than the values it is given.
+
+Names which aren't one of the allowed functions are columns. The expression is
+compiled once into a function which takes the columns' values as arguments, so
+testing a record runs compiled bytecode rather than interpreting the expression.
+"""
+import ast
+from functools import lru_cache
+from typing import Callable
+from typing import Tuple
+
+FUNCTIONS = {
+    "abs": abs,
+    "bool": bool,
+    "float": float,
+    "int": int,
+    "len": len,
+    "max": max,
+    "min": min,
+    "round": round,
+    "str": str,
+}
+
+# fmt:off
+ALLOWED_NODES = (
+    ast.Expression, ast.Load,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.IfExp, ast.Subscript, ast.Slice,
+    ast.Name, ast.Constant, ast.Tuple, ast.List, ast.Set,
+    ast.Call,
+)
+# fmt:on
+
+
+class Expression:
+    """A compiled expression, `function` is called with the values of `columns`."""
+
+    __slots__ = ("source", "columns", "function")
+
+    def __init__(self, source: str, columns: Tuple[str, ...], function: Callable):
+        self.source = source
+        self.columns = columns
+        self.function = function
+
+
+def _check(tree: ast.AST, source: str) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"'{type(node).__name__}' is not allowed in expressions: {source}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise ValueError(f"Only {', '.join(sorted(FUNCTIONS))} can be called in expressions: {source}")
+            if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+                raise ValueError(f"Calls in expressions only take positional arguments: {source}")
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise ValueError(f"'{node.id}' can't be used in expressions: {source}")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(source: str) -> Expression:
+    """
+    Parse, check and compile an expression.
+
+    Parameters:
+        source: str
+            The expression.
+
+    Returns: Expression
+        The compiled expression.
+
+    Raises:
+        ValueError: If the expression isn't valid or uses something which isn't allowed.
+    """
+    if not isinstance(source, str):
+        raise ValueError(f"Expressions must be strings, not {type(source).__name__}")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as err:
+        raise ValueError(f"Expression can't be parsed: {source} ({err.msg})") from err
+    _check(tree, source)
+
+    columns = tuple(
+        dict.fromkeys(
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id not in FUNCTIONS
+        )
+    )
+    arguments = ast.arguments(
+        posonlyargs=[],
+        args=[ast.arg(arg=column) for column in columns],
+        kwonlyargs=[],
+        kw_defaults=[],
+        defaults=[],
+    )
+    function = ast.Expression(body=ast.Lambda(args=arguments, body=tree.body))
+    ast.fix_missing_locations(function)
+    code = compile(function, "<expression>", "eval")
+    namespace = {"__builtins__": {}, **FUNCTIONS}
+    return Expression(source, columns, eval(code, namespace))  # nosec - checked against the whitelist
@@ -0,0 +1,71 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Writing files which are read while they are being replaced.
+"""
+import os
+import stat
+import tempfile
+from typing import BinaryIO
+from typing import Callable
+from typing import Union
+
+
+def atomic_write(
+    path: Union[str, os.PathLike], writer: Callable[[BinaryIO], None], prefix: str = ".tmp-", durable: bool = False
+) -> None:
+    """
+    Replace a file with what a writer writes, so it's never read partly written.
+
+    The writer writes to a temporary file alongside the file, which is moved into
+    place when the writer returns. If the writer fails the temporary file is removed
+    and the file is left as it was. The file keeps its permissions, a new file gets
+    the permissions `open` would give it, rather than the owner only permissions of
+    a temporary file.
+
+    Parameters:
+        path: str
+            The file to write.
+        writer: callable
+            Given the temporary file, opened for writing bytes.
+        prefix: str (optional)
+            The start of the temporary file's name.
+        durable: bool (optional)
+            Flush the temporary file to disk before it's moved into place, so the
+            file isn't lost to a crash. Defaults to False.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix=prefix)
+    try:
+        with os.fdopen(handle, "wb") as temporary_file:
+            writer(temporary_file)
+            if durable:
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+        os.chmod(temporary, _mode(path))
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def _mode(path: Union[str, os.PathLike]) -> int:
+    """The permissions of a file, or those of a new file."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        # the umask can only be read by setting it
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
@@ -0,0 +1,93 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Loading large sets of expectations from files.
+
+`Expectations` copies each definition it is given, as the caller may go on to change
+it. Definitions parsed from a file belong to nobody else, so `load_definitions` builds the
+Expectation instances from them directly, without the copies.
+
+Rule sets aren't cached between runs: reading marshalled definitions back is no
+quicker than parsing the JSON they came from, and compiled plans hold compiled
+functions (regular expressions, expressions, type checks) which can't be written
+to disk. Plans are compiled when first used.
+"""
+import json
+import os
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from data_expectations.internals.models import Expectation
+
+# (expectation, column, ignore_nulls, config)
+Definition = Tuple[str, str, bool, Dict[str, Any]]
+
+
+def _parse(data: bytes) -> List[Definition]:
+    text = data.decode("utf-8")
+    if text.lstrip().startswith("["):
+        try:
+            entries = [(index, entry) for index, entry in enumerate(json.loads(text), 1)]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+    else:
+        # JSON lines, one definition per line
+        entries = []
+        for index, line in enumerate(text.splitlines(), 1):
+            if line.strip():
+                try:
+                    entries.append((index, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {index}: {e}") from e
+
+    definitions = []
+    for index, entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Expectation {index} is not an object")
+        # the parsed entry isn't shared, so it is used rather than copied
+        expectation = entry.pop("expectation", None)
+        column = entry.pop("column", None)
+        if expectation is None:
+            raise ValueError(f"Missing required 'expectation' key in expectation {index}.")
+        if not column:
+            raise ValueError(f"Missing required 'column' key in expectation {index}.")
+        definitions.append((expectation, column, entry.pop("ignore_nulls", True), entry))
+    return definitions
+
+
+def load_definitions(path: Union[str, os.PathLike]) -> List[Expectation]:
+    """
+    Read expectation definitions from a JSON or JSON lines file.
+
+    Parameters:
+        path: str
+            A file holding a JSON array of definitions, or one definition per line.
+
+    Returns: list
+        The Expectation instances, in the order they are in the file.
+
+    Raises:
+        ValueError: If the file isn't valid JSON, or a definition is missing its
+            expectation or column.
+    """
+    with open(path, "rb") as rule_file:
+        data = rule_file.read()
+
+    definitions = _parse(data)
+    return [
+        Expectation(expectation=expectation, column=column, ignore_nulls=ignore_nulls, config=config)
+        for expectation, column, ignore_nulls, config in definitions
+    ]
@@ -0,0 +1,153 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compact pass/fail results.
+
+A Bitmap holds one bit per record, set when the record passed, packed eight to a
+byte. Records are collected a byte at a time in fixed size chunks which are packed
+as each fills, so building a Bitmap for a very large dataset needs little more
+memory than the finished Bitmap.
+
+Counting and finding set or unset bits are done on whole bytes, so runs of passing
+records are skipped at C speed.
+"""
+import re
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+CHUNK_SIZE = 65536  # records, must be a multiple of 8
+
+_ASCII_BITS = bytes.maketrans(b"\x00\x01", b"01")
+_NOT_ALL_SET = re.compile(b"[^\xff]")
+_NOT_ALL_CLEAR = re.compile(b"[^\x00]")
+
+
+def _pack(flags: bytes) -> bytes:
+    """Pack a byte per record (0 or 1) into bits, the first record in the lowest bit."""
+    if not flags:
+        return b""
+    return int(flags.translate(_ASCII_BITS)[::-1], 2).to_bytes((len(flags) + 7) // 8, "little")
+
+
+class Bitmap:
+    """One bit per record, set when the record passed."""
+
+    __slots__ = ("_bits", "_length", "_pending")
+
+    def __init__(self, bits: bytes = b"", length: int = 0):
+        self._bits = bytearray(bits[: length >> 3])
+        self._length = len(self._bits) << 3
+        # packed bits always end on a byte boundary, a partial last byte is pending
+        self._pending = bytearray((bits[length >> 3] >> bit) & 1 for bit in range(length & 7))
+
+    def append(self, passed: bool) -> None:
+        """Add the result for the next record."""
+        self._pending.append(1 if passed else 0)
+        if len(self._pending) == CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        # only called with whole chunks pending, so the packed bits stay byte aligned
+        self._bits.extend(_pack(self._pending))
+        self._length += len(self._pending)
+        self._pending = bytearray()
+
+    def _packed(self) -> bytes:
+        # reading doesn't pack the pending records, appending carries on after them
+        return bytes(self._bits) + _pack(self._pending)
+
+    def __len__(self) -> int:
+        return self._length + len(self._pending)
+
+    def __getitem__(self, index: int) -> bool:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Bitmap index out of range")
+        if index >= self._length:
+            return self._pending[index - self._length] == 1
+        return bool(self._bits[index >> 3] >> (index & 7) & 1)
+
+    def to_bytes(self) -> bytes:
+        """The packed bits, the first record in the lowest bit of the first byte."""
+        return self._packed()
+
+    def count(self) -> int:
+        """The number of set bits (passing records)."""
+        return int.from_bytes(self._bits, "little").bit_count() + self._pending.count(1)
+
+    def count_unset(self) -> int:
+        """The number of unset bits (failing records)."""
+        return len(self) - self.count()
+
+    def _scan(self, pattern, want: int) -> Iterator[int]:
+        length = len(self)
+        bits = self._packed()
+        for match in pattern.finditer(bits):
+            byte_index = match.start()
+            byte = bits[byte_index]
+            base = byte_index << 3
+            for bit in range(8):
+                if (byte >> bit & 1) == want and base + bit < length:
+                    yield base + bit
+
+    def set_indices(self) -> Iterator[int]:
+        """The positions of the passing records."""
+        return self._scan(_NOT_ALL_CLEAR, 1)
+
+    def unset_indices(self) -> Iterator[int]:
+        """The positions of the failing records."""
+        return self._scan(_NOT_ALL_SET, 0)
+
+    def to_numpy(self):
+        """
+        The bits as a NumPy boolean array.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        import numpy
+
+        unpacked = numpy.unpackbits(numpy.frombuffer(self._packed(), dtype=numpy.uint8), bitorder="little")
+        return unpacked[: len(self)].astype(bool)
+
+    def __repr__(self) -> str:
+        return f"<Bitmap {self.count()}/{len(self)} set>"
+
+
+class ValidityMask(Bitmap):
+    """
+    The pass/fail bit for each record of a dataset.
+
+    When it was asked for, `by_expectation` holds a Bitmap for each expectation, in
+    the order of the set of expectations, with the bit set when the record met it.
+    """
+
+    __slots__ = ("by_expectation",)
+
+    def __init__(self, by_expectation: Optional[List[Bitmap]] = None):
+        super().__init__()
+        self.by_expectation = by_expectation
+
+    def passed(self) -> int:
+        """The number of records which met every expectation."""
+        return self.count()
+
+    def failed(self) -> int:
+        """The number of records which didn't meet an expectation."""
+        return self.count_unset()
+
+    def failures(self) -> Iterator[int]:
+        """The positions of the records which didn't meet an expectation."""
+        return self.unset_indices()
@@ -0,0 +1,333 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Metrics of validation: records evaluated, failures of each expectation, how long
+batches of records take to evaluate and the size of the partitioned ordering state.
+
+Metrics are off until `enable_metrics` is called, when they are off the evaluator
+pays for a single check of a module global.
+
+Each thread counts into its own accumulator, without taking a lock, and adds it to
+the collector's totals every `flush_every` records, at the end of each batch
+(`evaluate_list`, `evaluate_list_mask`) and when the thread ends. So that readers
+see up-to-date numbers, `flush` is called by `render`, `snapshot` and `write` for
+the thread calling them; counts made by other threads since their last flush aren't
+included until they flush.
+
+The collector renders as Prometheus text (or OpenMetrics), which can be served by
+a metrics endpoint or written to a file for a node exporter's textfile collector.
+"""
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COLLECTOR: Optional["MetricsCollector"] = None
+
+
+class _Counts:
+    """The counts since the last flush, of one thread or of all of them."""
+
+    __slots__ = ("records", "failed", "failures", "batches", "batch_seconds", "buckets", "updates")
+
+    def __init__(self, buckets: int):
+        self.records = 0
+        self.failed = 0
+        self.failures: Dict[Tuple[str, str], int] = {}
+        self.batches = 0
+        self.batch_seconds = 0.0
+        self.buckets = [0] * buckets
+        self.updates = 0
+
+    def add_to(self, totals: "_Counts") -> None:
+        totals.records += self.records
+        totals.failed += self.failed
+        for key, count in self.failures.items():
+            totals.failures[key] = totals.failures.get(key, 0) + count
+        totals.batches += self.batches
+        totals.batch_seconds += self.batch_seconds
+        for index, count in enumerate(self.buckets):
+            totals.buckets[index] += count
+
+    def clear(self) -> None:
+        self.records = self.failed = self.batches = self.updates = 0
+        self.batch_seconds = 0.0
+        self.failures = {}
+        self.buckets = [0] * len(self.buckets)
+
+
+class _Holder:
+    # held in thread-local storage, when the thread ends it is released and its
+    # finalizer flushes the counts it was holding
+    __slots__ = ("counts", "__weakref__")
+
+    def __init__(self, counts: _Counts):
+        self.counts = counts
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsCollector:
+    """
+    Counters of records and failures, and a histogram of batch durations.
+
+    Parameters:
+        buckets: iterable of float
+            The upper bounds, in seconds, of the batch duration histogram's buckets.
+        flush_every: int
+            How many records a thread counts before adding them to the totals.
+        prefix: str
+            The prefix of the metric names.
+    """
+
+    __slots__ = ("buckets", "flush_every", "prefix", "_lock", "_local", "_totals")
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        flush_every: int = 1000,
+        prefix: str = "data_expectations",
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.flush_every = flush_every
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._totals = _Counts(len(self.buckets) + 1)
+
+    def _counts(self) -> _Counts:
+        try:
+            return self._local.holder.counts
+        except AttributeError:
+            counts = _Counts(len(self.buckets) + 1)
+            holder = _Holder(counts)
+            weakref.finalize(holder, self._fold, counts)
+            self._local.holder = holder
+            return counts
+
+    def _fold(self, counts: _Counts) -> None:
+        with self._lock:
+            counts.add_to(self._totals)
+        counts.clear()
+
+    def record(self, failures: Iterable[Tuple[str, str]] = ()) -> None:
+        """
+        Count an evaluated record.
+
+        Parameters:
+            failures: iterable of (expectation, column)
+                The expectations the record didn't meet.
+        """
+        counts = self._counts()
+        counts.records += 1
+        failed = False
+        for key in failures:
+            counts.failures[key] = counts.failures.get(key, 0) + 1
+            failed = True
+        if failed:
+            counts.failed += 1
+        counts.updates += 1
+        if counts.updates >= self.flush_every:
+            self._fold(counts)
+
+    def record_batch(self, records: int, failed: int, failures: Dict[Tuple[str, str], int]) -> None:
+        """Count a batch of evaluated records, with the number failing each expectation."""
+        counts = self._counts()
+        counts.records += records
+        counts.failed += failed
+        for key, count in failures.items():
+            if count:
+                counts.failures[key] = counts.failures.get(key, 0) + count
+        counts.updates += records
+
+    def observe_batch(self, seconds: float) -> None:
+        """Record how long a batch took to evaluate, and flush this thread's counts."""
+        counts = self._counts()
+        counts.batches += 1
+        counts.batch_seconds += seconds
+        counts.buckets[bisect_left(self.buckets, seconds)] += 1
+        self._fold(counts)
+
+    def flush(self) -> None:
+        """Add this thread's counts to the totals."""
+        self._fold(self._counts())
+
+    def reset(self) -> None:
+        """Set the totals, and this thread's counts, back to zero."""
+        self._counts().clear()
+        with self._lock:
+            self._totals.clear()
+
+    def totals(self) -> Dict[str, Any]:
+        """The totals, as a dictionary `set_totals` accepts."""
+        self.flush()
+        with self._lock:
+            totals = self._totals
+            return {
+                "records": totals.records,
+                "failed": totals.failed,
+                "failures": dict(totals.failures),
+                "batches": totals.batches,
+                "batch_seconds": totals.batch_seconds,
+                "buckets": self.buckets,
+                "bucket_counts": list(totals.buckets),
+            }
+
+    def set_totals(self, totals: Dict[str, Any]) -> None:
+        """
+        Replace the totals, and this thread's counts, with totals from `totals`.
+
+        The histogram of batch durations is only replaced when it has the same buckets.
+        """
+        self._counts().clear()
+        with self._lock:
+            counts = self._totals
+            counts.clear()
+            counts.records = totals["records"]
+            counts.failed = totals["failed"]
+            counts.failures = dict(totals["failures"])
+            if tuple(totals["buckets"]) == self.buckets:
+                counts.batches = totals["batches"]
+                counts.batch_seconds = totals["batch_seconds"]
+                counts.buckets = list(totals["bucket_counts"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The totals, as a dictionary."""
+        self.flush()
+        with self._lock:
+            totals = self._totals
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), totals.buckets):
+                running += count
+                cumulative.append((bound, running))
+            return {
+                "records": totals.records,
+                "failed": totals.failed,
+                "failures": dict(totals.failures),
+                "batches": totals.batches,
+                "batch_seconds": totals.batch_seconds,
+                "batch_buckets": cumulative,
+            }
+
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        The totals in the Prometheus text exposition format.
+
+        Parameters:
+            openmetrics: bool
+                Render in the OpenMetrics format instead.
+
+        Returns: str
+        """
+        snapshot = self.snapshot()
+        prefix = self.prefix
+        lines = []
+
+        def counter(name: str, help_text: str, samples: list) -> None:
+            family = name if openmetrics else f"{name}_total"
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} counter")
+            for labels, value in samples:
+                lines.append(f"{name}_total{labels} {_number(value)}")
+
+        counter(f"{prefix}_records", "Records evaluated.", [("", snapshot["records"])])
+        counter(f"{prefix}_records_failed", "Records which didn't meet every expectation.", [("", snapshot["failed"])])
+        counter(
+            f"{prefix}_expectation_failures",
+            "Records which didn't meet an expectation.",
+            [
+                (f'{{expectation="{_escape(expectation)}",column="{_escape(column)}"}}', count)
+                for (expectation, column), count in sorted(snapshot["failures"].items())
+            ],
+        )
+
+        # the state of ordering expectations partitioned with `partition_by`
+        from data_expectations.internals.expectations import GLOBAL_TRACKER
+        from data_expectations.internals.partitions import partition_states
+
+        states = partition_states(GLOBAL_TRACKER)
+        if states:
+            labelled = [
+                (f'{{expectation="{_escape(state.expectation)}",column="{_escape(state.column)}"}}', state)
+                for state in states
+            ]
+            lines.append(f"# HELP {prefix}_partitions Partitions with a tracked previous value.")
+            lines.append(f"# TYPE {prefix}_partitions gauge")
+            for labels, state in labelled:
+                lines.append(f"{prefix}_partitions{labels} {len(state)}")
+            counter(
+                f"{prefix}_partition_evictions",
+                "Partitions evicted to keep within max_partitions.",
+                [(labels, state.evictions) for labels, state in labelled],
+            )
+
+        name = f"{prefix}_batch_duration_seconds"
+        lines.append(f"# HELP {name} Time taken to evaluate a batch of records.")
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in snapshot["batch_buckets"]:
+            lines.append(f'{name}_bucket{{le="{_number(float(bound))}"}} {count}')
+        lines.append(f"{name}_sum {_number(snapshot['batch_seconds'])}")
+        lines.append(f"{name}_count {snapshot['batches']}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, openmetrics: bool = False) -> None:
+        """
+        Write the rendered totals to a file, replacing it.
+
+        The file is written alongside and moved into place, so a scraper never reads
+        part of it.
+        """
+        from data_expectations.internals.files import atomic_write
+
+        data = self.render(openmetrics).encode("utf-8")
+        atomic_write(path, lambda metrics_file: metrics_file.write(data), prefix=".metrics-")
+
+
+def enable_metrics(collector: Optional[MetricsCollector] = None) -> MetricsCollector:
+    """
+    Start collecting metrics of evaluation.
+
+    Parameters:
+        collector: MetricsCollector (optional)
+            The collector to update, a new one is created if not given.
+
+    Returns: MetricsCollector
+        The collector being updated.
+    """
+    global COLLECTOR
+    COLLECTOR = collector or MetricsCollector()
+    return COLLECTOR
+
+
+def disable_metrics() -> None:
+    """Stop collecting metrics of evaluation."""
+    global COLLECTOR
+    COLLECTOR = None
@@ -15,11 +15,14 @@ from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
 from typing import Dict
+from typing import Optional
 from typing import Type
 from typing import Union
 
 from data_expectations import Behaviors
+from data_expectations.errors import ExpectationNotMetError
 from data_expectations.errors import ExpectationNotUnderstoodError
+from data_expectations.errors import format_failure
 
 
 @dataclass
@@ -139,9 +142,45 @@ class Expectation:
 
         # Handle both Behaviors enum and string expectation names
         expectation_name = self.expectation.value if isinstance(self.expectation, Behaviors) else self.expectation
-        test_logic = Expectations.all_expectations().get(expectation_name, None)
+        test_logic = Expectations.get_expectation(expectation_name)
         if not test_logic:
-            available = list(Expectations.all_expectations().keys())
-            raise ExpectationNotUnderstoodError(expectation_name, available)
+            from data_expectations.internals.registry import available_expectation_names
+
+            raise ExpectationNotUnderstoodError(expectation_name, available_expectation_names())
 
         return test_logic(row={"value": value}, column="value", ignore_nulls=self.ignore_nulls, **self.config)
+
+
+class Violation:
+    """
+    A record which didn't meet an expectation.
+
+    Violations are returned rather than raised, they are small and the message
+    describing them is only formatted when it is asked for.
+    """
+
+    __slots__ = ("expectation", "column", "record", "details", "_message")
+
+    def __init__(self, expectation: str, column: str, record: Any, details: Optional[str] = None):
+        self.expectation = expectation
+        self.column = column
+        self.record = record
+        self.details = details
+        self._message: Optional[str] = None
+
+    @property
+    def message(self) -> str:
+        """The description of the violation, formatted on first use."""
+        if self._message is None:
+            self._message = format_failure(self.expectation, self.record, self.details)
+        return self._message
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"<Violation {self.expectation} ({self.column})>"
+
+    def to_error(self) -> ExpectationNotMetError:
+        """The exception equivalent of this violation."""
+        return ExpectationNotMetError(self.expectation, self.record, self.details)
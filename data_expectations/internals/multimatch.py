@@ -0,0 +1,238 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Matching a value against many LIKE and regex patterns at once.
+
+Most LIKE patterns used in practice are literals: `abc` (equal to), `abc%` (starts
+with), `%abc` (ends with) and `%abc%` (contains). These are tested without regular
+expressions, and the "contains" literals are all found in one scan of the value
+with an Aho-Corasick automaton when there are more of them than the value has
+characters (otherwise `in` is quicker). LIKE patterns with `_` or a `%` in the
+middle, and regexes, are matched with their regular expressions; for `any`, the
+regexes without groups are combined into one alternation, which matches when any
+of them would.
+
+The results are exactly those of the patterns' regular expressions. Those don't
+let `%` match a newline, values with a newline are matched with the regular
+expressions.
+"""
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+from data_expectations.internals.text import sql_like_to_regex
+
+
+def classify_like(like: str) -> Tuple[Optional[str], str]:
+    """
+    The kind of literal a LIKE pattern is: "equals", "prefix", "suffix" or "contains",
+    with the literal, or None if it isn't a literal.
+    """
+    literal = like.strip("%")
+    if "%" in literal or "_" in literal or not literal:
+        return None, like
+    starts = like.startswith("%")
+    ends = like.endswith("%")
+    if starts and ends:
+        return "contains", literal
+    if starts:
+        return "suffix", literal
+    if ends:
+        return "prefix", literal
+    return "equals", literal
+
+
+class AhoCorasick:
+    """Finds every one of a set of literals which occurs in a text, in one scan of it."""
+
+    __slots__ = ("transitions", "failures", "outputs")
+
+    def __init__(self, literals: Sequence[str]):
+        transitions: List[Dict[str, int]] = [{}]
+        outputs: List[Set[int]] = [set()]
+        for index, literal in enumerate(literals):
+            state = 0
+            for character in literal:
+                following = transitions[state].get(character)
+                if following is None:
+                    following = len(transitions)
+                    transitions[state][character] = following
+                    transitions.append({})
+                    outputs.append(set())
+                state = following
+            outputs[state].add(index)
+
+        # breadth first, so each state's failure is set before its children's
+        failures = [0] * len(transitions)
+        queue = deque(transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, following in transitions[state].items():
+                queue.append(following)
+                fallback = failures[state]
+                while fallback and character not in transitions[fallback]:
+                    fallback = failures[fallback]
+                target = transitions[fallback].get(character, 0)
+                failures[following] = 0 if target == following else target
+                outputs[following] |= outputs[failures[following]]
+
+        self.transitions = transitions
+        self.failures = failures
+        # frozen, and None where there's nothing to report, so the scan only tests truthiness
+        self.outputs = [frozenset(output) if output else None for output in outputs]
+
+    def find(self, text: str) -> Set[int]:
+        """The indices of the literals which occur in the text."""
+        transitions = self.transitions
+        failures = self.failures
+        outputs = self.outputs
+        found: Set[int] = set()
+        state = 0
+        for character in text:
+            while state and character not in transitions[state]:
+                state = failures[state]
+            state = transitions[state].get(character, 0)
+            output = outputs[state]
+            if output is not None:
+                found |= output
+        return found
+
+
+def _combinable(pattern: "re.Pattern") -> bool:
+    # patterns with groups can't be combined, backreferences would refer to the wrong
+    # group, nor can those with flags, which would apply to the whole alternation
+    return pattern.groups == 0 and pattern.flags == re.UNICODE and isinstance(pattern.pattern, str)
+
+
+class MultiPattern:
+    """
+    A set of LIKE and regex patterns, matched against a value together.
+
+    Parameters:
+        likes: sequence of str
+            LIKE patterns.
+        regexes: sequence of str
+            Regular expressions, matched at the start of the value as `re.match` does.
+
+    Results are in the order of `likes` followed by `regexes`.
+    """
+
+    __slots__ = (
+        "size",
+        "like_regexes",
+        "equals",
+        "prefixes",
+        "suffixes",
+        "contains",
+        "automaton",
+        "general",
+        "regexes",
+        "combined",
+        "uncombined",
+    )
+
+    def __init__(self, likes: Sequence[str] = (), regexes: Sequence[str] = ()):
+        self.size = len(likes) + len(regexes)
+        # (index, regex) of every LIKE pattern, for values with newlines
+        self.like_regexes = [(index, sql_like_to_regex(like)) for index, like in enumerate(likes)]
+        self.equals: Dict[str, List[int]] = {}
+        self.prefixes: List[Tuple[int, str]] = []
+        self.suffixes: List[Tuple[int, str]] = []
+        self.contains: List[Tuple[int, str]] = []
+        self.general: List[Tuple[int, "re.Pattern"]] = []
+        for index, like in enumerate(likes):
+            kind, literal = classify_like(like)
+            if kind == "equals":
+                self.equals.setdefault(literal, []).append(index)
+            elif kind == "prefix":
+                self.prefixes.append((index, literal))
+            elif kind == "suffix":
+                self.suffixes.append((index, literal))
+            elif kind == "contains":
+                self.contains.append((index, literal))
+            else:
+                self.general.append((index, sql_like_to_regex(like)))
+        self.automaton = AhoCorasick([literal for _, literal in self.contains]) if self.contains else None
+
+        self.regexes = [(len(likes) + index, re.compile(regex)) for index, regex in enumerate(regexes)]
+        combinable = [pattern.pattern for _, pattern in self.regexes if _combinable(pattern)]
+        self.combined = None
+        if len(combinable) > 1:
+            try:
+                self.combined = re.compile("|".join(f"(?:{pattern})" for pattern in combinable))
+            except re.error:
+                # such as inline flags, which have to be at the start of a pattern
+                self.combined = None
+        self.uncombined = [
+            pattern for _, pattern in self.regexes if self.combined is None or not _combinable(pattern)
+        ]
+
+    def _contained(self, text: str) -> Set[int]:
+        # the automaton is one step per character, `in` one search per literal
+        if len(self.contains) > len(text):
+            return {self.contains[found][0] for found in self.automaton.find(text)}  # type:ignore
+        return {index for index, literal in self.contains if literal in text}
+
+    def matches(self, text: str) -> List[bool]:
+        """Whether each pattern matches the text."""
+        results = [False] * self.size
+        if "\n" in text:
+            for index, pattern in self.like_regexes:
+                results[index] = pattern.match(text) is not None
+        else:
+            for index in self.equals.get(text, ()):
+                results[index] = True
+            for index, literal in self.prefixes:
+                results[index] = text.startswith(literal)
+            for index, literal in self.suffixes:
+                results[index] = text.endswith(literal)
+            if self.contains:
+                for index in self._contained(text):
+                    results[index] = True
+            for index, pattern in self.general:
+                results[index] = pattern.match(text) is not None
+        for index, pattern in self.regexes:
+            results[index] = pattern.match(text) is not None
+        return results
+
+    def any(self, text: str) -> bool:
+        """Whether any of the patterns matches the text, stopping at the first which does."""
+        if "\n" in text:
+            if any(pattern.match(text) for _, pattern in self.like_regexes):
+                return True
+        else:
+            if text in self.equals:
+                return True
+            if any(text.startswith(literal) for _, literal in self.prefixes):
+                return True
+            if any(text.endswith(literal) for _, literal in self.suffixes):
+                return True
+            if self.contains and self._contained(text):
+                return True
+            if any(pattern.match(text) for _, pattern in self.general):
+                return True
+        if self.combined is not None and self.combined.match(text):
+            return True
+        return any(pattern.match(text) for pattern in self.uncombined)
+
+
+@lru_cache(maxsize=256)
+def multi_pattern(likes: Tuple[str, ...] = (), regexes: Tuple[str, ...] = ()) -> MultiPattern:
+    """A MultiPattern, built once for each set of patterns."""
+    return MultiPattern(likes, regexes)
@@ -0,0 +1,312 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Partial results, for validating a dataset in shards.
+
+`evaluate_shard` evaluates a contiguous run of records (a shard) on its own and
+returns a PartialResult: the number of records which failed each expectation, the
+first few violations, the sketches of the aggregate and uniqueness expectations
+and, for the ordering expectations, the values at the edges of the shard.
+
+Partial results can be merged, in any order, on any machine - they pickle. Each
+shard says where it starts in the dataset, when two shards which are next to each
+other have both been merged the first values of the later shard are compared with
+the last value of the earlier one, as they would have been if the records had been
+evaluated one after the other. Once every shard has been merged the result is the
+one a sequential evaluation would give: `met` is what `evaluate_list` returns.
+
+Repeated values in different shards are found by the merge, for exact uniqueness
+they are counted against the expectation once the shards' values are combined,
+the approximate (Bloom filter) mode estimates them.
+
+Ordering expectations with `partition_by` aren't joined across shards, records of
+the same partition should be in the same shard (see `partitions.shard_of`).
+
+The windowed (including uniqueness within a window) and gap expectations test each
+record against the records before it, which may be in another shard, so they can't
+be evaluated in shards and `evaluate_shard` raises a ValueError for them.
+"""
+import copy
+import typing
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from data_expectations.internals import expectations as expectations_module
+from data_expectations.internals.aggregates import check_sketch
+from data_expectations.internals.aggregates import sketch_key
+from data_expectations.internals.expectations import Expectations
+from data_expectations.internals.models import Expectation
+from data_expectations.internals.models import Violation
+from data_expectations.internals.plan import ORDERINGS
+from data_expectations.internals.windows import UNSHARDABLE_EXPECTATIONS
+
+
+def _name(definition: Expectation) -> str:
+    return getattr(definition.expectation, "value", definition.expectation)
+
+
+class Segment:
+    """
+    A contiguous run of records, from `start` up to (not including) `stop`.
+
+    For each ordering expectation `heads` are the (position, value, record) of the
+    values which were compared with nothing, because no value had been seen before
+    them, and `tails` the value the next record would be compared with.
+    """
+
+    __slots__ = ("start", "stop", "heads", "tails")
+
+    def __init__(self, start: int, stop: int, heads: Dict[int, list], tails: Dict[int, Any]):
+        self.start = start
+        self.stop = stop
+        self.heads = heads
+        self.tails = tails
+
+
+class PartialResult:
+    """
+    The result of evaluating some of a dataset, which can be merged with the rest.
+
+    `failed` is the number of records which didn't meet each expectation, in the
+    order the expectations were defined, `records` the number of records seen.
+    """
+
+    __slots__ = ("definitions", "records", "failed", "samples", "sample_size", "sketches", "segments")
+
+    def __init__(
+        self,
+        definitions: Tuple[Expectation, ...],
+        records: int,
+        failed: List[int],
+        samples: List[Tuple[int, Violation]],
+        sample_size: int,
+        sketches: Dict[str, Any],
+        segments: List[Segment],
+    ):
+        self.definitions = definitions
+        self.records = records
+        self.failed = failed
+        self.samples = samples
+        self.sample_size = sample_size
+        self.sketches = sketches
+        self.segments = segments
+
+    def __repr__(self) -> str:
+        return f"<PartialResult records={self.records} failed={sum(self.failed)} segments={len(self.segments)}>"
+
+    @property
+    def passed(self) -> List[int]:
+        """The number of records which met each expectation."""
+        return [self.records - failed for failed in self.failed]
+
+    @property
+    def violations(self) -> List[Violation]:
+        """The first violations, in the order of the records."""
+        return [violation for _, violation in self.samples]
+
+    @property
+    def contiguous(self) -> bool:
+        """Whether the records seen are a single run, with no shards missing between them."""
+        return len(self.segments) <= 1
+
+    def counts(self) -> List[Tuple[str, str, int, int]]:
+        """The expectation, column and number of passing and failing records for each expectation."""
+        return [
+            (_name(definition), definition.column, self.records - failed, failed)
+            for definition, failed in zip(self.definitions, self.failed)
+        ]
+
+    def aggregates(self) -> List[Tuple[str, str, bool, Any]]:
+        """The expectation, column, whether it is met and its statistic for each aggregate expectation."""
+        results = []
+        tested = set()
+        for definition in self.definitions:
+            name = _name(definition)
+            key = sketch_key(name, definition.column)
+            if key in self.sketches and (key, repr(definition.config)) not in tested:
+                tested.add((key, repr(definition.config)))
+                met, statistic = check_sketch(name, self.sketches[key], definition.config, definition.ignore_nulls)
+                results.append((name, definition.column, met, statistic))
+        return results
+
+    @property
+    def met(self) -> bool:
+        """Whether every record met every expectation and every aggregate expectation is met."""
+        return not any(self.failed) and all(met for _, _, met, _ in self.aggregates())
+
+    def merge(self, other: "PartialResult") -> "PartialResult":
+        """
+        Combine with the result of another shard, neither result is changed.
+
+        Raises:
+            ValueError: If the results are for different expectations, or overlap.
+        """
+        if [definition.dump() for definition in self.definitions] != [
+            definition.dump() for definition in other.definitions
+        ]:
+            raise ValueError("Only results for the same expectations can be merged")
+
+        failed = [a + b for a, b in zip(self.failed, other.failed)]
+        samples = sorted(self.samples + other.samples, key=lambda sample: sample[0])
+        sample_size = max(self.sample_size, other.sample_size)
+
+        sketches = copy.deepcopy(self.sketches)
+        for key, sketch in other.sketches.items():
+            if key not in sketches:
+                sketches[key] = copy.deepcopy(sketch)
+                continue
+            before = getattr(sketches[key], "repeats", 0)
+            sketches[key].merge(sketch)
+            repeats = getattr(sketches[key], "repeats", 0) - before - getattr(sketch, "repeats", 0)
+            if repeats:
+                # repeats across shards fail the (first) uniqueness expectation with this sketch
+                index = next(
+                    i for i, d in enumerate(self.definitions) if sketch_key(_name(d), d.column) == key
+                )
+                failed[index] += repeats
+
+        segments: List[Segment] = []
+        for segment in sorted(self.segments + other.segments, key=lambda segment: segment.start):
+            if segments and segment.start < segments[-1].stop:
+                raise ValueError(f"Results overlap at record {segment.start}, each shard can only be merged once")
+            if segments and segment.start == segments[-1].stop:
+                segments[-1] = self._join(segments[-1], segment, failed, samples)
+            else:
+                segments.append(segment)
+
+        samples = sorted(samples, key=lambda sample: sample[0])[:sample_size]
+        return PartialResult(
+            self.definitions, self.records + other.records, failed, samples, sample_size, sketches, segments
+        )
+
+    def _join(self, earlier: Segment, later: Segment, failed: List[int], samples: list) -> Segment:
+        heads = {}
+        tails = {}
+        for index, later_heads in later.heads.items():
+            previous = earlier.tails.get(index)
+            if previous is None:
+                heads[index] = earlier.heads.get(index, []) + later_heads
+            else:
+                heads[index] = earlier.heads.get(index, [])
+                definition = self.definitions[index]
+                in_order = ORDERINGS[_name(definition)]
+                for position, value, record in later_heads:
+                    details = None
+                    try:
+                        if in_order(previous, value):
+                            continue
+                    except (TypeError, ValueError) as err:
+                        # values which can't be compared fail, as they do in a sequence
+                        details = str(err)
+                    failed[index] += 1
+                    samples.append((position, Violation(_name(definition), definition.column, record, details)))
+            later_tail = later.tails.get(index)
+            tails[index] = previous if later_tail is None else later_tail
+        return Segment(earlier.start, later.stop, heads, tails)
+
+
+def evaluate_shard(
+    expectations: Expectations,
+    dictset: typing.Iterable[Any],
+    start: int = 0,
+    schema: Optional[Sequence[str]] = None,
+    sample_size: int = 10,
+) -> PartialResult:
+    """
+    Evaluate a shard of a dataset, independently of the rest of it.
+
+    The state of the stateful expectations isn't read or changed, each shard starts
+    as if no records had been seen.
+
+    Args:
+        expectations: The Expectations instance.
+        dictset: The records in the shard.
+        start: The position of the shard's first record in the whole dataset.
+        schema: The column names, in order, when records are tuples or lists.
+        sample_size: How many violations to keep.
+
+    Returns:
+        A PartialResult, to be merged with the results of the other shards.
+
+    Raises:
+        ExpectationNotUnderstoodError: If an expectation is not recognized.
+        ValueError: If an expectation depends on the records before each one, as
+            the windowed and gap expectations do.
+    """
+    plan = expectations.compile()
+    for step in plan.steps:
+        if step.name in UNSHARDABLE_EXPECTATIONS:
+            raise ValueError(
+                f"Expectation '{step.name}' on column '{step.definition.column}' can't be evaluated in shards, "
+                "it tests each record against the records before it"
+            )
+    definitions = tuple(step.definition for step in plan.steps)
+    orderings = [
+        (index, f"{step.name}/{step.definition.column}")
+        for index, step in enumerate(plan.steps)
+        # partitioned orderings aren't joined across shards, shard them by partition instead
+        if step.name in ORDERINGS and step.columns is None
+    ]
+    heads: Dict[int, list] = {index: [] for index, _ in orderings}
+    failed = [0] * len(plan.steps)
+    samples: List[Tuple[int, Violation]] = []
+
+    tracker = expectations_module.GLOBAL_TRACKER
+    saved = dict(tracker)
+    tracker.clear()
+    records = 0
+    try:
+        for position, record in enumerate(dictset, start):
+            records += 1
+            steps = plan.steps_for(type(record), schema)
+            indices: typing.Iterable[int] = range(len(steps))
+            check = plan.schema_for(type(record), schema)
+            if check is not None and check(record):
+                indices = check.remaining_indices
+            for index, key in orderings:
+                if tracker.get(key) is None:
+                    # nothing to compare with yet, the shard before this one may have something
+                    step = steps[index]
+                    value = step.accessor(record)
+                    if step.row_level:
+                        value = value.get(step.definition.column)
+                    if value is not None:
+                        heads[index].append((position, value, record))
+            for index in indices:
+                step = steps[index]
+                details = None
+                try:
+                    if step.test(step.accessor(record)):
+                        continue
+                except Exception as e:
+                    details = str(e)
+                failed[index] += 1
+                if len(samples) < sample_size:
+                    samples.append((position, Violation(step.name, step.definition.column, record, details)))
+
+        tails = {index: tracker.get(key) for index, key in orderings}
+        sketches = {}
+        for step in plan.aggregates:
+            key = sketch_key(step.name, step.definition.column)
+            if key in tracker:
+                sketches[key] = tracker[key]
+    finally:
+        tracker.clear()
+        tracker.update(saved)
+
+    segments = [Segment(start, start + records, heads, tails)] if records else []
+    return PartialResult(definitions, records, failed, samples, sample_size, sketches, segments)
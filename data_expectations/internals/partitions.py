@@ -0,0 +1,74 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+State for ordering expectations which are partitioned by the values of other columns.
+
+With `partition_by` the values of `expect_column_values_to_be_increasing` (or
+`_decreasing`) only need to be in order within each partition - each device or
+user - so the previous value is kept for each partition. Streams can have an
+unbounded number of partitions, so at most `max_partitions` are kept, when another
+is needed the one least recently seen is evicted. The next value of an evicted
+partition has nothing to be compared with, so passes, as the first value of a
+partition does; `evictions` counts how often this has happened, if it is high
+`max_partitions` is too low for the stream.
+
+Partitions can also be split between workers: `shard_of` is the same for a key in
+every process, so records can be routed to workers by it, and a worker configured
+with `shards` and `shard` only tracks (and tests) the partitions which are its own.
+"""
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import List
+
+from data_expectations.internals.sketches import stable_hash
+
+
+def shard_of(key: Any, shards: int) -> int:
+    """The shard a partition key belongs to, the same in every process."""
+    return stable_hash(key) % shards
+
+
+class LastValues:
+    """The previous value of each partition, least recently seen first."""
+
+    __slots__ = ("expectation", "column", "max_partitions", "values", "evictions")
+
+    def __init__(self, expectation: str, column: str, max_partitions: int):
+        self.expectation = expectation
+        self.column = column
+        self.max_partitions = max_partitions
+        self.values: OrderedDict = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def swap(self, key: Any, value: Any) -> Any:
+        """Record a partition's value, returning the one it replaces."""
+        values = self.values
+        previous = values.get(key)
+        if previous is None:
+            if key not in values and len(values) >= self.max_partitions:
+                values.popitem(last=False)
+                self.evictions += 1
+        else:
+            values.move_to_end(key)
+        # as with unpartitioned orderings, values which are false don't replace the previous value
+        values[key] = value or previous
+        return previous
+
+
+def partition_states(tracker: Dict[str, Any]) -> List[LastValues]:
+    """The partitioned ordering state in a tracker."""
+    return [state for state in tracker.values() if isinstance(state, LastValues)]
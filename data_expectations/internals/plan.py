@@ -0,0 +1,907 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compiled evaluation plans.
+
+A set of Expectations is compiled once into a Plan. Each expectation becomes a Step
+made of an accessor, which fetches the value being tested from the record, and a
+test, which checks that value with the expectation's configuration already bound
+and prepared (regular expressions compiled, column paths parsed and so on).
+
+Expectations which don't have a compiler here, such as those added by subclassing
+Expectations, are called with the whole record in the same way as the methods on
+the Expectations class are.
+
+Cross-column expectations, which compare columns within a record, are compiled in
+the same way, their accessor fetches a tuple of the values of the columns they read.
+
+Steps for expectations registered with a batch kernel also carry that kernel, bound
+to the expectation's configuration, which is used in place of the test when records
+are evaluated in batches.
+
+Tests don't depend on how records are laid out, so when records which aren't
+dictionaries are evaluated the steps are rebound with accessors for that layout;
+this happens once per record type.
+"""
+import re
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from data_expectations.errors import ExpectationNotUnderstoodError
+from data_expectations.internals import expectations as expectations_module
+from data_expectations.internals.aggregates import AGGREGATES
+from data_expectations.internals.aggregates import compile_update
+from data_expectations.internals.aggregates import sketch_key
+from data_expectations.internals.accessors import MAPPING
+from data_expectations.internals.accessors import MAPPING_LAYOUT
+from data_expectations.internals.accessors import MISSING
+from data_expectations.internals.accessors import RecordLayout
+from data_expectations.internals.accessors import RecordView
+from data_expectations.internals.accessors import compile_accessor
+from data_expectations.internals.accessors import is_path
+from data_expectations.internals.accessors import parse_column_path
+from data_expectations.internals.accessors import record_layout
+from data_expectations.internals.expressions import compile_expression
+from data_expectations.internals.models import Expectation
+from data_expectations.internals.multimatch import MultiPattern
+from data_expectations.internals.multimatch import multi_pattern
+from data_expectations.internals.partitions import LastValues
+from data_expectations.internals.partitions import shard_of
+from data_expectations.internals.registry import available_expectation_names
+from data_expectations.internals.registry import get_batch_kernel
+from data_expectations.internals.registry import get_registered_expectation
+from data_expectations.internals.text import sql_like_to_regex
+from data_expectations.internals.type_names import type_checker
+from data_expectations.internals.windows import WINDOW_EXPECTATIONS
+from data_expectations.internals.windows import compile_gaps
+from data_expectations.internals.windows import compile_unique_within_window
+from data_expectations.internals.windows import compile_window
+from data_expectations.internals.windows import window_columns
+
+Test = Callable[[Any], bool]
+
+
+def _identity(record):
+    return record
+
+
+def _always(value):
+    return True
+
+
+def _columns_accessor(columns: Tuple[str, ...], layout: RecordLayout = MAPPING_LAYOUT) -> Callable:
+    """An accessor which fetches the values of several columns as a tuple."""
+    accessors = [compile_accessor(column, None, layout) for column in columns]
+    if len(accessors) == 2:
+        first, second = accessors
+        return lambda record: (first(record), second(record))
+    return lambda record: tuple([accessor(record) for accessor in accessors])
+
+
+class Step:
+    """
+    A single compiled expectation.
+
+    `missing` is what the accessor returns for a missing column, `row_level` steps
+    are tested with the whole record rather than the value of their column. `batch`
+    is the step's batch kernel, called with the column's values as read by `values`.
+    `columns` are the columns read by cross-column steps, which are tested with a
+    tuple of their values.
+    """
+
+    __slots__ = ("name", "definition", "accessor", "test", "missing", "row_level", "batch", "values", "columns")
+
+    def __init__(
+        self,
+        name: str,
+        definition: Expectation,
+        accessor: Callable,
+        test: Test,
+        missing: Any = None,
+        row_level: bool = False,
+        batch: Optional[Callable] = None,
+        values: Optional[Callable] = None,
+        columns: Optional[Tuple[str, ...]] = None,
+    ):
+        self.name = name
+        self.definition = definition
+        self.accessor = accessor
+        self.test = test
+        self.missing = missing
+        self.row_level = row_level
+        self.batch = batch
+        self.values = values
+        self.columns = columns
+
+    def __call__(self, record) -> bool:
+        return self.test(self.accessor(record))
+
+    def __repr__(self) -> str:
+        return f"<Step {self.name} ({self.definition.column})>"
+
+    def bind(self, layout: RecordLayout) -> "Step":
+        """A copy of this step which reads records with the given layout."""
+        if self.row_level:
+            if layout.kind == MAPPING:
+                accessor: Callable = _identity
+            else:
+
+                def accessor(record):
+                    return RecordView(record, layout)
+
+        elif self.columns is not None:
+            accessor = _columns_accessor(self.columns, layout)
+        else:
+            accessor = compile_accessor(self.definition.column, self.missing, layout)
+        values = None
+        if self.values is not None:
+            values = compile_accessor(self.definition.column, None, layout)
+        return Step(
+            self.name,
+            self.definition,
+            accessor,
+            self.test,
+            self.missing,
+            self.row_level,
+            self.batch,
+            values,
+            self.columns,
+        )
+
+
+_NONE_TYPE = type(None)
+SCHEMA_EXPECTATIONS = {
+    "expect_column_to_exist",
+    "expect_column_values_to_not_be_null",
+    "expect_column_values_to_be_of_type",
+    "expect_column_values_to_be_in_type_list",
+}
+
+
+class SchemaCheck:
+    """
+    The existence, not null and type expectations of a plan, fused into one check.
+
+    A record passes when it has all of the `required` keys and the types of the
+    values of `columns` are a combination already known to pass, which is one set
+    comparison and one set lookup. Combinations which haven't been seen are checked
+    column by column, and remembered if they pass (up to `MAX_SIGNATURES`). Only
+    dictionary records with flat columns are checked this way.
+
+    When the check passes only the `remaining` steps need to be tested, at
+    `remaining_indices` in the plan, otherwise every step is, so failures are
+    reported exactly as they would have been.
+    """
+
+    MAX_SIGNATURES = 4096
+
+    __slots__ = ("steps", "required", "columns", "rules", "passing", "remaining", "remaining_indices")
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        required = set()
+        rules: Dict[str, list] = {}
+        remaining = []
+        remaining_indices = []
+        for index, step in enumerate(steps):
+            column = step.definition.column
+            if step.name not in SCHEMA_EXPECTATIONS or step.row_level or is_path(column):
+                remaining.append(step)
+                remaining_indices.append(index)
+            elif step.name == "expect_column_to_exist":
+                required.add(column)
+            else:
+                checks, nullable = rules.get(column, ([], True))
+                check = getattr(step.test, "check", None)
+                if check is not None:
+                    checks.append(check)
+                rules[column] = [checks, nullable and getattr(step.test, "nullable", False)]
+        self.required = frozenset(required)
+        self.columns = tuple(rules)
+        self.rules = tuple(rules.values())
+        self.passing: set = set()
+        self.remaining = remaining
+        self.remaining_indices = remaining_indices
+
+    def __call__(self, record) -> bool:
+        if not record.keys() >= self.required:
+            return False
+        signature = tuple(map(type, map(record.get, self.columns)))
+        if signature in self.passing:
+            return True
+        return self._learn(signature)
+
+    def select(self, record) -> List[Step]:
+        """The steps to test a record with."""
+        return self.remaining if self(record) else self.steps
+
+    def _learn(self, signature: tuple) -> bool:
+        for cls, (checks, nullable) in zip(signature, self.rules):
+            if cls is _NONE_TYPE:
+                if not nullable:
+                    return False
+            elif not all(check(cls) for check in checks):
+                return False
+        if len(self.passing) < self.MAX_SIGNATURES:
+            self.passing.add(signature)
+        return True
+
+
+def _schema_check(steps: List[Step]) -> Optional[SchemaCheck]:
+    check = SchemaCheck(steps)
+    # fusing a single expectation doesn't save anything
+    if len(steps) - len(check.remaining) < 2:
+        return None
+    return check
+
+
+# plans with at least this many steps are indexed by column
+COLUMN_INDEX_THRESHOLD = 64
+
+
+def _indexed_keys(step: Step) -> Optional[set]:
+    """The record keys a step needs to be tested for, None if it always does."""
+    definition = step.definition
+    if (
+        step.row_level
+        or step.name in AGGREGATES
+        or step.name in WINDOW_EXPECTATIONS
+        or step.name in ("expect_column_to_exist", "expect_column_values_to_not_be_null")
+        or not definition.ignore_nulls
+    ):
+        return None
+    keys = set()
+    for column in step.columns or (definition.column,):
+        keys.add(column)
+        if is_path(column):
+            keys.add(parse_column_path(column)[0])
+    return keys
+
+
+class ColumnIndex:
+    """
+    The steps of a plan indexed by the columns they read, for wide, sparse records.
+
+    A compiled step which ignores nulls passes, and changes nothing, when its column
+    is missing, so a record only needs to be tested with the steps for the keys it
+    has, and those which always need to be tested: existence and not null checks,
+    steps which don't ignore nulls, aggregates and custom expectations. The steps
+    for each set of keys are remembered (up to `MAX_KEY_SETS`), in plan order so
+    failures are reported as they would be without the index.
+    """
+
+    MAX_KEY_SETS = 4096
+
+    __slots__ = ("steps", "always", "by_key", "selected")
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        self.always: List[int] = []
+        self.by_key: Dict[Any, List[int]] = {}
+        for index, step in enumerate(steps):
+            keys = _indexed_keys(step)
+            if keys is None:
+                self.always.append(index)
+            else:
+                for key in keys:
+                    self.by_key.setdefault(key, []).append(index)
+        self.selected: Dict[tuple, List[Step]] = {}
+
+    def select(self, record) -> List[Step]:
+        """The steps to test a record with."""
+        keys = tuple(record)
+        selected = self.selected.get(keys)
+        if selected is None:
+            indices = set(self.always)
+            by_key = self.by_key
+            for key in keys:
+                if key in by_key:
+                    indices.update(by_key[key])
+            selected = [self.steps[index] for index in sorted(indices)]
+            if len(self.selected) < self.MAX_KEY_SETS:
+                self.selected[keys] = selected
+        return selected
+
+
+class Plan:
+    """
+    A compiled set of expectations, ready to be evaluated against records.
+
+    `aggregates` are the steps for aggregate expectations, which are tested once
+    all of the records have been seen. `schema` is the fused check of the plan's
+    existence, not null and type expectations, if it has enough of them.
+
+    Plans with many steps are indexed by column instead (`columns`), as the schema
+    check reads every column the plan knows of, which for wide rule sets is many
+    more than each record has.
+    """
+
+    __slots__ = ("steps", "aggregates", "schema", "columns", "_selector", "_layouts", "_schemas", "_selectors")
+
+    def __init__(self, steps: List[Step], aggregates: Optional[List[Step]] = None):
+        self.steps = steps
+        self.aggregates = aggregates or []
+        self.columns = ColumnIndex(steps) if len(steps) >= COLUMN_INDEX_THRESHOLD else None
+        self.schema = None if self.columns is not None else _schema_check(steps)
+        selector = self.columns or self.schema
+        self._selector: Optional[Callable[[Any], List[Step]]] = None if selector is None else selector.select
+        self._layouts: Dict[Any, List[Step]] = {dict: steps}
+        self._schemas: Dict[Any, Optional[SchemaCheck]] = {dict: self.schema}
+        self._selectors: Dict[Any, Optional[Callable[[Any], List[Step]]]] = {dict: self._selector}
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def steps_for(self, record_type: type, schema: Optional[Sequence[str]] = None) -> List[Step]:
+        """
+        The steps to evaluate records of a given type.
+
+        Parameters:
+            record_type: type
+                The type of the record being evaluated.
+            schema: Sequence[str] (optional)
+                The column names, in order, when records are tuples or lists.
+
+        Returns: list of Steps
+
+        Raises:
+            TypeError: If records of this type can't be evaluated.
+        """
+        key = record_type if schema is None else (record_type, tuple(schema))
+        steps = self._layouts.get(key)
+        if steps is None:
+            layout = record_layout(record_type, schema)
+            if layout is MAPPING_LAYOUT:
+                steps = self.steps
+                self._schemas[key] = self.schema
+                self._selectors[key] = self._selector
+            else:
+                steps = [step.bind(layout) for step in self.steps]
+                self._schemas[key] = None
+                self._selectors[key] = None
+            self._layouts[key] = steps
+        return steps
+
+    def record_steps(self, record: Any, schema: Optional[Sequence[str]] = None) -> List[Step]:
+        """
+        The steps a record needs to be tested with.
+
+        This is `steps_for` the record's type, less the steps fused into the schema
+        check when the record passes it, or, for indexed plans, only the steps for
+        the columns the record has.
+
+        Raises:
+            TypeError: If records of this type can't be evaluated.
+        """
+        record_type = type(record)
+        key = record_type if schema is None else (record_type, tuple(schema))
+        steps = self._layouts.get(key)
+        if steps is None:
+            steps = self.steps_for(record_type, schema)
+        selector = self._selectors.get(key)
+        if selector is not None:
+            return selector(record)
+        return steps
+
+    def schema_for(self, record_type: type, schema: Optional[Sequence[str]] = None) -> Optional[SchemaCheck]:
+        """The fused schema check for records of a given type, if there is one."""
+        self.steps_for(record_type, schema)
+        return self._schemas.get(record_type if schema is None else (record_type, tuple(schema)))
+
+
+###################################################################################
+# COMPILERS
+#
+# Each compiler takes the column and configuration of an expectation and returns a
+# test which is called with the value of the column (None when it is missing).
+#
+# A compiler may attach a `batch` to its test, which tests a list of values at once.
+#
+# Cross-column compilers also say which columns they read, from the column and
+# configuration, and their test is called with a tuple of those columns' values;
+# if they say None (ordering expectations without `partition_by`) they only read
+# their own column.
+###################################################################################
+
+COMPILERS: Dict[str, Callable[..., Test]] = {}
+COLUMNS: Dict[str, Callable[..., Tuple[str, ...]]] = {}
+# the ordering expectations, and how each compares a value with the previous one
+ORDERINGS: Dict[str, Callable[[Any, Any], bool]] = {}
+
+
+def compiles(name: str, columns: Optional[Callable[..., Tuple[str, ...]]] = None):
+    def decorator(func):
+        COMPILERS[name] = func
+        if columns is not None:
+            COLUMNS[name] = columns
+        return func
+
+    return decorator
+
+
+@compiles("expect_column_values_to_not_be_null")
+def _not_null(*, column: str, **kwargs) -> Test:
+    def test(value):
+        return value is not None
+
+    return test
+
+
+def _type_test(expected, subclasses: bool, ignore_nulls: bool) -> Test:
+    # type names are resolved now, testing a value is a lookup of its type
+    check = type_checker(expected, subclasses)
+
+    def test(value):
+        if value is None:
+            return ignore_nulls
+        return check(type(value))
+
+    def batch(values):
+        return [ignore_nulls if value is None else check(type(value)) for value in values]
+
+    # how the schema check tests the type
+    test.batch = batch  # type:ignore
+    test.check = check  # type:ignore
+    test.nullable = ignore_nulls  # type:ignore
+    return test
+
+
+@compiles("expect_column_values_to_be_of_type")
+def _of_type(*, column: str, expected_type, subclasses: bool = False, ignore_nulls: bool = True, **kwargs) -> Test:
+    return _type_test(expected_type, subclasses, ignore_nulls)
+
+
+@compiles("expect_column_values_to_be_in_type_list")
+def _in_type_list(*, column: str, type_list, subclasses: bool = False, ignore_nulls: bool = True, **kwargs) -> Test:
+    return _type_test(type_list, subclasses, ignore_nulls)
+
+
+@compiles("expect_column_values_to_be_between")
+def _between(*, column: str, minimum, maximum, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(value):
+        if value is not None:
+            return minimum <= value <= maximum
+        return ignore_nulls
+
+    return test
+
+
+@compiles("expect_column_values_to_be_more_than")
+def _more_than(*, column: str, threshold, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(value):
+        if value is not None:
+            return value > threshold
+        return ignore_nulls
+
+    return test
+
+
+@compiles("expect_column_values_to_be_less_than")
+def _less_than(*, column: str, threshold, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(value):
+        if value is not None:
+            return value < threshold
+        return ignore_nulls
+
+    return test
+
+
+def _partition_columns(partition_by) -> Tuple[str, ...]:
+    return (partition_by,) if isinstance(partition_by, str) else tuple(partition_by)
+
+
+def _ordering_columns(*, column: str, partition_by=None, **kwargs) -> Optional[Tuple[str, ...]]:
+    # partitioned orderings read the partition's columns too
+    if partition_by is None:
+        return None
+    return (column, *_partition_columns(partition_by))
+
+
+def _partitioned_ordering(
+    name: str,
+    in_order: Callable[[Any, Any], bool],
+    column: str,
+    partition_by,
+    ignore_nulls: bool,
+    max_partitions: int,
+    shards: int,
+    shard: int,
+) -> Test:
+    partition_columns = _partition_columns(partition_by)
+    if not partition_columns:
+        raise ValueError("partition_by needs at least one column")
+    if max_partitions < 1:
+        raise ValueError("max_partitions must be at least 1")
+    if not 0 <= shard < shards:
+        raise ValueError("shard must be at least 0 and less than shards")
+    key = f"{name}/{column}/{','.join(partition_columns)}"
+    tracker = expectations_module.GLOBAL_TRACKER
+    single = len(partition_columns) == 1
+
+    def test(values):
+        value = values[0]
+        if value is None:
+            return ignore_nulls
+        partition = values[1] if single else values[1:]
+        if shards > 1 and shard_of(partition, shards) != shard:
+            # another worker's partition
+            return True
+        state = tracker.get(key)
+        if state is None:
+            state = tracker[key] = LastValues(name, column, max_partitions)
+        # compared before the partition's value is replaced, as in `_ordering`
+        previous_value = state.values.get(partition)
+        result = previous_value is None or in_order(previous_value, value)
+        state.swap(partition, value)
+        return result
+
+    return test
+
+
+def _ordering(name: str, in_order: Callable[[Any, Any], bool]):
+    # shares the tracker with the `track_previous` decorated methods so the compiled
+    # and uncompiled forms see the same history and are both cleared by `reset`
+    def compiler(
+        *,
+        column: str,
+        ignore_nulls: bool = True,
+        partition_by=None,
+        max_partitions: int = 100_000,
+        shards: int = 1,
+        shard: int = 0,
+        **kwargs,
+    ) -> Test:
+        if partition_by is not None:
+            return _partitioned_ordering(
+                name, in_order, column, partition_by, ignore_nulls, max_partitions, shards, shard
+            )
+        key = f"{name}/{column}"
+        tracker = expectations_module.GLOBAL_TRACKER
+
+        def test(value):
+            previous_value = tracker.get(key)
+            # compared before the tracker moves on, as `track_previous` does, so a value
+            # which can't be compared (and fails) doesn't replace the previous value
+            result = ignore_nulls if value is None else previous_value is None or in_order(previous_value, value)
+            tracker[key] = value or previous_value
+            return result
+
+        return test
+
+    COMPILERS[name] = compiler
+    COLUMNS[name] = _ordering_columns
+    ORDERINGS[name] = in_order
+    return compiler
+
+
+_ordering("expect_column_values_to_be_increasing", lambda previous, value: previous <= value)
+_ordering("expect_column_values_to_be_decreasing", lambda previous, value: previous >= value)
+
+
+@compiles(
+    "expect_column_values_to_be_less_than_column",
+    columns=lambda *, column, other_column, **kwargs: (column, other_column),
+)
+def _less_than_column(
+    *, column: str, other_column: str, or_equal: bool = False, ignore_nulls: bool = True, **kwargs
+) -> Test:
+    def test(values):
+        value, other = values
+        if value is None or other is None:
+            return ignore_nulls
+        return value <= other if or_equal else value < other
+
+    return test
+
+
+@compiles(
+    "expect_column_values_to_sum_to",
+    columns=lambda *, column, other_columns, **kwargs: (column, *other_columns),
+)
+def _sum_to(*, column: str, other_columns, total, tolerance=0, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(values):
+        if None in values:
+            return ignore_nulls
+        return abs(sum(values) - total) <= tolerance
+
+    return test
+
+
+@compiles(
+    "expect_column_nullity_to_match_column",
+    columns=lambda *, column, other_column, **kwargs: (column, other_column),
+)
+def _nullity_matches(*, column: str, other_column: str, **kwargs) -> Test:
+    def test(values):
+        value, other = values
+        return (value is None) == (other is None)
+
+    return test
+
+
+@compiles(
+    "expect_expression_to_be_true",
+    columns=lambda *, expression, **kwargs: compile_expression(expression).columns,
+)
+def _expression(*, column: str, expression: str, ignore_nulls: bool = True, **kwargs) -> Test:
+    function = compile_expression(expression).function
+
+    def test(values):
+        if ignore_nulls and None in values:
+            return True
+        try:
+            return bool(function(*values))
+        except (ArithmeticError, TypeError, ValueError):
+            return False
+
+    return test
+
+
+@compiles("expect_column_values_to_be_in_set")
+def _in_set(*, column: str, symbols, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(value):
+        if value is not None:
+            return value in symbols
+        return ignore_nulls
+
+    return test
+
+
+def _matcher(pattern, ignore_nulls: bool, source: Tuple[str, Any]) -> Test:
+    match = pattern.match
+
+    def test(value):
+        if value is not None:
+            return match(str(value)) is not None
+        return ignore_nulls
+
+    # ("like" or "regex", pattern), so many patterns on a column can be matched together
+    test.source = source  # type:ignore
+    test.ignore_nulls = ignore_nulls  # type:ignore
+    return test
+
+
+@compiles("expect_column_values_to_match_regex")
+def _match_regex(*, column: str, regex: str, ignore_nulls: bool = True, **kwargs) -> Test:
+    return _matcher(re.compile(regex), ignore_nulls, ("regex", regex))
+
+
+@compiles("expect_column_values_to_match_like")
+def _match_like(*, column: str, like: str, ignore_nulls: bool = True, **kwargs) -> Test:
+    return _matcher(sql_like_to_regex(like), ignore_nulls, ("like", like))
+
+
+def _any_matcher(patterns: MultiPattern, ignore_nulls: bool) -> Test:
+    matches_any = patterns.any
+
+    def test(value):
+        if value is not None:
+            return matches_any(str(value))
+        return ignore_nulls
+
+    return test
+
+
+@compiles("expect_column_values_to_match_any_like")
+def _match_any_like(*, column: str, likes, ignore_nulls: bool = True, **kwargs) -> Test:
+    return _any_matcher(multi_pattern(likes=tuple(likes)), ignore_nulls)
+
+
+@compiles("expect_column_values_to_match_any_regex")
+def _match_any_regex(*, column: str, regexes, ignore_nulls: bool = True, **kwargs) -> Test:
+    return _any_matcher(multi_pattern(regexes=tuple(regexes)), ignore_nulls)
+
+
+def _length(value) -> int:
+    if not hasattr(value, "__len__"):
+        value = str(value)
+    return len(value)
+
+
+@compiles("expect_column_values_length_to_be")
+def _length_to_be(*, column: str, length: int, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(value):
+        if value is not None:
+            return _length(value) == length
+        return ignore_nulls
+
+    return test
+
+
+@compiles("expect_column_values_length_to_be_between")
+def _length_between(*, column: str, minimum: int, maximum: int, ignore_nulls: bool = True, **kwargs) -> Test:
+    def test(value):
+        if value is not None:
+            return minimum <= _length(value) <= maximum
+        return ignore_nulls
+
+    return test
+
+
+@compiles("expect_column_null_ratio_in_window_to_be_less_than", columns=window_columns)
+def _null_ratio_in_window(*, column: str, **config) -> Test:
+    return compile_window("expect_column_null_ratio_in_window_to_be_less_than", column, config)
+
+
+@compiles("expect_column_mean_in_window_to_be_between", columns=window_columns)
+def _mean_in_window(*, column: str, **config) -> Test:
+    return compile_window("expect_column_mean_in_window_to_be_between", column, config)
+
+
+@compiles("expect_column_values_to_be_unique_within_window", columns=window_columns)
+def _unique_within_window(*, column: str, **config) -> Test:
+    return compile_unique_within_window(column, config)
+
+
+@compiles("expect_column_gaps_to_be_at_most")
+def _gaps(*, column: str, max_gap, ignore_nulls: bool = True, **kwargs) -> Test:
+    return compile_gaps(column, max_gap, ignore_nulls)
+
+
+###################################################################################
+# PLAN COMPILATION
+###################################################################################
+
+
+def _compile_step(name: str, definition: Expectation, func: Callable) -> Step:
+    column = definition.column
+    config = {"ignore_nulls": definition.ignore_nulls, **definition.config}
+
+    # a subclass overriding a built-in expectation takes precedence over the compiler
+    builtin = func is get_registered_expectation(name)
+
+    if name == "expect_column_to_exist" and builtin:
+        # existence is the one test which needs to tell missing from null
+        accessor = compile_accessor(column, MISSING)
+        return Step(name, definition, accessor, lambda value: value is not MISSING, missing=MISSING)
+
+    if name in AGGREGATES and builtin:
+        try:
+            test = compile_update(name, column, config)
+        except TypeError as err:
+            raise ValueError(f"Expectation '{name}' on column '{column}' is misconfigured: {err}") from err
+        return Step(name, definition, compile_accessor(column), test)
+
+    compiler = COMPILERS.get(name)
+    if compiler is not None and builtin:
+        columns = COLUMNS.get(name)
+        try:
+            test = compiler(column=column, **config)
+            if columns is not None:
+                columns = columns(column=column, **config)
+            if columns is not None:
+                columns = tuple(columns)
+        except TypeError as err:
+            raise ValueError(f"Expectation '{name}' on column '{column}' is misconfigured: {err}") from err
+        if columns is not None:
+            return Step(name, definition, _columns_accessor(columns), test, columns=columns)
+        batch = getattr(test, "batch", None)
+        values = None if batch is None else compile_accessor(column)
+        return Step(name, definition, compile_accessor(column), test, batch=batch, values=values)
+
+    def row_test(record):
+        return func(row=record, column=column, **config)
+
+    kernel = get_batch_kernel(name)
+    if kernel is None or func is not get_registered_expectation(name):
+        return Step(name, definition, _identity, row_test, row_level=True)
+
+    def batch(values):
+        return kernel(values, column=column, **config)
+
+    return Step(name, definition, _identity, row_test, row_level=True, batch=batch, values=compile_accessor(column))
+
+
+# a column with at least this many LIKE and regex expectations has its values matched
+# against all of their patterns at once
+FUSED_PATTERNS_THRESHOLD = 4
+
+
+def _fused_matcher(patterns: MultiPattern, index: int, ignore_nulls: bool, last: list, last_batch: list) -> Test:
+    """
+    The test of one of a column's fused pattern steps. The first of the steps to see a
+    value matches it against every pattern, the others read their result from `last`;
+    `last_batch` does the same for batches of values. Both hold on to the values they
+    cached, so the identity checks can't be fooled by a reused id.
+    """
+    matches = patterns.matches
+
+    def test(value):
+        if value is None:
+            return ignore_nulls
+        if type(value) is not str:
+            return matches(str(value))[index]
+        cached_value, results = last[0]
+        if cached_value is not value:
+            results = matches(value)
+            last[0] = (value, results)
+        return results[index]
+
+    def batch(values):
+        cached_values, rows = last_batch[0]
+        if len(cached_values) != len(values) or any(a is not b for a, b in zip(cached_values, values)):
+            rows = [None if value is None else matches(str(value)) for value in values]
+            last_batch[0] = (values, rows)
+        return [ignore_nulls if row is None else row[index] for row in rows]
+
+    test.batch = batch  # type:ignore
+    return test
+
+
+def _fuse_patterns(steps: List[Step]) -> None:
+    """Match the values of columns with many LIKE and regex expectations once for all of them."""
+    by_column: Dict[str, List[Step]] = {}
+    for step in steps:
+        if getattr(step.test, "source", None) is not None:
+            by_column.setdefault(step.definition.column, []).append(step)
+
+    for column, column_steps in by_column.items():
+        if len(column_steps) < FUSED_PATTERNS_THRESHOLD:
+            continue
+        likes = [step for step in column_steps if step.test.source[0] == "like"]  # type:ignore
+        regexes = [step for step in column_steps if step.test.source[0] == "regex"]  # type:ignore
+        patterns = MultiPattern(
+            [step.test.source[1] for step in likes],  # type:ignore
+            [step.test.source[1] for step in regexes],  # type:ignore
+        )
+        last: list = [(None, ())]
+        last_batch: list = [((), ())]
+        for index, step in enumerate(likes + regexes):
+            step.test = _fused_matcher(patterns, index, step.test.ignore_nulls, last, last_batch)  # type:ignore
+            step.batch = step.test.batch  # type:ignore
+            step.values = compile_accessor(column)
+
+
+def compile_plan(expectations) -> Plan:
+    """
+    Compile a set of Expectations into a Plan.
+
+    Parameters:
+        expectations: Expectations
+            The set of expectations to compile.
+
+    Returns: Plan
+        The compiled plan.
+
+    Raises:
+        ExpectationNotUnderstoodError: If an expectation is not recognized.
+        ValueError: If an expectation's configuration can't be compiled.
+    """
+    steps = []
+    aggregates = []
+    sketches = set()
+    for definition in expectations.set_of_expectations:
+        name = getattr(definition.expectation, "value", definition.expectation)
+        func = expectations.get_expectation(name)
+        if func is None:
+            raise ExpectationNotUnderstoodError(name, available_expectation_names())
+        step = _compile_step(name, definition, func)
+        if name in AGGREGATES:
+            aggregates.append(step)
+            # repeated aggregate expectations share a sketch, only one updates it
+            key = sketch_key(name, definition.column)
+            if key in sketches:
+                step.test = _always
+            sketches.add(key)
+        steps.append(step)
+
+    _fuse_patterns(steps)
+    return Plan(steps, aggregates)
@@ -0,0 +1,216 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Proving that every record of a batch meets an expectation from the batch's statistics.
+
+Batches often come with statistics of their columns - Parquet row groups carry the
+minimum, maximum and number of nulls of each column, and batch headers or a pre-scan
+can provide the same. When every value of a column is between 1 and 10, every value
+meets `expect_column_values_to_be_between` with a minimum of 0 and a maximum of 100,
+and the values don't need to be tested one at a time.
+
+Proofs are only made for `expect_column_values_to_not_be_null`,
+`expect_column_values_to_be_between`, `expect_column_values_to_be_more_than`,
+`expect_column_values_to_be_less_than` and `expect_column_values_to_be_in_set`. When
+the statistics can't settle an expectation, because they are missing, or they allow
+values which wouldn't meet it, its values are tested as they would have been.
+
+Statistics have to describe every record they are given for: a missing column
+counts as a null, and the minimum and maximum are of the values which aren't null.
+Statistics which are wrong give wrong results.
+
+A NaN isn't between anything, and Parquet leaves NaNs out of the minimum and
+maximum, so the minimum and maximum only prove an expectation when the statistics
+say there are no NaNs (`nan_count` is 0). When the number of NaNs isn't known the
+values are tested.
+"""
+from typing import Any
+from typing import Callable
+from typing import Collection
+from typing import Dict
+from typing import Mapping
+from typing import Optional
+from typing import Set
+
+# the Parquet physical types which can't hold a NaN, FIXED_LEN_BYTE_ARRAY can hold float16s
+_WITHOUT_NANS = frozenset(("BOOLEAN", "INT32", "INT64", "INT96", "BYTE_ARRAY"))
+
+
+class ColumnStatistics:
+    """
+    What is known about the values of a column in a batch of records.
+
+    Parameters:
+        minimum: any (optional)
+            The smallest of the values which aren't null.
+        maximum: any (optional)
+            The largest of the values which aren't null.
+        null_count: int (optional)
+            How many of the values are null, or missing.
+        count: int (optional)
+            How many values there are, including nulls.
+        distinct_values: collection (optional)
+            Every value which isn't null, each at least once.
+        nan_count: int (optional)
+            How many of the values are NaN, which the minimum and maximum leave out.
+
+    Anything not known is left as None.
+    """
+
+    __slots__ = ("minimum", "maximum", "null_count", "count", "distinct_values", "nan_count")
+
+    def __init__(
+        self,
+        minimum: Any = None,
+        maximum: Any = None,
+        null_count: Optional[int] = None,
+        count: Optional[int] = None,
+        distinct_values: Optional[Collection] = None,
+        nan_count: Optional[int] = None,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.null_count = null_count
+        self.count = count
+        self.distinct_values = distinct_values
+        self.nan_count = nan_count
+
+    def __repr__(self) -> str:
+        return (
+            f"<ColumnStatistics minimum={self.minimum!r} maximum={self.maximum!r} "
+            f"null_count={self.null_count} nan_count={self.nan_count} count={self.count}>"
+        )
+
+    @classmethod
+    def from_parquet(cls, statistics, count: Optional[int] = None) -> "ColumnStatistics":
+        """
+        The statistics of a column chunk of a Parquet row group, as read by pyarrow
+        (`metadata.row_group(i).column(j).statistics`).
+
+        Parquet doesn't record the number of NaNs, so it's only known (as none) for
+        columns of types which can't hold them.
+
+        Parameters:
+            statistics: pyarrow.parquet.Statistics
+                The column chunk's statistics.
+            count: int (optional)
+                The number of rows in the row group.
+
+        Returns: ColumnStatistics
+        """
+        if statistics is None:
+            return cls(count=count)
+        has_min_max = getattr(statistics, "has_min_max", False)
+        has_null_count = getattr(statistics, "has_null_count", False)
+        return cls(
+            minimum=statistics.min if has_min_max else None,
+            maximum=statistics.max if has_min_max else None,
+            null_count=statistics.null_count if has_null_count else None,
+            count=count,
+            nan_count=0 if getattr(statistics, "physical_type", None) in _WITHOUT_NANS else None,
+        )
+
+    def all_null(self) -> bool:
+        """Whether every value is known to be null."""
+        return self.count is not None and self.null_count is not None and self.null_count >= self.count
+
+    def nulls_allowed(self, ignore_nulls: bool) -> bool:
+        """Whether the nulls in the column can't fail an expectation with this `ignore_nulls`."""
+        return ignore_nulls or self.null_count == 0
+
+    def has_range(self) -> bool:
+        """Whether the minimum and maximum are known, and there are no NaNs outside them."""
+        return self.minimum is not None and self.maximum is not None and self.nan_count == 0
+
+
+Proof = Callable[..., bool]
+PROOFS: Dict[str, Proof] = {}
+
+
+def proves(name: str):
+    """Register the proof of an expectation."""
+
+    def decorate(proof: Proof) -> Proof:
+        PROOFS[name] = proof
+        return proof
+
+    return decorate
+
+
+@proves("expect_column_values_to_not_be_null")
+def _not_null(stats: ColumnStatistics, **kwargs) -> bool:
+    return stats.null_count == 0
+
+
+def _values_meet(stats: ColumnStatistics, ignore_nulls: bool, in_range: Callable[[], bool]) -> bool:
+    # every value which isn't null meets the expectation, and the nulls don't fail it
+    if not stats.nulls_allowed(ignore_nulls):
+        return False
+    if stats.all_null():
+        return True
+    return stats.has_range() and in_range()
+
+
+@proves("expect_column_values_to_be_between")
+def _between(stats: ColumnStatistics, *, minimum, maximum, ignore_nulls: bool = True, **kwargs) -> bool:
+    return _values_meet(stats, ignore_nulls, lambda: minimum <= stats.minimum and stats.maximum <= maximum)
+
+
+@proves("expect_column_values_to_be_more_than")
+def _more_than(stats: ColumnStatistics, *, threshold, ignore_nulls: bool = True, **kwargs) -> bool:
+    return _values_meet(stats, ignore_nulls, lambda: stats.minimum > threshold)
+
+
+@proves("expect_column_values_to_be_less_than")
+def _less_than(stats: ColumnStatistics, *, threshold, ignore_nulls: bool = True, **kwargs) -> bool:
+    return _values_meet(stats, ignore_nulls, lambda: stats.maximum < threshold)
+
+
+@proves("expect_column_values_to_be_in_set")
+def _in_set(stats: ColumnStatistics, *, symbols, ignore_nulls: bool = True, **kwargs) -> bool:
+    if not stats.nulls_allowed(ignore_nulls):
+        return False
+    if stats.all_null():
+        return True
+    if stats.distinct_values is not None:
+        return all(value in symbols for value in stats.distinct_values)
+    # a single value
+    return stats.has_range() and stats.minimum == stats.maximum and stats.minimum in symbols
+
+
+def proven_steps(steps, statistics: Optional[Mapping[str, ColumnStatistics]]) -> Set[int]:
+    """
+    The indices of the steps which every record is proven to meet by the statistics.
+
+    Only steps compiled from the built-in expectations are proven, expectations
+    overridden by a subclass are always tested.
+    """
+    proven: Set[int] = set()
+    if not statistics:
+        return proven
+    for index, step in enumerate(steps):
+        proof = PROOFS.get(step.name)
+        if proof is None or step.row_level or step.columns is not None:
+            continue
+        stats = statistics.get(step.definition.column)
+        if stats is None:
+            continue
+        config = {"ignore_nulls": step.definition.ignore_nulls, **step.definition.config}
+        try:
+            if proof(stats, **config):
+                proven.add(index)
+        except (TypeError, ValueError):
+            # such as statistics which can't be compared with the configuration, or
+            # configuration the expectation itself would refuse; test the values
+            pass
+    return proven
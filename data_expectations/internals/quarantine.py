@@ -0,0 +1,275 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A quarantine (dead-letter) sink for records which fail their expectations.
+
+Putting a record in the sink only appends it to a queue, a background thread
+serializes the queued records to JSON lines and writes them in large, buffered
+writes, so the thread validating records doesn't wait for the disk. The writer
+wakes when `batch_size` records are waiting or every `flush_interval` seconds,
+whichever is first. The queue holds at most `max_pending` records, when the disk
+can't keep up `put` waits for room rather than holding ever more records in memory.
+
+Each line is `{"violations": [...], "record": {...}}`, records which are objects
+(dataclasses, named tuples, classes with `__slots__` or a `__dict__`) are written as
+their fields, values JSON can't represent (dates, decimals and so on) as strings. Files ending ".gz" are gzipped,
+each batch is appended as a gzip member so the file can be read while it is being
+written, and a file which was being written when a process stopped is readable up
+to its last complete batch.
+
+Records are serialized after `put` returns, they shouldn't be changed once they
+have been put in the sink. Sinks which are still open when the interpreter exits
+are closed then, writing the records still queued; use the sink as a context
+manager, or call `close`, to be sure they are written sooner.
+"""
+import atexit
+import dataclasses
+import gzip
+import io
+import itertools
+import json
+import queue
+import threading
+import weakref
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+
+from data_expectations.errors import ExpectationNotMetError
+from data_expectations.internals.models import Violation
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+# sinks which haven't been closed, closed when the interpreter exits
+_OPEN: "weakref.WeakSet[QuarantineSink]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_sinks() -> None:
+    for sink in list(_OPEN):
+        try:
+            sink.close()
+        except Exception:  # nosec - nothing can be done about it while exiting
+            pass
+
+
+def _slot_names(klass: type) -> Iterator[str]:
+    for base in klass.__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__"):
+                yield name
+
+
+def _jsonable(record: Any) -> Any:
+    if isinstance(record, dict):
+        return record
+    as_dict = getattr(record, "_asdict", None)
+    if as_dict is not None:
+        return as_dict()
+    if dataclasses.is_dataclass(record) and not isinstance(record, type):
+        return dataclasses.asdict(record)
+    fields = {name: getattr(record, name) for name in _slot_names(type(record)) if hasattr(record, name)}
+    if hasattr(record, "__dict__"):
+        fields.update(vars(record))
+    if fields:
+        return fields
+    return record
+
+
+def _default(value: Any) -> Any:
+    # values inside records which JSON can't represent, such as dates; nested
+    # dataclasses are written as objects, anything else as a string
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+class QuarantineSink:
+    """
+    Writes failing records, with the expectations they didn't meet, to a JSON lines file.
+
+    Parameters:
+        path: str
+            The file to append to, gzipped if it ends ".gz" (or `compress` is True).
+        batch_size: int
+            How many waiting records wake the writer.
+        flush_interval: float
+            The most seconds a record waits before being written.
+        compress: bool (optional)
+            Whether to gzip the file, by default from the file's extension.
+        max_pending: int
+            The most records waiting to be written, `put` waits when there are more.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        compress: Optional[bool] = None,
+        max_pending: int = 100_000,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.written = 0
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._put = 0
+        self._counter = itertools.count(1)
+        self._wake = threading.Event()
+        self._done = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._file = open(path, "ab", buffering=0)  # pylint: disable=consider-using-with
+        self._thread = threading.Thread(target=self._run, name="data-expectations-quarantine", daemon=True)
+        self._thread.start()
+        _OPEN.add(self)
+
+    def __enter__(self) -> "QuarantineSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Writing to the quarantine file failed: {self._error}") from self._error
+        if self._closed:
+            raise ValueError("The quarantine sink is closed")
+
+    def put(self, record: Any, violations: Iterable[str]) -> None:
+        """
+        Quarantine a record.
+
+        Parameters:
+            record: any
+                The failing record.
+            violations: iterable of str
+                The names of the expectations it didn't meet.
+        """
+        self._check()
+        item = (record, list(violations))
+        try:
+            self._pending.put_nowait(item)
+        except queue.Full:
+            # the writer is behind, wait for it to make room
+            self._wake.set()
+            while True:
+                try:
+                    self._pending.put(item, timeout=self.flush_interval)
+                    break
+                except queue.Full:
+                    self._check()
+        # next() on a counter is atomic, so records can be put from several threads
+        self._put = next(self._counter)
+        if self._pending.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def put_violations(self, violations: Sequence[Violation]) -> None:
+        """Quarantine the record of violations returned by `find_violations`."""
+        if violations:
+            self.put(violations[0].record, [violation.expectation for violation in violations])
+
+    def put_error(self, error: ExpectationNotMetError) -> None:
+        """Quarantine the record of an ExpectationNotMetError."""
+        self.put(error.record, [error.expectation])
+
+    def filter(self, expectations, dictset: Iterable[Any], schema: Optional[Sequence[str]] = None) -> Iterator[Any]:
+        """
+        Yield the records which meet every expectation, and quarantine the others.
+
+        Parameters:
+            expectations: Expectations
+                The expectations to test the records against.
+            dictset: iterable
+                The records.
+            schema: sequence of str (optional)
+                The column names, in order, when records are tuples or lists.
+        """
+        from data_expectations.internals.evaluate import find_violations
+
+        for record in dictset:
+            violations = find_violations(expectations, record, schema)
+            if violations:
+                self.put_violations(violations)
+            else:
+                yield record
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed
+            try:
+                self._write_pending()
+            except BaseException as e:  # pylint: disable=broad-except
+                self._error = e
+                closing = True
+            with self._done:
+                self._done.notify_all()
+            if closing:
+                return
+
+    def _write_pending(self) -> None:
+        pending = self._pending
+        buffer = io.BytesIO()
+        count = 0
+        while True:
+            try:
+                record, violations = pending.get_nowait()
+            except queue.Empty:
+                break
+            line = json.dumps({"violations": violations, "record": _jsonable(record)}, default=_default)
+            buffer.write(line.encode("utf-8"))
+            buffer.write(b"\n")
+            count += 1
+            if buffer.tell() >= WRITE_BUFFER_SIZE:
+                self._write(buffer.getvalue())
+                buffer = io.BytesIO()
+                self.written += count
+                count = 0
+        if buffer.tell():
+            self._write(buffer.getvalue())
+        self.written += count
+
+    def _write(self, data: bytes) -> None:
+        if self.compress:
+            data = gzip.compress(data)
+        self._file.write(data)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every record put so far has been written."""
+        self._check()
+        target = self._put
+        with self._done:
+            while self.written < target and self._error is None and self._thread.is_alive():
+                self._wake.set()
+                if not self._done.wait(timeout) and timeout is not None:
+                    break
+        self._check()
+
+    def close(self) -> None:
+        """Write the remaining records and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        _OPEN.discard(self)
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise RuntimeError(f"Writing to the quarantine file failed: {self._error}") from self._error
@@ -0,0 +1,185 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The registry of available expectations.
+
+Expectations are added to the registry with the `register_expectation` decorator,
+the built-in expectations on the Expectations class are registered this way too.
+
+Third-party packages can provide expectations through the
+`data_expectations.expectations` entry point group, the name of each entry point
+being the name of the expectation and its value either the expectation itself or a
+module which registers expectations when it is imported. Entry points are only
+looked at when an expectation which isn't registered is asked for, so importing
+data_expectations doesn't pay for a large catalogue of rules which aren't used.
+The built-in aggregate and windowed expectations are loaded the same way, their
+modules are imported when one of their expectations is first asked for.
+
+    @register_expectation
+    def expect_column_values_to_be_valid_iban(*, row, column, ignore_nulls=True, **kwargs):
+        ...
+
+An expectation can also provide a batch kernel, which is given the values of the
+column for a batch of records and returns a bool for each. Batch kernels are used
+when records are evaluated in batches (for example by `evaluate_list_mask`), the
+expectation itself is used when records are evaluated one at a time.
+
+    def valid_ibans(values, *, column, ignore_nulls=True, **kwargs):
+        ...
+
+    @register_expectation(batch=valid_ibans)
+    def expect_column_values_to_be_valid_iban(*, row, column, ignore_nulls=True, **kwargs):
+        ...
+"""
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+ENTRY_POINT_GROUP = "data_expectations.expectations"
+
+_REGISTRY: Dict[str, Callable] = {}
+_BATCH_KERNELS: Dict[str, Callable] = {}
+_ENTRY_POINTS: Optional[Dict[str, Any]] = None
+# expectation names mapped to the built-in module which registers them
+_BUILTIN_MODULES: Dict[str, str] = {}
+
+
+def register_expectation(
+    func: Optional[Callable] = None,
+    *,
+    name: Optional[str] = None,
+    batch: Optional[Callable] = None,
+):
+    """
+    Register an expectation, usable as `@register_expectation` or
+    `@register_expectation(name="expect_...", batch=...)`.
+
+    The expectation is called with the record (`row`), the `column` and the rest of
+    the expectation's configuration as keyword arguments, and returns a bool.
+
+    Parameters:
+        func: callable
+            The expectation.
+        name: str (optional)
+            The name of the expectation, the name of the function by default.
+        batch: callable (optional)
+            A batch kernel, called with a list of the column's values (nulls for
+            missing values) and the expectation's configuration as keyword
+            arguments, returning a bool for each value.
+
+    Raises:
+        ValueError: If a different expectation is already registered with the name.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        handle = name or func.__name__
+        existing = _REGISTRY.get(handle)
+        if existing is not None and existing is not func:
+            raise ValueError(f"An expectation called '{handle}' is already registered")
+        _REGISTRY[handle] = func
+        if batch is not None:
+            _BATCH_KERNELS[handle] = batch
+        return func
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def register_lazily(module: str, names: Iterable[str]) -> None:
+    """Note that a module registers these expectations, it is imported when one of them is asked for."""
+    for name in names:
+        _BUILTIN_MODULES[getattr(name, "value", name)] = module
+
+
+def _load_builtin(name: str) -> None:
+    module = _BUILTIN_MODULES.get(name)
+    if module is not None:
+        from importlib import import_module
+
+        import_module(module)
+
+
+def _entry_points() -> Dict[str, Any]:
+    global _ENTRY_POINTS
+    if _ENTRY_POINTS is None:
+        from importlib.metadata import entry_points
+
+        _ENTRY_POINTS = {entry_point.name: entry_point for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+    return _ENTRY_POINTS
+
+
+def _load_entry_point(name: str) -> None:
+    entry_point = _entry_points().get(name)
+    if entry_point is None:
+        return
+    loaded = entry_point.load()
+    # entry points can name a module which registers its expectations as it is
+    # imported, or the expectation itself
+    if name not in _REGISTRY and callable(loaded):
+        register_expectation(loaded, name=name)
+
+
+def get_registered_expectation(name: str) -> Optional[Callable]:
+    """
+    Get a registered expectation by name, looking for a plugin which provides it
+    if it isn't registered yet.
+
+    Parameters:
+        name: str
+            The name of the expectation.
+
+    Returns: callable or None
+    """
+    func = _REGISTRY.get(name)
+    if func is None and name in _BUILTIN_MODULES:
+        _load_builtin(name)
+        func = _REGISTRY.get(name)
+    if func is None:
+        _load_entry_point(name)
+        func = _REGISTRY.get(name)
+    return func
+
+
+def get_batch_kernel(name: str) -> Optional[Callable]:
+    """The batch kernel registered for an expectation, if it has one."""
+    return _BATCH_KERNELS.get(name)
+
+
+def registered_expectations(load_plugins: bool = True) -> Dict[str, Callable]:
+    """
+    All of the registered expectations.
+
+    Parameters:
+        load_plugins: bool
+            Load every plugin first, so their expectations are included.
+
+    Returns: dict
+        Expectation names mapped to the expectations.
+    """
+    for name in list(_BUILTIN_MODULES):
+        if name not in _REGISTRY:
+            _load_builtin(name)
+    if load_plugins:
+        for name in list(_entry_points()):
+            if name not in _REGISTRY:
+                _load_entry_point(name)
+    return dict(_REGISTRY)
+
+
+def available_expectation_names() -> List[str]:
+    """The names of all registered expectations and plugins, without loading the plugins."""
+    return sorted(set(_REGISTRY).union(_BUILTIN_MODULES, _entry_points()))
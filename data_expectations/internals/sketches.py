@@ -0,0 +1,263 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Mergeable summaries of a column.
+
+Each sketch is updated one value at a time in a single pass with bounded memory,
+and two sketches of the same kind can be merged, so a column can be summarized in
+chunks, or on different workers, and the summaries combined.
+
+- Moments: count, mean and standard deviation (Welford, merged with Chan et al.)
+- Extremes: minimum and maximum
+- NullCounter: the ratio of nulls
+- HyperLogLog: approximate distinct count
+- KLL: approximate quantiles
+
+Sketches which hash values use a stable hash, rather than `hash`, so sketches built
+in different processes can be merged.
+"""
+import math
+import random
+from hashlib import blake2b
+from typing import Any
+from typing import List
+from typing import Optional
+
+
+def value_bytes(value: Any) -> bytes:
+    """
+    The bytes of a value which are hashed, the same in every process.
+
+    The bytes start with the value's type, so values of different types which look
+    the same, such as "1" and 1 or b"x" and "x", aren't hashed alike.
+    """
+    if isinstance(value, bytes):
+        return b"bytes:" + value
+    if isinstance(value, str):
+        return b"str:" + value.encode("utf-8")
+    value_type = type(value)
+    return f"{value_type.__module__}.{value_type.__qualname__}:{value!r}".encode("utf-8")
+
+
+def stable_hash(value: Any) -> int:
+    """A 64 bit hash of a value which is the same in every process."""
+    return int.from_bytes(blake2b(value_bytes(value), digest_size=8).digest(), "little")
+
+
+class Moments:
+    """Running count, mean and sum of squared differences of non-null values."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: Any) -> None:
+        if value is None:
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.count:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+        return self
+
+    @property
+    def variance(self) -> Optional[float]:
+        """The sample variance, None with fewer than two values."""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stdev(self) -> Optional[float]:
+        """The sample standard deviation, None with fewer than two values."""
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+
+class Extremes:
+    """The smallest and largest non-null values."""
+
+    __slots__ = ("minimum", "maximum")
+
+    def __init__(self):
+        self.minimum: Any = None
+        self.maximum: Any = None
+
+    def update(self, value: Any) -> None:
+        if value is None:
+            return
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "Extremes") -> "Extremes":
+        self.update(other.minimum)
+        self.update(other.maximum)
+        return self
+
+
+class NullCounter:
+    """The number of values and how many of them were null."""
+
+    __slots__ = ("count", "nulls")
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+
+    def update(self, value: Any) -> None:
+        self.count += 1
+        if value is None:
+            self.nulls += 1
+
+    def merge(self, other: "NullCounter") -> "NullCounter":
+        self.count += other.count
+        self.nulls += other.nulls
+        return self
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """The fraction of values which were null, None if there were no values."""
+        if not self.count:
+            return None
+        return self.nulls / self.count
+
+
+class HyperLogLog:
+    """
+    Approximate count of distinct non-null values.
+
+    Uses 2^precision one byte registers, the standard error is about
+    1.04 / sqrt(2^precision) - 1.6% at the default precision of 12 (4KB).
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def update(self, value: Any) -> None:
+        if value is None:
+            return
+        hashed = stable_hash(value)
+        index = hashed & ((1 << self.precision) - 1)
+        remaining = hashed >> self.precision
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Only HyperLogLogs with the same precision can be merged")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    @property
+    def estimate(self) -> float:
+        """The estimated number of distinct values."""
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0**-register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # small range correction, linear counting
+            return size * math.log(size / zeros)
+        return estimate
+
+
+class KLL:
+    """
+    Approximate quantiles of non-null values (Karnin, Lang and Liberty).
+
+    Values are kept in a hierarchy of compactors, when a level fills half of its
+    values are promoted to the next level with twice the weight. The rank error is
+    about 1.7 / k of the number of values. Compaction is randomized, the generator
+    is seeded so results are repeatable.
+    """
+
+    __slots__ = ("k", "levels", "size", "count", "_random")
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.levels: List[list] = [[]]
+        self.size = 0
+        self.count = 0
+        self._random = random.Random(seed)  # nosec - not used for security
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def update(self, value: Any) -> None:
+        if value is None:
+            return
+        self.levels[0].append(value)
+        self.size += 1
+        self.count += 1
+        if self.size >= self._max_size():
+            self._compress()
+
+    def _compress(self) -> None:
+        for level, items in enumerate(self.levels):
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                offset = self._random.randint(0, 1)
+                self.levels[level + 1].extend(items[offset::2])
+                self.levels[level] = []
+                self.size = sum(len(items) for items in self.levels)
+                if self.size < self._max_size():
+                    break
+
+    def merge(self, other: "KLL") -> "KLL":
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.size = sum(len(items) for items in self.levels)
+        self.count += other.count
+        while self.size >= self._max_size():
+            self._compress()
+        return self
+
+    def quantile(self, fraction: float) -> Any:
+        """The approximate value at a fraction (0 to 1) of the way through the values."""
+        weighted = sorted((item, 1 << level) for level, items in enumerate(self.levels) for item in items)
+        if not weighted:
+            return None
+        target = fraction * sum(weight for _, weight in weighted)
+        cumulative = 0
+        for item, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return item
+        return weighted[-1][0]
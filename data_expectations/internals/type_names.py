@@ -0,0 +1,103 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Type names, as used by `expect_column_values_to_be_of_type` and `_in_type_list`.
+
+Expected types are given by name ("int", "str") and historically a value matched when
+`type(value).__name__` was one of the names. Names are now resolved to type objects
+once, when the expectation is compiled, and a value's type is looked up by identity;
+a few aliases ("integer", "string" and so on) resolve to the builtin types, and type
+objects can be given directly. Names which don't resolve, such as the names of
+application classes, are still matched against the type's name, so existing rules
+behave as they did.
+
+With `subclasses` a value also matches when its type is a subclass of an expected
+type (so `True` is an "int"). Verdicts are remembered per type, so after the first
+value of each type a check is a single dictionary lookup.
+"""
+import datetime
+import decimal
+import uuid
+from functools import lru_cache
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+# fmt:off
+TYPES: Dict[str, type] = {
+    cls.__name__: cls
+    for cls in (
+        bool, bytearray, bytes, complex, dict, float, frozenset, int, list, set, str, tuple, type(None),
+        datetime.date, datetime.datetime, datetime.time, datetime.timedelta, decimal.Decimal, uuid.UUID,
+    )
+}
+
+ALIASES: Dict[str, type] = {
+    "boolean": bool,
+    "double": float,
+    "integer": int,
+    "string": str,
+    "decimal": decimal.Decimal,
+    "uuid": uuid.UUID,
+    "null": type(None),
+}
+# fmt:on
+
+
+def resolve_type(expected: Union[str, type]) -> Optional[type]:
+    """The type object for a type name, None if the name isn't known."""
+    if isinstance(expected, type):
+        return expected
+    return TYPES.get(expected) or ALIASES.get(str(expected).lower())
+
+
+def _as_tuple(expected: Union[str, type, Iterable[Union[str, type]]]) -> Tuple[Union[str, type], ...]:
+    if isinstance(expected, (str, type)):
+        return (expected,)
+    return tuple(expected)
+
+
+def type_checker(expected: Any, subclasses: bool = False) -> Callable[[type], bool]:
+    """
+    Build a check of whether a type is one of the expected types.
+
+    Parameters:
+        expected: str, type or iterable of either
+            The expected types, by name or as type objects.
+        subclasses: bool
+            If True, subclasses of the expected types also match.
+
+    Returns: callable
+        Called with a type, returns True if it is one of the expected types.
+    """
+    return _type_checker(_as_tuple(expected), subclasses)
+
+
+@lru_cache(maxsize=1024)
+def _type_checker(expected: Tuple[Union[str, type], ...], subclasses: bool) -> Callable[[type], bool]:
+    types = tuple({cls for cls in map(resolve_type, expected) if cls is not None})
+    names = frozenset(entry.__name__ if isinstance(entry, type) else entry for entry in expected)
+    verdicts: Dict[type, bool] = dict.fromkeys(types, True)
+
+    def check(cls: type) -> bool:
+        verdict = verdicts.get(cls)
+        if verdict is None:
+            verdict = cls.__name__ in names or (subclasses and issubclass(cls, types))
+            verdicts[cls] = verdict
+        return verdict
+
+    return check
@@ -0,0 +1,380 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Memory-bounded tracking of the values seen, for `expect_column_values_to_be_unique`.
+
+Values are reduced to a 128 bit digest (see `sketches.value_bytes`), so the
+memory used doesn't depend on the size of the values, and two different values
+having the same digest is vanishingly unlikely.
+
+ExactSeen keeps digests in a set until it holds `max_keys_in_memory` of them, then
+appends them to partition files on local disk (partitioned by digest, so repeats of
+a value always land in the same partition) and starts again with an empty set.
+Repeats of digests in memory are found as they are seen, repeats of digests which
+were spilled are found by `finish`, which reads back one partition at a time, and
+splits partitions with more than `max_keys_in_memory` distinct digests again.
+
+Each ExactSeen spills into a directory of its own, created in `spill_directory`
+(or the system's temporary directory), which is removed when it is closed
+(`Expectations.reset` closes them) or no longer used.
+
+BloomSeen is a Bloom filter, sized from the expected number of values and the false
+positive rate, it finds every repeat as it is seen in fixed memory, but a value
+which hasn't been seen is wrongly reported as a repeat at about the false positive
+rate.
+"""
+import math
+import os
+import shutil
+import tempfile
+import weakref
+from hashlib import blake2b
+from typing import Any
+from typing import Iterator
+from typing import Optional
+
+from data_expectations.internals.sketches import value_bytes
+
+DIGEST_SIZE = 16
+# spill files are read a megabyte at a time
+SPILL_CHUNK_SIZE = DIGEST_SIZE * 65536
+
+
+def digest(value: Any) -> bytes:
+    """The 128 bit digest a value is tracked by."""
+    return blake2b(value_bytes(value), digest_size=DIGEST_SIZE).digest()
+
+
+def spill_chunks(path: str) -> Iterator[bytes]:
+    """The digests in a spill file, a chunk at a time."""
+    with open(path, "rb") as spill_file:
+        while True:
+            chunk = spill_file.read(SPILL_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _digests(chunk: bytes) -> Iterator[bytes]:
+    return (chunk[i : i + DIGEST_SIZE] for i in range(0, len(chunk), DIGEST_SIZE))
+
+
+class SpillFile:
+    """
+    A file of spilled digests, as it is copied or pickled.
+
+    Copies and pickles read the digests a chunk at a time, as the items of a list,
+    and append them a chunk at a time to a new temporary file, so a spill file is
+    never read into memory. Checkpoints write the file after the pickle instead.
+    """
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="data_expectations_")
+            os.close(handle)
+        self.path = path
+
+    def __reduce__(self):
+        return (SpillFile, (), None, spill_chunks(self.path))
+
+    def append(self, chunk: bytes) -> None:
+        with open(self.path, "ab") as spill_file:
+            spill_file.write(chunk)
+
+    def extend(self, chunks) -> None:
+        with open(self.path, "ab") as spill_file:
+            for chunk in chunks:
+                spill_file.write(chunk)
+
+
+class ExactSeen:
+    """The digests seen so far, spilling to disk partitions beyond a memory budget."""
+
+    __slots__ = (
+        "max_keys_in_memory",
+        "partitions",
+        "spill_directory",
+        "directory",
+        "seen",
+        "spills",
+        "_cleanup",
+        "__weakref__",
+    )
+
+    def __init__(
+        self, max_keys_in_memory: int = 1_000_000, partitions: int = 16, spill_directory: Optional[str] = None
+    ):
+        self.max_keys_in_memory = max_keys_in_memory
+        self.partitions = partitions
+        self.spill_directory = spill_directory
+        self.directory: Optional[str] = None
+        self._cleanup: Optional[weakref.finalize] = None
+        self.seen: set = set()
+        self.spills = 0
+
+    def __getstate__(self):
+        # the spilled digests are part of the state, the spill directory won't outlive it
+        spilled = {}
+        if self.directory is not None:
+            for partition in range(self.partitions):
+                path = self._partition_path(partition)
+                if os.path.exists(path):
+                    spilled[partition] = SpillFile(path)
+        return (self.max_keys_in_memory, self.partitions, self.spill_directory, self.seen, self.spills, spilled)
+
+    def __setstate__(self, state):
+        self.max_keys_in_memory, self.partitions, self.spill_directory, self.seen, self.spills, spilled = state
+        self.directory = None
+        self._cleanup = None
+        if spilled:
+            self._spill_directory()
+            for partition, spill in spilled.items():
+                path = self._partition_path(partition)
+                if isinstance(spill, bytes):
+                    # checkpoints written before spill files were copied in chunks
+                    with open(path, "wb") as spill_file:
+                        spill_file.write(spill)
+                else:
+                    shutil.move(spill.path, path)
+
+    def _spill_directory(self) -> None:
+        if self.directory is None:
+            if self.spill_directory is not None:
+                os.makedirs(self.spill_directory, exist_ok=True)
+            # a directory of its own, so nothing else spills into its partitions
+            self.directory = tempfile.mkdtemp(prefix="data_expectations_", dir=self.spill_directory)
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    def close(self) -> None:
+        """Forget the digests seen, removing the spill directory."""
+        if self._cleanup is not None:
+            self._cleanup()
+        self.directory = None
+        self._cleanup = None
+        self.seen = set()
+        self.spills = 0
+
+    def update(self, key: bytes) -> bool:
+        """Add a digest, returning False if it is known to be a repeat."""
+        seen = self.seen
+        if key in seen:
+            return False
+        seen.add(key)
+        if len(seen) >= self.max_keys_in_memory:
+            self._spill()
+        return True
+
+    def _partition_path(self, partition: int) -> str:
+        return os.path.join(self.directory, f"partition-{partition:04d}.bin")  # type:ignore
+
+    def _spill(self) -> None:
+        if not self.seen:
+            return
+        self._spill_directory()
+
+        self._append(self.seen)
+        self.seen = set()
+        self.spills += 1
+
+    def _append(self, keys) -> None:
+        partitioned: list = [[] for _ in range(self.partitions)]
+        for key in keys:
+            partitioned[key[0] % self.partitions].append(key)
+        for partition, partition_keys in enumerate(partitioned):
+            if partition_keys:
+                with open(self._partition_path(partition), "ab") as spill_file:
+                    spill_file.write(b"".join(partition_keys))
+
+    def merge(self, other: "ExactSeen") -> int:
+        """
+        Add the digests seen by another ExactSeen.
+
+        Returns: int
+            The number of digests seen by both, found now, repeats of spilled
+            digests are found by `finish`.
+        """
+        if not self.spills and not other.spills:
+            repeats = len(self.seen & other.seen)
+            self.seen |= other.seen
+            if len(self.seen) >= self.max_keys_in_memory:
+                self._spill()
+            return repeats
+
+        self._spill_directory()
+        self._append(other.seen)
+        for partition in range(other.partitions if other.directory is not None else 0):
+            path = other._partition_path(partition)
+            if os.path.exists(path):
+                for chunk in spill_chunks(path):
+                    self._append(_digests(chunk))
+        self.spills += 1
+        return 0
+
+    def finish(self) -> int:
+        """
+        Find repeats of digests which were spilled to disk.
+
+        Returns: int
+            The number of repeats which weren't found as they were seen.
+        """
+        if not self.spills:
+            return 0
+        self._spill()
+        repeats = 0
+        for partition in range(self.partitions):
+            path = self._partition_path(partition)
+            if os.path.exists(path):
+                repeats += self._repeats(path, 1)
+        return repeats
+
+    def _repeats(self, path: str, depth: int) -> int:
+        # the digests of a file are counted in memory when there are few enough distinct
+        # digests, otherwise the file is split again by the next byte of the digests
+        count = 0
+        distinct: set = set()
+        for chunk in spill_chunks(path):
+            count += len(chunk) // DIGEST_SIZE
+            distinct.update(_digests(chunk))
+            if len(distinct) > self.max_keys_in_memory and depth < DIGEST_SIZE:
+                break
+        else:
+            return count - len(distinct)
+        distinct.clear()
+
+        parts = [f"{path}.{part}" for part in range(self.partitions)]
+        try:
+            for chunk in spill_chunks(path):
+                partitioned: list = [[] for _ in parts]
+                for key in _digests(chunk):
+                    partitioned[key[depth] % self.partitions].append(key)
+                for part, part_keys in zip(parts, partitioned):
+                    if part_keys:
+                        with open(part, "ab") as part_file:
+                            part_file.write(b"".join(part_keys))
+            return sum(self._repeats(part, depth + 1) for part in parts if os.path.exists(part))
+        finally:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+
+
+class BloomSeen:
+    """The digests seen so far, approximately, in a Bloom filter."""
+
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, capacity: int = 10_000_000, false_positive_rate: float = 0.001):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def update(self, key: bytes) -> bool:
+        """Add a digest, returning False if it has probably been seen before."""
+        first = int.from_bytes(key[:8], "little")
+        second = int.from_bytes(key[8:], "little") | 1
+        bits = self.bits
+        size = self.size
+        seen = True
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                seen = False
+                bits[byte] |= mask
+        return not seen
+
+    def _cardinality(self, bits: bytearray) -> float:
+        # Swamidass and Baldi's estimate of the number of values in a filter
+        set_bits = int.from_bytes(bits, "little").bit_count()
+        if set_bits >= self.size:
+            return float(self.size)
+        return -self.size / self.hashes * math.log(1 - set_bits / self.size)
+
+    def merge(self, other: "BloomSeen") -> int:
+        """
+        Add the digests seen by another BloomSeen of the same size.
+
+        Returns: int
+            An estimate of the number of digests seen by both.
+        """
+        if (self.size, self.hashes) != (other.size, other.hashes):
+            raise ValueError("Only Bloom filters with the same capacity and false positive rate can be merged")
+        length = len(self.bits)
+        union = bytearray(
+            (int.from_bytes(self.bits, "little") | int.from_bytes(other.bits, "little")).to_bytes(length, "little")
+        )
+        repeats = self._cardinality(self.bits) + self._cardinality(other.bits) - self._cardinality(union)
+        self.bits = union
+        return max(0, round(repeats))
+
+    def finish(self) -> int:
+        """Every repeat is reported as it is seen."""
+        return 0
+
+
+class Uniqueness:
+    """The values seen by an `expect_column_values_to_be_unique` expectation."""
+
+    __slots__ = ("seen", "ignore_nulls", "repeats")
+
+    def __init__(
+        self,
+        *,
+        mode: str = "exact",
+        ignore_nulls: bool = True,
+        max_keys_in_memory: int = 1_000_000,
+        partitions: int = 16,
+        spill_directory: Optional[str] = None,
+        capacity: int = 10_000_000,
+        false_positive_rate: float = 0.001,
+        **kwargs,
+    ):
+        if mode == "exact":
+            self.seen: Any = ExactSeen(max_keys_in_memory, partitions, spill_directory)
+        elif mode == "approximate":
+            self.seen = BloomSeen(capacity, false_positive_rate)
+        else:
+            raise ValueError(f"Unknown uniqueness mode '{mode}', expected 'exact' or 'approximate'")
+        self.ignore_nulls = ignore_nulls
+        self.repeats = 0
+
+    def update(self, value: Any) -> bool:
+        """Add a value, returning False if it is a repeat (or a null which isn't ignored)."""
+        if value is None:
+            return self.ignore_nulls
+        if self.seen.update(digest(value)):
+            return True
+        self.repeats += 1
+        return False
+
+    def close(self) -> None:
+        """Forget the values seen, removing any which were spilled to disk."""
+        close = getattr(self.seen, "close", None)
+        if close is not None:
+            close()
+
+    @property
+    def late_repeats(self) -> int:
+        """Repeats which could only be found once all of the values had been seen."""
+        return self.seen.finish()
+
+    def merge(self, other: "Uniqueness") -> "Uniqueness":
+        """Add the values seen by another Uniqueness, values seen by both are repeats."""
+        if type(self.seen) is not type(other.seen):
+            raise ValueError("Only uniqueness expectations with the same mode can be merged")
+        self.repeats += other.repeats + self.seen.merge(other.seen)
+        return self
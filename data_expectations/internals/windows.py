@@ -0,0 +1,407 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sliding-window expectations, rolling quality signals for streams.
+
+- expect_column_null_ratio_in_window_to_be_less_than (column, threshold, window:100,
+  time_column, window_seconds, max_records:100000, min_records:1)
+- expect_column_mean_in_window_to_be_between (column, minimum, maximum, window:100,
+  time_column, window_seconds, max_records:100000, min_records:1)
+- expect_column_gaps_to_be_at_most (column, max_gap)
+- expect_column_values_to_be_unique_within_window (column, window:1000, time_column,
+  window_seconds, max_records:100000)
+
+The window is either the last `window` records or, with a `time_column` and
+`window_seconds`, the records whose time is within `window_seconds` of the latest
+(times are expected to arrive in order, at most `max_records` are kept, and a
+record without a time fails). A record fails when, once its value has been added,
+the statistic of the window is outside the bounds; nothing is tested until the
+window holds `min_records` records. Any number except a boolean counts towards a
+mean, values which aren't numbers fail.
+
+Windows are ring buffers (deques) with running totals, adding a value and evicting
+the values which have fallen out of the window is O(1), the window is never
+rescanned (except to correct floating point drift in the running sum, once for
+every window's worth of evictions).
+
+A value is unique within the window when no other record in the window has it,
+this finds the duplicates of at-least-once delivery with memory bounded by the
+size of the window, where `expect_column_values_to_be_unique` has to remember every
+value of the stream.
+
+Gaps are the differences between consecutive values of a column, such as a
+timestamp, `max_gap` is in the column's units, or seconds (or a timedelta) for
+dates and times.
+
+Like the other stateful expectations the windows are held in the GLOBAL_TRACKER,
+so they carry across calls until `Expectations.reset`, and are checkpointed.
+A window (or a gap) spanning two shards can't be tested from either shard's
+results, so `evaluate_shard` refuses these expectations.
+"""
+import datetime
+import math
+import numbers
+from collections import deque
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from data_expectations.internals import expectations as expectations_module
+from data_expectations.internals.aggregates import between
+from data_expectations.internals.aggregates import less_than
+from data_expectations.internals.registry import register_expectation
+from data_expectations.internals.uniqueness import digest
+
+
+def _numeric(value: Any) -> bool:
+    # such as Decimals and numpy numbers, but not booleans
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _time(time: Any, seconds: Optional[float]) -> Any:
+    if seconds is not None and time is None:
+        # a record without a time would never leave the window
+        raise ValueError("every record in a window of time needs a time")
+    return time
+
+
+def _capacity(size: Optional[int], seconds: Optional[float], max_records: int) -> int:
+    if seconds is None:
+        if size is None or size < 1:
+            raise ValueError("window must be at least 1")
+        return size
+    if seconds <= 0:
+        raise ValueError("window_seconds must be more than 0")
+    if max_records < 1:
+        raise ValueError("max_records must be at least 1")
+    return max_records
+
+
+def _cutoff(time: Any, seconds: float) -> Any:
+    # times at or before this have fallen out of the window
+    if isinstance(time, (datetime.datetime, datetime.date)):
+        return time - datetime.timedelta(seconds=seconds)
+    return time - seconds
+
+
+class Window:
+    """The values of the last `size` records, or of the last `seconds` of records."""
+
+    __slots__ = ("capacity", "seconds", "values", "times", "nulls", "count", "total", "evicted")
+
+    def __init__(self, size: Optional[int] = None, seconds: Optional[float] = None, max_records: int = 100_000):
+        self.capacity = _capacity(size, seconds, max_records)
+        self.seconds = seconds
+        self.values: deque = deque()
+        self.times: deque = deque()
+        self.nulls = 0
+        self.count = 0
+        self.total = 0.0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: Any, time: Any = None) -> None:
+        """Add a record's value, evicting those which fall out of the window."""
+        time = _time(time, self.seconds)
+        if len(self.values) >= self.capacity:
+            self._evict()
+        if self.seconds is not None:
+            cutoff = _cutoff(time, self.seconds)
+            times = self.times
+            while times and times[0] <= cutoff:
+                self._evict()
+        self.values.append(value)
+        self.times.append(time)
+        if value is None:
+            self.nulls += 1
+        elif _numeric(value):
+            self.count += 1
+            self.total += float(value)
+
+    def _evict(self) -> None:
+        value = self.values.popleft()
+        self.times.popleft()
+        if value is None:
+            self.nulls -= 1
+        elif _numeric(value):
+            self.count -= 1
+            self.total -= float(value)
+            self.evicted += 1
+            if self.evicted >= len(self.values):
+                # subtracting floats drifts, correct the running sum now and again
+                self.total = math.fsum(float(v) for v in self.values if _numeric(v))
+                self.evicted = 0
+
+    @property
+    def null_ratio(self) -> Optional[float]:
+        if not self.values:
+            return None
+        return self.nulls / len(self.values)
+
+    @property
+    def mean(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return self.total / self.count
+
+
+class RecentValues:
+    """
+    The values of the last `size` records, or of the last `seconds` of records, for
+    finding repeats.
+
+    Values are held as digests (see `uniqueness.digest`) in a ring buffer, with a
+    count of each digest in the window, so adding a value, finding whether it is
+    already in the window and evicting the oldest are all O(1), and the memory used
+    is bounded by the capacity whatever the size of the values.
+    """
+
+    __slots__ = ("capacity", "seconds", "keys", "times", "counts")
+
+    def __init__(self, size: Optional[int] = None, seconds: Optional[float] = None, max_records: int = 100_000):
+        self.capacity = _capacity(size, seconds, max_records)
+        self.seconds = seconds
+        self.keys: deque = deque()
+        self.times: deque = deque()
+        self.counts: Dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, value: Any, time: Any = None) -> bool:
+        """Add a record's value, returning False if it is already in the window."""
+        time = _time(time, self.seconds)
+        if len(self.keys) >= self.capacity:
+            self._evict()
+        if self.seconds is not None:
+            cutoff = _cutoff(time, self.seconds)
+            times = self.times
+            while times and times[0] <= cutoff:
+                self._evict()
+        # nulls take a place in the window, but are never repeats
+        key = None if value is None else digest(value)
+        self.keys.append(key)
+        self.times.append(time)
+        if key is None:
+            return True
+        counts = self.counts
+        count = counts.get(key, 0)
+        counts[key] = count + 1
+        return count == 0
+
+    def _evict(self) -> None:
+        key = self.keys.popleft()
+        self.times.popleft()
+        if key is not None:
+            count = self.counts[key] - 1
+            if count:
+                self.counts[key] = count
+            else:
+                del self.counts[key]
+
+
+# the statistic of the window each expectation tests, and how
+WINDOWED: Dict[str, Tuple[Callable[[Window], Any], Callable[..., bool]]] = {
+    "expect_column_null_ratio_in_window_to_be_less_than": (lambda window: window.null_ratio, less_than),
+    "expect_column_mean_in_window_to_be_between": (lambda window: window.mean, between),
+}
+
+
+def window_key(name: str, column: str) -> str:
+    """The key of a windowed expectation's window in the tracker."""
+    return f"{name}/{column}"
+
+
+def _new_window(
+    *,
+    window: int = 100,
+    window_seconds: Optional[float] = None,
+    time_column: Optional[str] = None,
+    max_records: int = 100_000,
+    **kwargs,
+) -> Window:
+    if (window_seconds is None) != (time_column is None):
+        raise ValueError("window_seconds and time_column are used together")
+    return Window(window, window_seconds, max_records)
+
+
+def compile_window(name: str, column: str, config: Dict[str, Any]) -> Callable[[Any], bool]:
+    """
+    A test for a plan which adds each value to the window and tests its statistic.
+
+    With a `time_column` the test is called with a (value, time) tuple.
+    """
+    tracker = expectations_module.GLOBAL_TRACKER
+    key = window_key(name, column)
+    statistic, check = WINDOWED[name]
+    min_records = config.get("min_records", 1)
+    ignore_nulls = config.get("ignore_nulls", True)
+    timed = config.get("time_column") is not None
+    numeric = name == "expect_column_mean_in_window_to_be_between"
+    # build a window, and check a statistic, now so a misconfigured expectation fails when it's compiled
+    _new_window(**config)
+    check(0, **config)
+
+    def test(value):
+        window = tracker.get(key)
+        if window is None:
+            window = tracker[key] = _new_window(**config)
+        value, time = value if timed else (value, None)
+        if numeric and value is not None and not _numeric(value):
+            # rather than leaving it out of the mean
+            raise TypeError(f"{value!r} isn't a number")
+        window.add(value, time)
+        if len(window) < min_records:
+            return True
+        current = statistic(window)
+        if current is None:
+            return ignore_nulls
+        return check(current, **config)
+
+    return test
+
+
+def _new_recent(
+    *,
+    window: int = 1000,
+    window_seconds: Optional[float] = None,
+    time_column: Optional[str] = None,
+    max_records: int = 100_000,
+    **kwargs,
+) -> RecentValues:
+    if (window_seconds is None) != (time_column is None):
+        raise ValueError("window_seconds and time_column are used together")
+    return RecentValues(window, window_seconds, max_records)
+
+
+def compile_unique_within_window(column: str, config: Dict[str, Any]) -> Callable[[Any], bool]:
+    """
+    A test for a plan which fails values already in the window.
+
+    With a `time_column` the test is called with a (value, time) tuple.
+    """
+    tracker = expectations_module.GLOBAL_TRACKER
+    key = window_key("expect_column_values_to_be_unique_within_window", column)
+    ignore_nulls = config.get("ignore_nulls", True)
+    timed = config.get("time_column") is not None
+
+    # build a window now so a misconfigured expectation fails when it's compiled
+    _new_recent(**config)
+
+    def test(value):
+        recent = tracker.get(key)
+        if recent is None:
+            recent = tracker[key] = _new_recent(**config)
+        value, time = value if timed else (value, None)
+        unique = recent.add(value, time)
+        return ignore_nulls if value is None else unique
+
+    return test
+
+
+def window_columns(*, column: str, time_column: Optional[str] = None, **kwargs) -> Optional[Tuple[str, ...]]:
+    """The columns a windowed expectation reads, None if only its own."""
+    if time_column is None:
+        return None
+    return (column, time_column)
+
+
+def compile_gaps(column: str, max_gap: Any, ignore_nulls: bool = True) -> Callable[[Any], bool]:
+    """A test of the gap between each value of a column and the latest before it."""
+    tracker = expectations_module.GLOBAL_TRACKER
+    key = f"expect_column_gaps_to_be_at_most/{column}"
+    as_timedelta = max_gap if isinstance(max_gap, datetime.timedelta) else datetime.timedelta(seconds=max_gap)
+
+    def test(value):
+        if value is None:
+            return ignore_nulls
+        previous = tracker.get(key)
+        if previous is None or value > previous:
+            tracker[key] = value
+        if previous is None:
+            return True
+        gap = value - previous
+        return gap <= (as_timedelta if isinstance(gap, datetime.timedelta) else max_gap)
+
+    return test
+
+
+def _row_level(name: str) -> None:
+    def expectation(*, row: dict, column: str, ignore_nulls: bool = True, **kwargs) -> bool:
+        config = {"ignore_nulls": ignore_nulls, **kwargs}
+        test = compile_window(name, column, config)
+        time_column = kwargs.get("time_column")
+        return test(row.get(column) if time_column is None else (row.get(column), row.get(time_column)))
+
+    expectation.__name__ = name
+    expectation.__doc__ = f"Add the value to the window for {name} and test the window."
+    register_expectation(expectation, name=name)
+
+
+for _name in WINDOWED:
+    _row_level(_name)
+
+
+@register_expectation
+def expect_column_values_to_be_unique_within_window(*, row: dict, column: str, ignore_nulls: bool = True, **kwargs):
+    """
+    Confirms that a value hasn't been seen in the column in the last `window` records, or
+    with a `time_column`, in the last `window_seconds`.
+
+    Parameters:
+        row: dict
+            The record to validate.
+        column: str
+            The column's name to validate its value.
+        ignore_nulls: bool
+            If True, null values will not cause the expectation to fail.
+
+    Returns: bool
+        True if the value isn't a repeat of one in the window.
+    """
+    config = {"ignore_nulls": ignore_nulls, **kwargs}
+    time_column = kwargs.get("time_column")
+    test = compile_unique_within_window(column, config)
+    return test(row.get(column) if time_column is None else (row.get(column), row.get(time_column)))
+
+
+# the expectations with a window, a record changes the window even when its value is missing
+WINDOW_EXPECTATIONS = frozenset((*WINDOWED, "expect_column_values_to_be_unique_within_window"))
+
+# expectations which depend on the records before each one, so can't be evaluated in shards
+UNSHARDABLE_EXPECTATIONS = frozenset((*WINDOW_EXPECTATIONS, "expect_column_gaps_to_be_at_most"))
+
+
+@register_expectation
+def expect_column_gaps_to_be_at_most(*, row: dict, column: str, max_gap: Any, ignore_nulls: bool = True, **kwargs):
+    """
+    Confirms that no value of a column is more than `max_gap` after the latest value before it.
+
+    Parameters:
+        row: dict
+            The record to validate.
+        column: str
+            The column's name to validate its value.
+        max_gap: any
+            The largest gap allowed, in the column's units, or seconds (or a timedelta) for dates and times.
+        ignore_nulls: bool
+            If True, null values will not cause the expectation to fail.
+
+    Returns: bool
+        True if the gap since the latest earlier value is no more than max_gap.
+    """
+    return compile_gaps(column, max_gap, ignore_nulls)(row.get(column))
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+
+
+# fmt:off
+DATA = [
+    {"price": 10, "sku": "a"},
+    {"price": 20, "sku": "b"},
+    {"price": None, "sku": "c"},
+    {"price": 30, "sku": "a"},
+]
+# fmt:on
+
+
+def _expectations(*definitions):
+    return de.Expectations([{"column": "price", **definition} for definition in definitions])
+
+
+def test_aggregates_met():
+    de.Expectations.reset()
+    expectations = _expectations(
+        {"expectation": "expect_column_mean_to_be_between", "minimum": 19, "maximum": 21},
+        {"expectation": "expect_column_stdev_to_be_between", "minimum": 9, "maximum": 11},
+        {"expectation": "expect_column_min_to_be_between", "minimum": 10, "maximum": 10},
+        {"expectation": "expect_column_max_to_be_between", "minimum": 30, "maximum": 30},
+        {"expectation": "expect_column_null_ratio_to_be_less_than", "threshold": 0.3},
+        {"expectation": "expect_column_quantile_to_be_between", "quantile": 0.5, "minimum": 20, "maximum": 20},
+        {"expectation": "expect_column_distinct_count_to_be_between", "column": "sku", "minimum": 2.9, "maximum": 3.1},
+    )
+    assert de.evaluate_list(expectations, DATA)
+
+
+def test_aggregates_not_met():
+    de.Expectations.reset()
+    expectations = _expectations({"expectation": "expect_column_mean_to_be_between", "minimum": 0, "maximum": 5})
+    # records never fail an aggregate expectation on their own
+    for record in DATA:
+        assert de.evaluate_record(expectations, record)
+    assert not de.evaluate_aggregates(expectations, suppress_errors=True)
+
+    with pytest.raises(ExpectationNotMetError):
+        de.evaluate_aggregates(expectations)
+
+    de.Expectations.reset()
+    assert not de.evaluate_list(expectations, DATA, suppress_errors=True)
+
+
+def test_aggregates_accumulate_until_reset():
+    de.Expectations.reset()
+    expectations = _expectations({"expectation": "expect_column_max_to_be_between", "minimum": 0, "maximum": 20})
+    assert de.evaluate_list(expectations, DATA[:2])
+    assert not de.evaluate_list(expectations, DATA[2:], suppress_errors=True)
+    de.Expectations.reset()
+    assert de.evaluate_list(expectations, DATA[:2])
+
+
+def test_repeated_aggregates_share_a_sketch():
+    de.Expectations.reset()
+    expectations = _expectations(
+        {"expectation": "expect_column_stdev_to_be_between", "minimum": 9, "maximum": 11},
+        {"expectation": "expect_column_stdev_to_be_between", "minimum": 0, "maximum": 100},
+    )
+    assert de.evaluate_list(expectations, DATA)
+
+
+def test_no_values():
+    de.Expectations.reset()
+    expectations = _expectations({"expectation": "expect_column_mean_to_be_between", "minimum": 0, "maximum": 5})
+    assert de.evaluate_list(expectations, [{"price": None}])
+
+    de.Expectations.reset()
+    expectations = _expectations(
+        {"expectation": "expect_column_mean_to_be_between", "minimum": 0, "maximum": 5, "ignore_nulls": False}
+    )
+    assert not de.evaluate_list(expectations, [{"price": None}], suppress_errors=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_aggregates_met()
+    test_aggregates_not_met()
+    test_aggregates_accumulate_until_reset()
+    test_repeated_aggregates_share_a_sketch()
+    test_no_values()
+    print("✅ okay")
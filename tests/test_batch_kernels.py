@@ -0,0 +1,127 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+from data_expectations.internals import registry
+
+
+CALLS = {"scalar": 0, "batch": 0}
+
+
+def _in_box_batch(values, *, column, low, high, ignore_nulls=True, **kwargs):
+    CALLS["batch"] += 1
+    return [ignore_nulls if value is None else low <= value <= high for value in values]
+
+
+def _in_box(*, row, column, low, high, ignore_nulls=True, **kwargs):
+    CALLS["scalar"] += 1
+    value = row.get(column)
+    if value is None:
+        return ignore_nulls
+    return low <= value <= high
+
+
+def _broken_batch(values, **kwargs):
+    raise RuntimeError("kernel failed")
+
+
+def setup_module():
+    de.register_expectation(_in_box, name="expect_column_values_to_be_in_box", batch=_in_box_batch)
+    de.register_expectation(_in_box, name="expect_column_values_to_be_in_broken_box", batch=_broken_batch)
+
+
+def teardown_module():
+    for name in ("expect_column_values_to_be_in_box", "expect_column_values_to_be_in_broken_box"):
+        registry._REGISTRY.pop(name)
+        registry._BATCH_KERNELS.pop(name)
+
+
+DATA = [{"lat": 51.5}, {"lat": 48.8}, {"lat": -33.9}, {"lat": None}, {}]
+
+
+def test_scalar_path_for_records():
+    CALLS.update(scalar=0, batch=0)
+    expectations = de.Expectations([{"expectation": "expect_column_values_to_be_in_box", "column": "lat", "low": 35, "high": 72}])
+
+    assert de.evaluate_record(expectations, DATA[0])
+    assert not de.evaluate_record(expectations, DATA[2], suppress_errors=True)
+    assert CALLS == {"scalar": 2, "batch": 0}
+
+
+def test_batch_path_for_masks():
+    CALLS.update(scalar=0, batch=0)
+    expectations = de.Expectations([{"expectation": "expect_column_values_to_be_in_box", "column": "lat", "low": 35, "high": 72}])
+
+    mask = de.evaluate_list_mask(expectations, DATA)
+    assert list(mask.failures()) == [2]
+    assert CALLS == {"scalar": 0, "batch": 1}
+
+
+def test_batch_path_for_lists():
+    CALLS.update(scalar=0, batch=0)
+    rule = {"expectation": "expect_column_values_to_be_in_box", "column": "lat", "low": 35, "high": 72}
+    expectations = de.Expectations([rule])
+    assert de.evaluate_list(expectations, DATA[:2] + DATA[3:])
+    assert CALLS == {"scalar": 0, "batch": 1}
+
+    # records the kernel fails are tested again, so they're reported as they were
+    CALLS.update(scalar=0, batch=0)
+    with pytest.raises(ExpectationNotMetError) as err:
+        de.evaluate_list(expectations, DATA)
+    assert err.value.record == DATA[2]
+    assert CALLS == {"scalar": 1, "batch": 1}
+
+    # records of other iterables are tested one at a time, and no more are read than needed
+    CALLS.update(scalar=0, batch=0)
+    read = []
+
+    def stream():
+        for record in DATA:
+            read.append(record)
+            yield record
+
+    assert not de.evaluate_list(expectations, stream(), suppress_errors=True)
+    assert read == DATA[:3]
+    assert CALLS == {"scalar": 3, "batch": 0}
+
+    # kernels of steps no record reaches aren't run
+    CALLS.update(scalar=0, batch=0)
+    exists = {"expectation": "expect_column_to_exist", "column": "lon"}
+    assert not de.evaluate_list(de.Expectations([exists, rule]), DATA, suppress_errors=True)
+    assert CALLS == {"scalar": 0, "batch": 0}
+
+    # stateful expectations stop at the record which failed
+    de.Expectations.reset()
+    increasing = {"expectation": "expect_column_values_to_be_increasing", "column": "lat"}
+    expectations = de.Expectations([increasing, rule])
+    records = [{"lat": 40}, {"lat": 50}, {"lat": 80}, {"lat": 60}]
+    assert not de.evaluate_list(expectations, records, suppress_errors=True)
+    # 80 failed the box, so 60 wasn't seen and 70 is compared with 80
+    assert [violation.expectation for violation in de.find_violations(expectations, {"lat": 70})] == [increasing["expectation"]]
+    de.Expectations.reset()
+
+
+def test_batch_kernel_errors_fall_back_to_scalar():
+    CALLS.update(scalar=0, batch=0)
+    expectations = de.Expectations(
+        [{"expectation": "expect_column_values_to_be_in_broken_box", "column": "lat", "low": 35, "high": 72}]
+    )
+
+    mask = de.evaluate_list_mask(expectations, DATA)
+    assert list(mask.failures()) == [2]
+    assert CALLS["scalar"] == len(DATA)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    setup_module()
+    test_scalar_path_for_records()
+    test_batch_path_for_masks()
+    test_batch_path_for_lists()
+    test_batch_kernel_errors_fall_back_to_scalar()
+    teardown_module()
+    print("✅ okay")
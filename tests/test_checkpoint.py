@@ -0,0 +1,168 @@
+import os
+import pickle
+import sys
+import tempfile
+import zlib
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.internals.expectations import GLOBAL_TRACKER
+from data_expectations.internals.uniqueness import ExactSeen
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_values_to_be_increasing", "column": "seq"},
+    {"expectation": "expect_column_mean_to_be_between", "column": "seq", "minimum": 0, "maximum": 100},
+    {"expectation": "expect_column_values_to_be_unique", "column": "id", "max_keys_in_memory": 4},
+    {"expectation": "expect_column_values_to_be_unique", "column": "key", "mode": "approximate", "capacity": 100},
+]
+# fmt:on
+
+
+def _record(i):
+    return {"seq": i, "id": i, "key": f"k{i}"}
+
+
+def test_resume_from_checkpoint():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.checkpoint")
+
+        de.Expectations.reset()
+        expectations = de.Expectations(set_of_expectations)
+        assert de.evaluate_list(expectations, [_record(i) for i in range(10)])
+        assert de.Expectations.checkpoint(path) == os.path.getsize(path)
+        assert os.listdir(directory) == ["state.checkpoint"]
+
+        # a restart loses the state, a new plan would let a decreasing value through
+        de.Expectations.reset()
+        assert de.evaluate_record(de.Expectations(set_of_expectations), _record(5))
+
+        de.Expectations.reset()
+        de.Expectations.restore(path)
+        expectations = de.Expectations(set_of_expectations)
+        assert not de.evaluate_record(expectations, _record(5), suppress_errors=True)
+
+        de.Expectations.restore(path)
+        assert de.evaluate_list(expectations, [_record(i) for i in range(10, 20)])
+
+        # repeats of values seen before the checkpoint, including spilled ones, are found
+        de.Expectations.restore(path)
+        assert not de.evaluate_list(expectations, [_record(i) for i in range(10, 20)] + [{"seq": 30, "id": 1}], suppress_errors=True)
+        de.Expectations.restore(path)
+        assert not de.evaluate_record(expectations, {"key": "k3"}, suppress_errors=True)
+
+
+def test_restore_replaces_state_in_place():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.checkpoint")
+        de.Expectations.reset()
+        GLOBAL_TRACKER["example"] = 1
+        de.Expectations.checkpoint(path)
+        GLOBAL_TRACKER["other"] = 2
+        tracker = GLOBAL_TRACKER
+        de.Expectations.restore(path)
+        assert tracker is GLOBAL_TRACKER
+        assert GLOBAL_TRACKER == {"example": 1}
+        de.Expectations.reset()
+
+
+def test_not_a_checkpoint():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.checkpoint")
+        with open(path, "wb") as not_a_checkpoint:
+            not_a_checkpoint.write(b"not a checkpoint")
+        with pytest.raises(ValueError):
+            de.Expectations.restore(path)
+        with open(path, "wb") as truncated:
+            truncated.write(b"DEXPCKPT\x01abc")
+        with pytest.raises(ValueError):
+            de.Expectations.restore(path)
+        with open(path, "wb") as truncated:
+            truncated.write(b"DEXPCKPT\x02abc")
+        with pytest.raises(ValueError):
+            de.Expectations.restore(path)
+
+        # cut short while copying the spilled values
+        de.Expectations.reset()
+        de.evaluate_list(de.Expectations(set_of_expectations), [_record(i) for i in range(10)])
+        de.Expectations.checkpoint(path)
+        with open(path, "rb") as checkpoint_file:
+            data = checkpoint_file.read()
+        with open(path, "wb") as truncated:
+            truncated.write(data[: len(data) - 20])
+        with pytest.raises(ValueError):
+            de.Expectations.restore(path)
+        de.Expectations.reset()
+
+
+def test_metrics_are_checkpointed():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.checkpoint")
+        de.Expectations.reset()
+        collector = de.enable_metrics()
+        try:
+            expectations = de.Expectations(set_of_expectations)
+            assert not de.evaluate_list(expectations, [_record(i) for i in range(3)] + [_record(1)], suppress_errors=True)
+            de.Expectations.checkpoint(path)
+            before = collector.snapshot()
+            assert before["records"] == 4 and before["failed"] == 1
+
+            # a restart starts a new collector, restoring carries on from the counts
+            collector = de.enable_metrics()
+            de.Expectations.restore(path)
+            after = collector.snapshot()
+            assert after["records"] == 4 and after["failed"] == 1
+            assert after["failures"] == before["failures"]
+            assert after["batch_buckets"] == before["batch_buckets"]
+        finally:
+            de.disable_metrics()
+            de.Expectations.reset()
+
+        # without metrics enabled the counts are left out, and not restored
+        de.Expectations.checkpoint(path)
+        collector = de.enable_metrics()
+        try:
+            de.Expectations.restore(path)
+            assert collector.snapshot()["records"] == 0
+        finally:
+            de.disable_metrics()
+
+
+def test_version_one_checkpoints(monkeypatch):
+    # the spilled values were part of the pickle
+    def getstate(self):
+        spilled = {}
+        for partition in range(self.partitions):
+            path = self._partition_path(partition)
+            if os.path.exists(path):
+                with open(path, "rb") as spill_file:
+                    spilled[partition] = spill_file.read()
+        return (self.max_keys_in_memory, self.partitions, None, self.seen, self.spills, spilled)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.checkpoint")
+        de.Expectations.reset()
+        expectations = de.Expectations(set_of_expectations)
+        assert de.evaluate_list(expectations, [_record(i) for i in range(10)])
+        with monkeypatch.context() as patch:
+            patch.setattr(ExactSeen, "__getstate__", getstate)
+            data = zlib.compress(pickle.dumps(dict(GLOBAL_TRACKER)))
+        with open(path, "wb") as checkpoint_file:
+            checkpoint_file.write(b"DEXPCKPT\x01" + data)
+
+        de.Expectations.reset()
+        de.Expectations.restore(path)
+        assert not de.evaluate_list(expectations, [{"seq": 30, "id": 1}], suppress_errors=True)
+        de.Expectations.reset()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_resume_from_checkpoint()
+    test_restore_replaces_state_in_place()
+    test_not_a_checkpoint()
+    test_metrics_are_checkpointed()
+    print("✅ okay")
@@ -0,0 +1,114 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+from data_expectations.internals.plan import COLUMN_INDEX_THRESHOLD
+
+
+def _wide_expectations():
+    # a few rules on each of many columns, as a multi-tenant rule set would have
+    set_of_expectations = [
+        {"expectation": "expect_column_to_exist", "column": "tenant"},
+        {"expectation": "expect_column_values_to_not_be_null", "column": "id"},
+    ]
+    for i in range(COLUMN_INDEX_THRESHOLD):
+        column = f"field_{i}"
+        set_of_expectations.append(
+            {"expectation": "expect_column_values_to_be_between", "column": column, "minimum": 0, "maximum": 10}
+        )
+        set_of_expectations.append(
+            {"expectation": "expect_column_values_to_be_of_type", "column": column, "expected_type": "int"}
+        )
+    set_of_expectations.append(
+        {"expectation": "expect_column_values_to_be_of_type", "column": "score", "expected_type": "float", "ignore_nulls": False}
+    )
+    set_of_expectations.append({"expectation": "expect_column_values_to_be_increasing", "column": "id"})
+    set_of_expectations.append({"expectation": "expect_column_values_to_be_in_set", "column": "payload.kind", "symbols": ["a"]})
+    set_of_expectations.append(
+        {"expectation": "expect_column_values_to_be_less_than_column", "column": "field_1", "other_column": "field_2"}
+    )
+    return set_of_expectations
+
+
+RECORDS = [
+    {"tenant": "a", "id": 1, "score": 1.0, "field_1": 1, "field_2": 2},
+    {"tenant": "a", "id": 2, "score": 1.0, "field_1": 3, "field_2": 2},
+    {"tenant": "a", "id": 3, "score": 1.0, "field_7": 11},
+    {"tenant": "a", "id": 4, "score": 1.0, "field_9": "x"},
+    {"id": 5, "score": 1.0},
+    {"tenant": "a", "id": 6},
+    {"tenant": "a", "id": None, "score": 1.0},
+    {"tenant": "a", "id": 3, "score": 1.0},
+    {"tenant": "a", "id": 8, "score": 1.0, "payload": {"kind": "b"}},
+    {"tenant": "a", "id": 9, "score": 1.0, "payload": {"kind": "a"}, "field_30": 4},
+]
+
+
+def _expected(set_of_expectations):
+    # each record against each expectation on its own, without the index
+    de.Expectations.reset()
+    singles = [de.Expectations([definition]) for definition in set_of_expectations]
+    expected = []
+    for record in RECORDS:
+        failing = []
+        for single in singles:
+            failing.extend((v.expectation, v.column) for v in de.find_violations(single, record))
+        expected.append(failing)
+    de.Expectations.reset()
+    return expected
+
+
+def test_wide_plans_are_indexed():
+    plan = de.Expectations(_wide_expectations()).compile()
+    assert plan.columns is not None
+    assert plan.schema is None
+    steps = plan.record_steps({"tenant": "a", "id": 1, "field_3": 4})
+    assert [(step.name, step.definition.column) for step in steps] == [
+        ("expect_column_to_exist", "tenant"),
+        ("expect_column_values_to_not_be_null", "id"),
+        ("expect_column_values_to_be_between", "field_3"),
+        ("expect_column_values_to_be_of_type", "field_3"),
+        ("expect_column_values_to_be_of_type", "score"),
+        ("expect_column_values_to_be_increasing", "id"),
+    ]
+
+    # small plans aren't
+    assert de.Expectations(_wide_expectations()[:10]).compile().columns is None
+
+
+def test_same_results_as_unindexed():
+    set_of_expectations = _wide_expectations()
+    expected = _expected(set_of_expectations)
+    indexed = de.Expectations(set_of_expectations)
+    violations = [
+        [(v.expectation, v.column) for v in de.find_violations(indexed, record)] for record in RECORDS
+    ]
+    assert violations == expected
+    de.Expectations.reset()
+
+
+def test_first_failure_is_reported():
+    indexed = de.Expectations(_wide_expectations())
+    try:
+        de.evaluate_record(indexed, {"id": None, "field_5": 50})
+        assert False, "expected a failure"  # pragma: no cover
+    except ExpectationNotMetError as err:
+        assert err.expectation == "expect_column_to_exist"
+
+
+def test_key_sets_are_remembered():
+    plan = de.Expectations(_wide_expectations()).compile()
+    first = plan.record_steps({"tenant": "a", "id": 1, "field_3": 4})
+    assert plan.record_steps({"tenant": "b", "id": 2, "field_3": 5}) is first
+    assert len(plan.columns.selected) == 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_wide_plans_are_indexed()
+    test_same_results_as_unindexed()
+    test_first_failure_is_reported()
+    test_key_sets_are_remembered()
+    print("✅ okay")
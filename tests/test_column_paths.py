@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.internals.accessors import MISSING
+from data_expectations.internals.accessors import compile_accessor
+from data_expectations.internals.accessors import parse_column_path
+
+
+# fmt:off
+RECORD = {
+    "payload": {"user": {"id": 7, "name": None}},
+    "items": [{"sku": "A-1"}, {"sku": "B-2"}],
+    "flat": 1,
+    "dotted.key": "literal",
+}
+# fmt:on
+
+
+def test_parse_column_path():
+    assert parse_column_path("flat") == ("flat",)
+    assert parse_column_path("payload.user.id") == ("payload", "user", "id")
+    assert parse_column_path("items[1].sku") == ("items", 1, "sku")
+    assert parse_column_path("/payload/user/id") == ("payload", "user", "id")
+    assert parse_column_path("/items/0/sku") == ("items", 0, "sku")
+    assert parse_column_path("/a~1b/c~0d") == ("a/b", "c~d")
+
+    with pytest.raises(ValueError):
+        parse_column_path("payload..id")
+
+
+def test_accessors():
+    assert compile_accessor("flat")(RECORD) == 1
+    assert compile_accessor("payload.user.id")(RECORD) == 7
+    assert compile_accessor("items[1].sku")(RECORD) == "B-2"
+    assert compile_accessor("/items/0/sku")(RECORD) == "A-1"
+    assert compile_accessor("dotted.key")(RECORD) == "literal"
+
+    # missing levels are nulls
+    assert compile_accessor("payload.device.id")(RECORD) is None
+    assert compile_accessor("items[5].sku")(RECORD) is None
+    assert compile_accessor("flat.child")(RECORD) is None
+    assert compile_accessor("payload.user.name", MISSING)(RECORD) is None
+    assert compile_accessor("payload.user.age", MISSING)(RECORD) is MISSING
+
+
+def test_nested_expectations():
+    expectations = de.Expectations(
+        [
+            {"expectation": "expect_column_to_exist", "column": "payload.user.id"},
+            {"expectation": "expect_column_values_to_be_between", "column": "payload.user.id", "minimum": 1, "maximum": 9},
+            {"expectation": "expect_column_values_to_match_like", "column": "items[0].sku", "like": "A-%"},
+        ]
+    )
+    assert de.evaluate_record(expectations, RECORD)
+
+    assert not de.evaluate_record(expectations, {"payload": {"user": {}}}, suppress_errors=True)
+    assert not de.evaluate_record(expectations, {"payload": None}, suppress_errors=True)
+
+    # missing intermediate levels are nulls, so they're ignored when nulls are
+    expectations = de.Expectations(
+        [{"expectation": "expect_column_values_to_be_between", "column": "a.b.c", "minimum": 1, "maximum": 9}]
+    )
+    assert de.evaluate_record(expectations, {"a": {}})
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_parse_column_path()
+    test_accessors()
+    test_nested_expectations()
+    print("✅ okay")
@@ -0,0 +1,97 @@
+import os
+import sys
+from collections import namedtuple
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations import Expectations
+
+
+def _evaluate(definition, record):
+    expectations = de.Expectations([definition])
+    return de.evaluate_record(expectations, record, suppress_errors=True)
+
+
+def test_less_than_column():
+    definition = {"expectation": "expect_column_values_to_be_less_than_column", "column": "start", "other_column": "end"}
+    assert _evaluate(definition, {"start": 1, "end": 2})
+    assert not _evaluate(definition, {"start": 2, "end": 2})
+    assert not _evaluate(definition, {"start": 3, "end": 2})
+    assert _evaluate(definition, {"start": None, "end": 2})
+    assert _evaluate(definition, {"start": 1})
+    assert _evaluate({**definition, "or_equal": True}, {"start": 2, "end": 2})
+    assert not _evaluate({**definition, "ignore_nulls": False}, {"start": 1})
+
+
+def test_sum_to():
+    definition = {
+        "expectation": "expect_column_values_to_sum_to",
+        "column": "net",
+        "other_columns": ["tax"],
+        "total": 100,
+    }
+    assert _evaluate(definition, {"net": 80, "tax": 20})
+    assert not _evaluate(definition, {"net": 80, "tax": 21})
+    assert _evaluate({**definition, "tolerance": 0.01}, {"net": 80.005, "tax": 20})
+    assert _evaluate(definition, {"net": 80, "tax": None})
+    assert not _evaluate({**definition, "ignore_nulls": False}, {"net": 80})
+
+    three = {**definition, "other_columns": ["tax", "fee"]}
+    assert _evaluate(three, {"net": 70, "tax": 20, "fee": 10})
+
+
+def test_nullity_matches_column():
+    definition = {"expectation": "expect_column_nullity_to_match_column", "column": "a", "other_column": "b"}
+    assert _evaluate(definition, {"a": 1, "b": 0})
+    assert _evaluate(definition, {"a": None})
+    assert not _evaluate(definition, {"a": 1})
+    assert not _evaluate(definition, {"b": 1})
+
+
+def test_matches_uncompiled_expectations():
+    definitions = [
+        {"column": "a", "expectation": "expect_column_values_to_be_less_than_column", "other_column": "b"},
+        {"column": "a", "expectation": "expect_column_values_to_sum_to", "other_columns": ["b"], "total": 5},
+        {"column": "a", "expectation": "expect_column_nullity_to_match_column", "other_column": "b"},
+    ]
+    records = [{"a": 2, "b": 3}, {"a": 3, "b": 2}, {"a": None, "b": 2}, {"a": None}, {"a": 1, "b": 1}]
+    for definition in definitions:
+        method = getattr(Expectations, definition["expectation"])
+        config = {k: v for k, v in definition.items() if k != "expectation"}
+        for record in records:
+            assert _evaluate(definition, record) == method(row=record, **config), (definition, record)
+
+
+def test_cross_column_on_other_shapes():
+    Row = namedtuple("Row", ["low", "high", "detail"])
+    expectations = de.Expectations(
+        [
+            {"expectation": "expect_column_values_to_be_less_than_column", "column": "low", "other_column": "high"},
+            {"expectation": "expect_column_nullity_to_match_column", "column": "low", "other_column": "detail.size"},
+        ]
+    )
+    assert de.evaluate_record(expectations, Row(1, 2, {"size": 5}))
+    assert not de.evaluate_record(expectations, Row(3, 2, {"size": 5}), suppress_errors=True)
+    assert not de.evaluate_record(expectations, Row(1, 2, {}), suppress_errors=True)
+    assert de.evaluate_record(expectations, (1, 2, {"size": 1}), schema=["low", "high", "detail"])
+
+    records = [{"low": 1, "high": 2, "detail": {"size": 1}}, {"low": 5, "high": 2, "detail": {"size": 1}}]
+    assert list(de.evaluate_list_mask(expectations, records).failures()) == [1]
+
+
+def test_misconfigured():
+    with pytest.raises(ValueError):
+        _evaluate({"expectation": "expect_column_values_to_sum_to", "column": "a", "total": 5}, {"a": 5})
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_less_than_column()
+    test_sum_to()
+    test_nullity_matches_column()
+    test_matches_uncompiled_expectations()
+    test_cross_column_on_other_shapes()
+    test_misconfigured()
+    print("✅ okay")
@@ -85,8 +85,27 @@ def test_list_of_data():
         de.evaluate_list(unknown_test, TEST_DATA, suppress_errors=True)
 
 
+def test_changed_expectations_are_used():
+    # the compiled plan isn't used once the definitions have changed
+    record = {"string_field": "string", "boolean_field": True}
+    expectations = de.Expectations(set_of_expectations)
+    assert de.evaluate_record(expectations, record)
+
+    expectations.set_of_expectations.append(de.Expectation.load(set_of_unmet_expectations[0]))
+    assert not de.evaluate_record(expectations, record, suppress_errors=True)
+    expectations.set_of_expectations.pop()
+    assert de.evaluate_record(expectations, record)
+    expectations.set_of_expectations[0] = de.Expectation.load(set_of_unmet_expectations[0])
+    assert not de.evaluate_record(expectations, record, suppress_errors=True)
+
+    expectations.set_of_expectations = [de.Expectation.load(set_of_expectations[0])]
+    assert de.evaluate_record(expectations, record)
+    assert len(expectations.compile().steps) == 1
+
+
 if __name__ == "__main__":  # pragma: no cover
     test_expectation()
     test_list_of_data()
+    test_changed_expectations_are_used()
 
     print("✅ okay")
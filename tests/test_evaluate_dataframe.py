@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+
+pandas = pytest.importorskip("pandas")
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "id"},
+    {"expectation": "expect_column_to_exist", "column": "missing"},
+    {"expectation": "expect_column_values_to_not_be_null", "column": "name"},
+    {"expectation": "expect_column_values_to_be_of_type", "column": "id", "expected_type": "int"},
+    {"expectation": "expect_column_values_to_be_of_type", "column": "name", "expected_type": "str"},
+    {"expectation": "expect_column_values_to_be_between", "column": "score", "minimum": 0, "maximum": 10},
+    {"expectation": "expect_column_values_to_be_more_than", "column": "score", "threshold": 1},
+    {"expectation": "expect_column_values_to_be_in_set", "column": "name", "symbols": ["a", "b"]},
+    {"expectation": "expect_column_values_to_match_regex", "column": "name", "regex": "[ab]"},
+    {"expectation": "expect_column_values_to_match_like", "column": "name", "like": "a%"},
+    {"expectation": "expect_column_values_length_to_be_between", "column": "name", "minimum": 1, "maximum": 1},
+    {"expectation": "expect_column_values_to_be_increasing", "column": "id"},
+    {"expectation": "expect_column_values_to_be_less_than_column", "column": "score", "other_column": "id"},
+]
+# fmt:on
+
+RECORDS = [
+    {"id": 1, "name": "a", "score": 0.5},
+    {"id": 2, "name": "b", "score": 5.0},
+    {"id": 3, "name": None, "score": 2.5},
+    {"id": 2, "name": "cc", "score": 11.0},
+]
+
+
+def test_matches_records():
+    expectations = de.Expectations(set_of_expectations)
+    df = pandas.DataFrame(RECORDS)
+
+    de.Expectations.reset()
+    results = de.evaluate_dataframe(expectations, df)
+    assert list(results.index) == list(df.index)
+    assert len(results.columns) == len(set_of_expectations)
+
+    de.Expectations.reset()
+    mask = de.evaluate_list_mask(expectations, RECORDS, by_expectation=True)
+    for column, bitmap in zip(results.columns, mask.by_expectation):
+        assert list(results[column]) == [bitmap[i] for i in range(len(RECORDS))], column
+    de.Expectations.reset()
+
+
+def test_nan_is_null():
+    expectations = de.Expectations(
+        [{"expectation": "expect_column_values_to_not_be_null", "column": "score"}]
+    )
+    df = pandas.DataFrame({"score": [1.0, float("nan")]})
+    assert list(de.evaluate_dataframe(expectations, df).iloc[:, 0]) == [True, False]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_matches_records()
+    test_nan_is_null()
+    print("✅ okay")
@@ -0,0 +1,101 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.internals import masks
+from data_expectations.internals.masks import Bitmap
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "name"},
+    {"expectation": "expect_column_values_to_be_between", "column": "age", "minimum": 0, "maximum": 120},
+]
+
+DATA = [
+    {"name": "alice", "age": 30},   # pass
+    {"age": 30},                    # fail - no name
+    {"name": "carol", "age": 300},  # fail - too old
+    {"name": "dave", "age": "x"},   # fail - error comparing
+    {"name": "eve", "age": None},   # pass
+]
+# fmt:on
+
+
+def test_mask():
+    expectations = de.Expectations(set_of_expectations)
+    mask = de.evaluate_list_mask(expectations, DATA)
+
+    assert len(mask) == 5
+    assert [mask[i] for i in range(5)] == [True, False, False, False, True]
+    assert mask.passed() == 2
+    assert mask.failed() == 3
+    assert list(mask.failures()) == [1, 2, 3]
+    assert list(mask.set_indices()) == [0, 4]
+    assert mask.by_expectation is None
+
+
+def test_mask_by_expectation():
+    expectations = de.Expectations(set_of_expectations)
+    mask = de.evaluate_list_mask(expectations, DATA, by_expectation=True)
+
+    exists, between = mask.by_expectation
+    assert list(exists.unset_indices()) == [1]
+    assert list(between.unset_indices()) == [2, 3]
+    assert list(mask.failures()) == [1, 2, 3]
+
+
+def test_bitmap_across_chunks():
+    original = masks.CHUNK_SIZE
+    masks.CHUNK_SIZE = 16
+    try:
+        bitmap = Bitmap()
+        for i in range(101):
+            bitmap.append(i % 7 != 0)
+    finally:
+        masks.CHUNK_SIZE = original
+
+    assert len(bitmap) == 101
+    assert list(bitmap.unset_indices()) == list(range(0, 101, 7))
+    assert bitmap.count() == 101 - 15
+    assert bitmap[-1] is True
+    assert len(bitmap.to_bytes()) == 13
+
+
+def test_reads_between_appends():
+    flags = [True, False, True, False, True, True, True, True, True, True, False, True]
+    bitmap = Bitmap()
+    for index, flag in enumerate(flags):
+        bitmap.append(flag)
+        # reading doesn't change what is appended after it
+        assert bitmap.count() == sum(flags[: index + 1])
+        repr(bitmap)
+        bitmap.to_bytes()
+        list(bitmap.unset_indices())
+    assert [bitmap[index] for index in range(len(flags))] == flags
+    assert list(bitmap.unset_indices()) == [index for index, flag in enumerate(flags) if not flag]
+    assert list(bitmap.set_indices()) == [index for index, flag in enumerate(flags) if flag]
+
+    # a bitmap made from packed bits can be appended to
+    copy = Bitmap(bitmap.to_bytes(), 10)
+    copy.append(False)
+    assert [copy[index] for index in range(11)] == flags[:10] + [False]
+    assert list(copy.unset_indices()) == [1, 3, 10]
+
+
+def test_empty_mask():
+    mask = de.evaluate_list_mask(de.Expectations(set_of_expectations), [])
+    assert len(mask) == 0
+    assert mask.passed() == 0
+    assert list(mask.failures()) == []
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_mask()
+    test_mask_by_expectation()
+    test_bitmap_across_chunks()
+    test_reads_between_appends()
+    test_empty_mask()
+    print("✅ okay")
@@ -150,6 +150,17 @@ def test_expect_column_values_to_be_increasing_column_missing():
     assert test_func(row=record, column="column_name", previous_value=5)
 
 
+def test_expect_column_values_to_be_increasing_mixed_types():
+    # a value which can't be compared fails, and doesn't replace the previous value
+    de.Expectations.reset()
+    expectations = de.Expectations([{"expectation": "expect_column_values_to_be_increasing", "column": "value"}])
+    results = [
+        de.evaluate_record(expectations, {"value": value}, suppress_errors=True) for value in ("a", 5, "b")
+    ]
+    assert results == [True, False, True]
+    de.Expectations.reset()
+
+
 if __name__ == "__main__":  # pragma: no cover
     test_expect_column_values_to_be_increasing_valid()
     test_expect_column_values_to_be_increasing_valid_with_nulls()
@@ -162,5 +173,6 @@ if __name__ == "__main__":  # pragma: no cover
     test_expect_column_values_to_be_increasing_true()
     test_expect_column_values_to_be_increasing_no_previous_value()
     test_expect_column_values_to_be_increasing_with_null()
+    test_expect_column_values_to_be_increasing_mixed_types()
 
     print("✅ okay")
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations import Expectations
+from data_expectations.internals.expressions import compile_expression
+
+
+def _expectations(expression, **config):
+    return de.Expectations(
+        [{"expectation": "expect_expression_to_be_true", "column": "gross", "expression": expression, **config}]
+    )
+
+
+def test_expression():
+    expectations = _expectations("net + tax == gross and qty > 0")
+    assert de.evaluate_record(expectations, {"net": 80, "tax": 20, "gross": 100, "qty": 1})
+    assert not de.evaluate_record(expectations, {"net": 80, "tax": 20, "gross": 101, "qty": 1}, suppress_errors=True)
+    assert not de.evaluate_record(expectations, {"net": 80, "tax": 20, "gross": 100, "qty": 0}, suppress_errors=True)
+
+    expectations = _expectations("abs(a - b) <= 1 if kind in ('x', 'y') else len(name[:3]) == 3")
+    assert de.evaluate_record(expectations, {"a": 1, "b": 2, "kind": "x", "name": ""})
+    assert de.evaluate_record(expectations, {"a": 1, "b": 9, "kind": "z", "name": "alpha"})
+    assert not de.evaluate_record(expectations, {"a": 1, "b": 9, "kind": "y", "name": "alpha"}, suppress_errors=True)
+
+
+def test_columns_and_nulls():
+    compiled = compile_expression("a + b > a and max(c, 1) > 0")
+    assert compiled.columns == ("a", "b", "c")
+
+    expectations = _expectations("a > b")
+    assert de.evaluate_record(expectations, {"a": None, "b": 1})
+    assert de.evaluate_record(expectations, {"b": 1})
+    expectations = _expectations("a > b", ignore_nulls=False)
+    assert not de.evaluate_record(expectations, {"a": None, "b": 1}, suppress_errors=True)
+    assert de.evaluate_record(_expectations("a is None", ignore_nulls=False), {"b": 1})
+
+
+def test_errors_fail_the_record():
+    expectations = _expectations("a / b > 1")
+    assert not de.evaluate_record(expectations, {"a": 1, "b": 0}, suppress_errors=True)
+    assert not de.evaluate_record(expectations, {"a": "x", "b": 1}, suppress_errors=True)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "a.__class__",
+        "__import__('os')",
+        "open('x')",
+        "a ** 1000",
+        "[x for x in a]",
+        "(lambda: 1)()",
+        "max(*a)",
+        "round(a, ndigits=2)",
+        "a = 1",
+        "a +",
+        "__builtins__",
+        "getattr(a, 'b')",
+    ],
+)
+def test_refused(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression)
+    with pytest.raises(ValueError):
+        de.evaluate_record(_expectations(expression), {"a": 1})
+
+
+def test_matches_uncompiled_expectation():
+    expression = "net + tax == gross and qty > 0"
+    records = [
+        {"net": 80, "tax": 20, "gross": 100, "qty": 1},
+        {"net": 80, "tax": 20, "gross": 100, "qty": 0},
+        {"net": 80, "tax": None, "gross": 100, "qty": 1},
+        {"net": "80", "tax": 20, "gross": 100, "qty": 1},
+    ]
+    expectations = _expectations(expression)
+    for record in records:
+        uncompiled = Expectations.expect_expression_to_be_true(row=record, column="gross", expression=expression)
+        assert de.evaluate_record(expectations, record, suppress_errors=True) == uncompiled
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_expression()
+    test_columns_and_nulls()
+    test_errors_fail_the_record()
+    test_refused("a.__class__")
+    test_matches_uncompiled_expectation()
+    print("✅ okay")
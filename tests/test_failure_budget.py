@@ -0,0 +1,155 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+
+set_of_expectations = [{"expectation": "expect_column_values_to_be_between", "column": "value", "minimum": 0, "maximum": 10}]
+
+
+def _records(count, every):
+    # every `every`th record fails
+    return [{"value": 50 if i % every == 0 else 5} for i in range(1, count + 1)]
+
+
+def _counted(records):
+    seen = []
+
+    def generator():
+        for record in records:
+            seen.append(record)
+            yield record
+
+    return generator(), seen
+
+
+def test_within_budget_passes():
+    expectations = de.Expectations(set_of_expectations)
+    records = _records(1000, 200)  # 0.5%
+    assert not de.evaluate_list(expectations, records, suppress_errors=True)
+    assert de.evaluate_list(expectations, records, max_failure_rate=0.01)
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.001)
+
+
+def test_over_budget_raises():
+    expectations = de.Expectations(set_of_expectations)
+    with pytest.raises(ExpectationNotMetError) as err:
+        de.evaluate_list(expectations, _records(100, 2), max_failure_rate=0.1)
+    assert err.value.expectation == "max_failure_rate"
+
+
+def test_known_size_stops_when_certain():
+    budget = de.FailureBudget(0.01, total=1000)
+    assert budget.allowed == 10
+    for _ in range(10):
+        assert budget.add(False) is None
+    assert budget.add(False) is False
+
+    budget = de.FailureBudget(0.5, total=10)
+    for _ in range(4):
+        assert budget.add(True) is None
+    assert budget.add(True) is True
+
+    # a list's length is known, evaluation stops once the budget is spent
+    expectations = de.Expectations(set_of_expectations)
+    records = _records(1000, 2)
+    budget_records = []
+
+    class Tracked(list):
+        def __iter__(self):
+            for record in super().__iter__():
+                budget_records.append(record)
+                yield record
+
+    assert not de.evaluate_list(expectations, Tracked(records), suppress_errors=True, max_failure_rate=0.01)
+    assert len(budget_records) == 22
+
+
+def test_unknown_size_stops_on_confidence():
+    expectations = de.Expectations(set_of_expectations)
+    records, seen = _counted(_records(100_000, 2))  # 50% fail
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.01, min_records=100)
+    assert len(seen) == 100
+
+    # a rate close to the budget needs more records to be sure of
+    records, seen = _counted(_records(100_000, 80))
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.01)
+    assert 100 < len(seen) < 100_000
+
+    # within budget the whole set is read
+    records, seen = _counted(_records(10_000, 200))
+    assert de.evaluate_list(expectations, records, max_failure_rate=0.01)
+    assert len(seen) == 10_000
+
+
+def test_early_failure_in_a_stream():
+    # one failure at the front is within the budget, whether or not the length is known
+    expectations = de.Expectations(set_of_expectations)
+    records = [{"value": 50}] + [{"value": 5}] * 100_000
+    assert de.evaluate_list(expectations, records, max_failure_rate=0.001)
+    assert de.evaluate_list(expectations, iter(records), max_failure_rate=0.001)
+    assert de.FailureBudget(0.001).min_records == 9550
+
+    # a stream failing at well over the budget still stops early
+    records, seen = _counted([{"value": 50}] * 100_000)
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.001)
+    assert len(seen) == 9550
+
+
+def test_aggregates_see_every_record():
+    de.Expectations.reset()
+    expectations = de.Expectations(
+        set_of_expectations
+        + [{"expectation": "expect_column_mean_to_be_between", "column": "value", "minimum": 0, "maximum": 6}]
+    )
+    records = _records(100, 50) + [{"value": 9}] * 100
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.5)
+    de.Expectations.reset()
+
+
+def test_failing_records_reach_later_steps():
+    # the records which fail the first expectation still count towards the mean
+    de.Expectations.reset()
+    expectations = de.Expectations(
+        [
+            {"expectation": "expect_column_values_to_be_less_than", "column": "value", "threshold": 100},
+            {"expectation": "expect_column_mean_to_be_between", "column": "value", "minimum": 0, "maximum": 10},
+        ]
+    )
+    records = [{"value": 1}] * 98 + [{"value": 10_000}] * 2
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.05)
+
+    # and are seen by ordering expectations
+    de.Expectations.reset()
+    expectations = de.Expectations(
+        [
+            {"expectation": "expect_column_values_to_be_less_than", "column": "value", "threshold": 100},
+            {"expectation": "expect_column_values_to_be_increasing", "column": "value"},
+        ]
+    )
+    records = [{"value": 1}, {"value": 500}, {"value": 2}, {"value": 3}]
+    assert not de.evaluate_list(expectations, records, suppress_errors=True, max_failure_rate=0.3)
+    de.Expectations.reset()
+
+
+def test_invalid_budgets():
+    with pytest.raises(ValueError):
+        de.FailureBudget(2)
+    with pytest.raises(ValueError):
+        de.FailureBudget(0.1, confidence=1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_within_budget_passes()
+    test_over_budget_raises()
+    test_known_size_stops_when_certain()
+    test_unknown_size_stops_on_confidence()
+    test_early_failure_in_a_stream()
+    test_aggregates_see_every_record()
+    test_failing_records_reach_later_steps()
+    test_invalid_budgets()
+    print("✅ okay")
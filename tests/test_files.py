@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+from data_expectations.internals.files import atomic_write
+
+
+def test_atomic_write():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "out")
+        atomic_write(path, lambda out: out.write(b"first"))
+        atomic_write(path, lambda out: out.write(b"second"), durable=True)
+        with open(path, "rb") as written:
+            assert written.read() == b"second"
+        assert os.listdir(directory) == ["out"]
+
+
+def test_failed_write_leaves_the_file():
+    def fail(out):
+        out.write(b"part")
+        raise RuntimeError("interrupted")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "out")
+        atomic_write(path, lambda out: out.write(b"whole"))
+        with pytest.raises(RuntimeError):
+            atomic_write(path, fail)
+        with open(path, "rb") as written:
+            assert written.read() == b"whole"
+        assert os.listdir(directory) == ["out"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="permissions are POSIX")
+def test_permissions():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "out")
+        umask = os.umask(0o022)
+        try:
+            atomic_write(path, lambda out: out.write(b"new"))
+        finally:
+            os.umask(umask)
+        assert os.stat(path).st_mode & 0o777 == 0o644
+
+        os.chmod(path, 0o640)
+        atomic_write(path, lambda out: out.write(b"replaced"))
+        assert os.stat(path).st_mode & 0o777 == 0o640
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_atomic_write()
+    test_failed_write_leaves_the_file()
+    test_permissions()
+    print("✅ okay")
@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "id"},
+    {"expectation": "expect_column_values_to_be_between", "column": "id", "minimum": 0, "maximum": 100},
+    {"expectation": "expect_column_values_to_be_in_set", "column": "kind", "symbols": ["a", "b"], "ignore_nulls": False},
+]
+# fmt:on
+
+
+def _write(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, "w") as rule_file:
+        rule_file.write(content)
+    return path
+
+
+def test_load_json_and_jsonl():
+    expected = de.Expectations(set_of_expectations).set_of_expectations
+    with tempfile.TemporaryDirectory() as directory:
+        as_json = _write(directory, "rules.json", json.dumps(set_of_expectations))
+        as_jsonl = _write(directory, "rules.jsonl", "\n".join(map(json.dumps, set_of_expectations)) + "\n\n")
+        assert de.Expectations.from_file(as_json).set_of_expectations == expected
+        assert de.Expectations.from_file(as_jsonl).set_of_expectations == expected
+
+
+def test_loaded_expectations_evaluate():
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write(directory, "rules.jsonl", "\n".join(map(json.dumps, set_of_expectations)))
+        expectations = de.Expectations.from_file(path)
+    assert de.evaluate_record(expectations, {"id": 1, "kind": "a"})
+    assert not de.evaluate_record(expectations, {"id": 1}, suppress_errors=True)
+
+
+def test_invalid_files():
+    with tempfile.TemporaryDirectory() as directory:
+        with pytest.raises(ValueError):
+            de.Expectations.from_file(_write(directory, "a.jsonl", '{"expectation": "expect_column_to_exist"}'))
+        with pytest.raises(ValueError):
+            de.Expectations.from_file(_write(directory, "b.jsonl", '{"column": "id"}'))
+        with pytest.raises(ValueError):
+            de.Expectations.from_file(_write(directory, "c.jsonl", "{not json"))
+        with pytest.raises(ValueError):
+            de.Expectations.from_file(_write(directory, "d.json", "[1, 2]"))
+
+
+def test_definitions_are_not_copied(monkeypatch):
+    from data_expectations.internals import models
+
+    def deepcopy(value):
+        raise AssertionError("parsed definitions don't need copying")
+
+    monkeypatch.setattr(models, "deepcopy", deepcopy)
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write(directory, "rules.json", json.dumps(set_of_expectations))
+        assert len(de.Expectations.from_file(path).set_of_expectations) == 3
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_load_json_and_jsonl()
+    test_loaded_expectations_evaluate()
+    test_invalid_files()
+    print("✅ okay")
@@ -0,0 +1,108 @@
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "id"},
+    {"expectation": "expect_column_values_to_be_between", "column": "id", "minimum": 0, "maximum": 10},
+]
+# fmt:on
+
+RECORDS = [{"id": 1}, {"id": 50}, {"name": "x"}, {"id": 5}]
+
+
+@pytest.fixture
+def collector():
+    collector = de.enable_metrics(de.MetricsCollector(flush_every=2))
+    yield collector
+    de.disable_metrics()
+
+
+def test_records_and_failures_are_counted(collector):
+    expectations = de.Expectations(set_of_expectations)
+    for record in RECORDS:
+        de.evaluate_record(expectations, record, suppress_errors=True)
+    snapshot = collector.snapshot()
+    assert snapshot["records"] == 4
+    assert snapshot["failed"] == 2
+    # evaluate_record stops at the first failure
+    assert snapshot["failures"] == {
+        ("expect_column_values_to_be_between", "id"): 1,
+        ("expect_column_to_exist", "id"): 1,
+    }
+
+    collector.reset()
+    for record in RECORDS:
+        de.find_violations(expectations, record)
+    assert collector.snapshot()["failures"] == {
+        ("expect_column_values_to_be_between", "id"): 1,
+        ("expect_column_to_exist", "id"): 1,
+    }
+
+
+def test_batches_are_timed(collector):
+    expectations = de.Expectations(set_of_expectations)
+    de.evaluate_list(expectations, RECORDS, suppress_errors=True)
+    de.evaluate_list_mask(expectations, RECORDS)
+    snapshot = collector.snapshot()
+    assert snapshot["batches"] == 2
+    assert snapshot["batch_buckets"][-1] == (float("inf"), 2)
+    # evaluate_list stops at the first failing record, the mask sees them all
+    assert snapshot["records"] == 2 + 4
+    assert snapshot["failed"] == 1 + 2
+
+
+def test_other_threads_are_counted(collector):
+    expectations = de.Expectations(set_of_expectations)
+
+    def work():
+        for record in RECORDS * 5:
+            de.evaluate_record(expectations, record, suppress_errors=True)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    del thread, threads
+    assert collector.snapshot()["records"] == 4 * 20
+
+
+def test_render(collector):
+    expectations = de.Expectations(set_of_expectations)
+    de.evaluate_list_mask(expectations, RECORDS)
+    text = collector.render()
+    assert "# TYPE data_expectations_records_total counter" in text
+    assert "data_expectations_records_total 4" in text
+    assert 'data_expectations_expectation_failures_total{expectation="expect_column_to_exist",column="id"} 1' in text
+    assert 'data_expectations_batch_duration_seconds_bucket{le="+Inf"} 1' in text
+    assert "data_expectations_batch_duration_seconds_count 1" in text
+
+    openmetrics = collector.render(openmetrics=True)
+    assert "# TYPE data_expectations_records counter" in openmetrics
+    assert openmetrics.endswith("# EOF\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "validation.prom")
+        collector.write(path)
+        with open(path) as metrics_file:
+            assert metrics_file.read() == collector.render()
+
+
+def test_disabled_by_default():
+    from data_expectations.internals import metrics
+
+    assert metrics.COLLECTOR is None
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_disabled_by_default()
+    print("✅ okay")
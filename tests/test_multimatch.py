@@ -0,0 +1,178 @@
+import os
+import random
+import re
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.internals.multimatch import AhoCorasick
+from data_expectations.internals.multimatch import MultiPattern
+from data_expectations.internals.multimatch import classify_like
+from data_expectations.internals.plan import compile_plan
+from data_expectations.internals.text import sql_like_to_regex
+
+LIKES = ["%card%", "%ssn%", "acct%", "%@example.com", "exact", "a_c", "x%y%z", "%%", "%", "", "%a.b%"]
+REGEXES = [r"\d{3}-\d{2}-\d{4}", r"(ab)\1", r"(?i)secret", r"[a-z]+$", r"foo|bar"]
+TEXTS = [
+    "",
+    "card",
+    "my card number",
+    "ssn: 123-45-6789",
+    "123-45-6789",
+    "acct 42",
+    "Acct 42",
+    "me@example.com",
+    "exact",
+    "exact\n",
+    "abc",
+    "a\nc",
+    "xayaz",
+    "x\ny z",
+    "card\nnumber",
+    "abab",
+    "SECRET",
+    "lowercase",
+    "a.b",
+    "axb",
+    "bar",
+]
+
+
+def _expected(text):
+    return [sql_like_to_regex(like).match(text) is not None for like in LIKES] + [
+        re.compile(regex).match(text) is not None for regex in REGEXES
+    ]
+
+
+def test_classify_like():
+    assert classify_like("%abc%") == ("contains", "abc")
+    assert classify_like("abc%") == ("prefix", "abc")
+    assert classify_like("%abc") == ("suffix", "abc")
+    assert classify_like("abc") == ("equals", "abc")
+    assert classify_like("a_c")[0] is None
+    assert classify_like("a%c")[0] is None
+    assert classify_like("%")[0] is None
+
+
+def test_aho_corasick():
+    literals = ["he", "she", "his", "hers", "s"]
+    automaton = AhoCorasick(literals)
+    for text in ["ushers", "his", "", "xyz", "shehis"]:
+        assert automaton.find(text) == {index for index, literal in enumerate(literals) if literal in text}, text
+
+
+def test_aho_corasick_random():
+    generator = random.Random(7)
+    literals = ["".join(generator.choice("abc") for _ in range(generator.randint(1, 4))) for _ in range(40)]
+    automaton = AhoCorasick(literals)
+    for _ in range(200):
+        text = "".join(generator.choice("abcd") for _ in range(generator.randint(0, 12)))
+        assert automaton.find(text) == {index for index, literal in enumerate(literals) if literal in text}, text
+
+
+def test_matches_agrees_with_each_pattern():
+    patterns = MultiPattern(LIKES, REGEXES)
+    for text in TEXTS:
+        assert patterns.matches(text) == _expected(text), text
+        assert patterns.any(text) == any(_expected(text)), text
+
+
+def test_any_of_regexes():
+    patterns = MultiPattern(regexes=REGEXES)
+    assert patterns.combined is not None
+    for text in TEXTS:
+        assert patterns.any(text) == any(_expected(text)[len(LIKES) :]), text
+    assert not MultiPattern(regexes=["a", "b"]).any("c")
+
+
+def test_many_contains_patterns():
+    # more patterns than characters, so the automaton is used
+    words = [f"w{number}x" for number in range(300)]
+    patterns = MultiPattern([f"%{word}%" for word in words])
+    for text in ["nothing here", "has w12x and w299x", "w0x"]:
+        assert patterns.matches(text) == [word in text for word in words], text
+    # as with their regular expressions, % doesn't match a newline
+    text = "w1x\nw2x"
+    assert patterns.matches(text) == [sql_like_to_regex(f"%{word}%").match(text) is not None for word in words]
+
+
+def test_match_any_expectations():
+    expectations = de.Expectations(
+        [
+            {"expectation": "expect_column_values_to_match_any_like", "column": "name", "likes": ["%cat%", "dog%"]},
+            {"expectation": "expect_column_values_to_match_any_regex", "column": "code", "regexes": [r"\d+$", "x"]},
+        ]
+    )
+    assert de.evaluate_record(expectations, {"name": "bobcat", "code": "123"})
+    assert de.evaluate_record(expectations, {"name": "doghouse", "code": "xyz"})
+    assert de.evaluate_record(expectations, {"name": None, "code": None})
+    assert not de.evaluate_record(expectations, {"name": "bird", "code": "1"}, suppress_errors=True)
+    assert not de.evaluate_record(expectations, {"name": "cat", "code": "a1"}, suppress_errors=True)
+
+    row = {"name": "a cat", "code": "12"}
+    assert de.Expectations.expect_column_values_to_match_any_like(row=row, column="name", likes=["%cat"])
+    assert not de.Expectations.expect_column_values_to_match_any_regex(row=row, column="code", regexes=["a", "b"])
+
+
+def _pattern_rules(ignore_nulls=True):
+    rules = [
+        {"expectation": "expect_column_values_to_match_like", "column": "text", "like": like, "ignore_nulls": ignore_nulls}
+        for like in LIKES
+    ]
+    rules += [
+        {"expectation": "expect_column_values_to_match_regex", "column": "text", "regex": regex, "ignore_nulls": ignore_nulls}
+        for regex in REGEXES
+    ]
+    return rules
+
+
+def _bits(bitmap):
+    return [bitmap[index] for index in range(len(bitmap))]
+
+
+def test_fused_steps_agree_with_each_pattern():
+    expectations = de.Expectations(_pattern_rules())
+    plan = compile_plan(expectations)
+    assert all(hasattr(step.test, "batch") for step in plan.steps)
+
+    records = [{"text": text} for text in TEXTS] + [{"text": None}, {"text": 12}, {}]
+    singles = [compile_plan(de.Expectations([step.definition])).steps[0] for step in plan.steps]
+    for record in records:
+        assert [step(record) for step in plan.steps] == [single(record) for single in singles], record
+        if record.get("text") is not None:
+            assert [step(record) for step in plan.steps] == _expected(str(record["text"])), record
+
+    failures = sum(not single(record) for record in records for single in singles)
+    assert failures and sum(len(de.find_violations(expectations, record)) for record in records) == failures
+
+    # in batches
+    mask = de.evaluate_list_mask(expectations, records, by_expectation=True)
+    for step, bitmap in zip(plan.steps, mask.by_expectation):
+        assert _bits(bitmap) == [step(record) for record in records], step
+    assert _bits(mask) == [all(single(record) for single in singles) for record in records]
+
+
+def test_fused_steps_nulls():
+    expectations = de.Expectations(_pattern_rules(ignore_nulls=False))
+    violations = de.find_violations(expectations, {"text": None})
+    assert len(violations) == len(LIKES) + len(REGEXES)
+
+
+def test_few_patterns_are_not_fused():
+    plan = compile_plan(de.Expectations(_pattern_rules()[:3]))
+    assert all(not hasattr(step.test, "batch") for step in plan.steps)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_classify_like()
+    test_aho_corasick()
+    test_aho_corasick_random()
+    test_matches_agrees_with_each_pattern()
+    test_any_of_regexes()
+    test_many_contains_patterns()
+    test_match_any_expectations()
+    test_fused_steps_agree_with_each_pattern()
+    test_fused_steps_nulls()
+    test_few_patterns_are_not_fused()
+    print("✅ okay")
@@ -0,0 +1,195 @@
+import os
+import pickle
+import random
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_values_to_be_increasing", "column": "seq"},
+    {"expectation": "expect_column_values_to_be_decreasing", "column": "countdown"},
+    {"expectation": "expect_column_values_to_be_between", "column": "value", "minimum": 0, "maximum": 90},
+    {"expectation": "expect_column_values_to_be_unique", "column": "id"},
+    {"expectation": "expect_column_mean_to_be_between", "column": "value", "minimum": 40, "maximum": 60},
+    {"expectation": "expect_column_max_to_be_between", "column": "value", "minimum": 0, "maximum": 100},
+]
+# fmt:on
+
+
+def _records(count, seed=1):
+    generator = random.Random(seed)  # nosec
+    records = []
+    for i in range(count):
+        records.append(
+            {
+                "seq": None if generator.random() < 0.1 else i + generator.choice([0, 0, 0, -3]),
+                "countdown": count - i + generator.choice([0, 0, 0, 0, 2]),
+                "value": generator.randint(0, 100),
+                "id": generator.randint(0, count * 4),
+            }
+        )
+    if count > 51:
+        # values the tracker skips over, at the edges of shards
+        records[50]["seq"] = 0
+        records[51]["seq"] = 0
+    return records
+
+
+def _sequential(expectations, records):
+    de.Expectations.reset()
+    failed = [0] * len(expectations)
+    names = [definition.expectation.value for definition in expectations]
+    for record in records:
+        for violation in de.find_violations(expectations, record):
+            failed[names.index(violation.expectation)] += 1
+    aggregates = de.evaluate_aggregates(expectations, suppress_errors=True)
+    de.Expectations.reset()
+    met = de.evaluate_list(expectations, records, suppress_errors=True)
+    de.Expectations.reset()
+    return failed, aggregates, met
+
+
+def _shards(records, bounds):
+    bounds = [0] + bounds + [len(records)]
+    return [(bounds[i], records[bounds[i] : bounds[i + 1]]) for i in range(len(bounds) - 1)]
+
+
+@pytest.mark.parametrize("bounds", [[], [50], [51, 52], [10, 50, 51, 120, 199], list(range(1, 200, 7))])
+def test_merged_shards_match_sequential(bounds):
+    expectations = de.Expectations(set_of_expectations)
+    records = _records(200)
+    failed, aggregates, met = _sequential(expectations, records)
+
+    partials = [de.evaluate_shard(expectations, shard, start=start) for start, shard in _shards(records, bounds)]
+    random.Random(len(bounds)).shuffle(partials)  # nosec
+    merged = partials[0]
+    for partial in partials[1:]:
+        merged = merged.merge(partial)
+
+    assert merged.contiguous
+    assert merged.records == len(records)
+    assert merged.failed == failed
+    assert all(result[2] for result in merged.aggregates()) == aggregates
+    assert merged.met == met
+
+
+def test_merge_is_associative():
+    expectations = de.Expectations(set_of_expectations)
+    a, b, c = [de.evaluate_shard(expectations, shard, start) for start, shard in _shards(_records(90), [30, 60])]
+    left = a.merge(b).merge(c)
+    right = a.merge(b.merge(c))
+    gapped = a.merge(c)
+    assert not gapped.contiguous
+    assert left.failed == right.failed == gapped.merge(b).failed
+    assert left.aggregates() == right.aggregates()
+
+
+def test_violations_are_the_first_in_the_dataset():
+    expectations = de.Expectations(set_of_expectations[:1])
+    records = [{"seq": i} for i in range(20)] + [{"seq": 5}] + [{"seq": i} for i in range(20)]
+    first, second = [de.evaluate_shard(expectations, shard, start, sample_size=2) for start, shard in _shards(records, [21])]
+    assert not first.met
+    merged = second.merge(first)
+    assert merged.failed == [3]
+    assert [violation.record for violation in merged.violations] == [{"seq": 5}, {"seq": 0}]
+    assert merged.counts() == [("expect_column_values_to_be_increasing", "seq", 38, 3)]
+
+
+def test_shards_dont_touch_the_tracker():
+    expectations = de.Expectations(set_of_expectations[:1])
+    de.Expectations.reset()
+    assert de.evaluate_record(expectations, {"seq": 100})
+    de.evaluate_shard(expectations, [{"seq": 1}, {"seq": 2}])
+    assert not de.evaluate_record(expectations, {"seq": 50}, suppress_errors=True)
+    de.Expectations.reset()
+
+
+def test_pickle_and_errors():
+    expectations = de.Expectations(set_of_expectations)
+    partial = de.evaluate_shard(expectations, _records(20))
+    restored = pickle.loads(pickle.dumps(partial))
+    assert restored.failed == partial.failed
+
+    with pytest.raises(ValueError):
+        partial.merge(partial)
+    other = de.evaluate_shard(de.Expectations(set_of_expectations[:2]), _records(20), start=20)
+    with pytest.raises(ValueError):
+        partial.merge(other)
+
+
+def test_cross_shard_repeats_approximate():
+    expectations = de.Expectations(
+        [{"expectation": "expect_column_values_to_be_unique", "column": "id", "mode": "approximate", "capacity": 10000}]
+    )
+    first = de.evaluate_shard(expectations, [{"id": i} for i in range(1000)])
+    second = de.evaluate_shard(expectations, [{"id": i} for i in range(900, 1900)], start=1000)
+    assert first.met and second.met
+    merged = first.merge(second)
+    assert not merged.met
+    assert merged.failed[0] == pytest.approx(100, abs=10)
+
+
+def test_cross_shard_repeats_spilled():
+    # shards spilling into the same directory each have their own partitions
+    with tempfile.TemporaryDirectory() as directory:
+        rule = {"expectation": "expect_column_values_to_be_unique", "column": "id"}
+        expectations = de.Expectations([dict(rule, max_keys_in_memory=10, partitions=4, spill_directory=directory)])
+        first = de.evaluate_shard(expectations, [{"id": i} for i in range(100)])
+        second = de.evaluate_shard(expectations, [{"id": i} for i in range(100, 200)], start=100)
+        merged = first.merge(second)
+        assert merged.met and merged.failed == [0]
+
+        # merging doesn't change either result
+        again = first.merge(second)
+        assert again.met and first.met and second.met
+        repeated = de.evaluate_shard(expectations, [{"id": i} for i in range(190, 290)], start=200)
+        assert merged.merge(repeated).aggregates()[0][3] == 10
+        assert merged.aggregates()[0][3] == 0
+
+
+def test_values_which_cant_be_compared_across_shards():
+    expectations = de.Expectations([{"expectation": "expect_column_values_to_be_increasing", "column": "seq"}])
+    first = de.evaluate_shard(expectations, [{"seq": 1}, {"seq": 5}])
+    second = de.evaluate_shard(expectations, [{"seq": "x"}, {"seq": "y"}], start=2)
+    merged = first.merge(second)
+    assert not merged.met and merged.failed[0] >= 1
+    assert merged.violations[0].record == {"seq": "x"}
+
+    de.Expectations.reset()
+    assert not de.evaluate_list(expectations, [{"seq": 1}, {"seq": 5}, {"seq": "x"}, {"seq": "y"}], suppress_errors=True)
+    de.Expectations.reset()
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        {"expectation": "expect_column_null_ratio_in_window_to_be_less_than", "column": "value", "threshold": 0.5},
+        {"expectation": "expect_column_mean_in_window_to_be_between", "column": "value", "minimum": 0, "maximum": 1},
+        {"expectation": "expect_column_gaps_to_be_at_most", "column": "value", "max_gap": 1},
+        {"expectation": "expect_column_values_to_be_unique_within_window", "column": "value", "window": 10},
+    ],
+)
+def test_windows_arent_sharded(rule):
+    # a window spanning two shards can't be tested from either, so these are refused
+    with pytest.raises(ValueError, match="shards"):
+        de.evaluate_shard(de.Expectations([rule]), [{"value": 1}])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_merged_shards_match_sequential([10, 50, 51, 120, 199])
+    test_merge_is_associative()
+    test_violations_are_the_first_in_the_dataset()
+    test_shards_dont_touch_the_tracker()
+    test_pickle_and_errors()
+    test_cross_shard_repeats_approximate()
+    test_cross_shard_repeats_spilled()
+    test_values_which_cant_be_compared_across_shards()
+    test_windows_arent_sharded({"expectation": "expect_column_gaps_to_be_at_most", "column": "value", "max_gap": 1})
+    print("✅ okay")
@@ -0,0 +1,153 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+from data_expectations.internals.expectations import GLOBAL_TRACKER
+from data_expectations.internals.partitions import partition_states
+from data_expectations.internals.partitions import shard_of
+
+
+def _increasing(**config):
+    return de.Expectations(
+        [{"expectation": "expect_column_values_to_be_increasing", "column": "seq", "partition_by": "device", **config}]
+    )
+
+
+INTERLEAVED = [
+    {"device": "a", "seq": 1},
+    {"device": "b", "seq": 10},
+    {"device": "a", "seq": 2},
+    {"device": "b", "seq": 11},
+    {"device": "a", "seq": 3},
+    {"device": "b", "seq": 5},  # out of order within b
+    {"device": "c", "seq": None},
+    {"device": "a", "seq": 4},
+]
+
+
+def test_ordered_within_partitions():
+    de.Expectations.reset()
+    unpartitioned = de.Expectations([{"expectation": "expect_column_values_to_be_increasing", "column": "seq"}])
+    assert [not de.find_violations(unpartitioned, record) for record in INTERLEAVED] == [
+        True, True, False, True, False, True, True, False
+    ]
+
+    de.Expectations.reset()
+    expectations = _increasing()
+    assert [not de.find_violations(expectations, record) for record in INTERLEAVED] == [
+        True, True, True, True, True, False, True, True
+    ]
+    de.Expectations.reset()
+
+
+def test_several_partition_columns_and_decreasing():
+    de.Expectations.reset()
+    expectations = de.Expectations(
+        [
+            {
+                "expectation": "expect_column_values_to_be_decreasing",
+                "column": "remaining",
+                "partition_by": ["tenant", "user"],
+            }
+        ]
+    )
+    records = [
+        {"tenant": 1, "user": "x", "remaining": 10},
+        {"tenant": 2, "user": "x", "remaining": 20},
+        {"tenant": 1, "user": "x", "remaining": 9},
+        {"tenant": 2, "user": "x", "remaining": 21},
+    ]
+    assert [not de.find_violations(expectations, record) for record in records] == [True, True, True, False]
+    de.Expectations.reset()
+
+
+def test_least_recently_seen_partitions_are_evicted():
+    de.Expectations.reset()
+    expectations = _increasing(max_partitions=2)
+    for record in [{"device": "a", "seq": 5}, {"device": "b", "seq": 5}, {"device": "a", "seq": 6}]:
+        assert de.evaluate_record(expectations, record)
+    # c evicts b, the least recently seen
+    assert de.evaluate_record(expectations, {"device": "c", "seq": 5})
+    (state,) = partition_states(GLOBAL_TRACKER)
+    assert list(state.values) == ["a", "c"]
+    assert state.evictions == 1
+    # a is still tracked, b has nothing to be compared with
+    assert not de.evaluate_record(expectations, {"device": "a", "seq": 1}, suppress_errors=True)
+    assert de.evaluate_record(expectations, {"device": "b", "seq": 1})
+    assert state.evictions == 2
+
+    collector = de.MetricsCollector()
+    text = collector.render()
+    assert 'data_expectations_partitions{expectation="expect_column_values_to_be_increasing",column="seq"} 2' in text
+    assert 'data_expectations_partition_evictions_total{expectation="expect_column_values_to_be_increasing",column="seq"} 2' in text
+    de.Expectations.reset()
+
+
+def test_sharding_by_key():
+    de.Expectations.reset()
+    shards = 3
+    records = [{"device": f"d{i % 7}", "seq": 100 - i} for i in range(50)]
+    everything = _increasing()
+    expected = [not de.find_violations(everything, record) for record in records]
+
+    de.Expectations.reset()
+    owned = [False] * len(records)
+    for shard in range(shards):
+        expectations = _increasing(shards=shards, shard=shard)
+        for index, record in enumerate(records):
+            met = not de.find_violations(expectations, record)
+            if shard_of(record["device"], shards) == shard:
+                owned[index] = True
+                assert met == expected[index]
+            else:
+                assert met
+    assert all(owned)
+    # the same in every process
+    assert shard_of("d1", 1024) == shard_of("d1", 1024)
+    de.Expectations.reset()
+
+
+def test_misconfiguration():
+    with pytest.raises(ValueError):
+        _increasing(max_partitions=0).compile()
+    with pytest.raises(ValueError):
+        _increasing(shards=2, shard=2).compile()
+    with pytest.raises(ValueError):
+        de.Expectations(
+            [{"expectation": "expect_column_values_to_be_increasing", "column": "seq", "partition_by": []}]
+        ).compile()
+
+
+def test_checkpointed(tmp_path):
+    de.Expectations.reset()
+    expectations = _increasing()
+    assert de.evaluate_record(expectations, {"device": "a", "seq": 5})
+    path = str(tmp_path / "state.checkpoint")
+    de.Expectations.checkpoint(path)
+    de.Expectations.reset()
+    de.Expectations.restore(path)
+    assert not de.evaluate_record(expectations, {"device": "a", "seq": 4}, suppress_errors=True)
+    de.Expectations.reset()
+
+
+def test_mixed_types():
+    # a value which can't be compared fails, and isn't what the next value is compared with
+    de.Expectations.reset()
+    expectations = _increasing()
+    records = [{"device": "a", "seq": "a"}, {"device": "a", "seq": 5}, {"device": "a", "seq": "b"}]
+    assert [de.evaluate_record(expectations, record, suppress_errors=True) for record in records] == [True, False, True]
+    de.Expectations.reset()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_ordered_within_partitions()
+    test_several_partition_columns_and_decreasing()
+    test_least_recently_seen_partitions_are_evicted()
+    test_sharding_by_key()
+    test_misconfiguration()
+    test_mixed_types()
+    print("✅ okay")
@@ -0,0 +1,166 @@
+import dataclasses
+import datetime
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "id"},
+    {"expectation": "expect_column_values_to_be_between", "column": "id", "minimum": 0, "maximum": 10},
+]
+# fmt:on
+
+
+def _read(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as quarantined:
+        return [json.loads(line) for line in quarantined]
+
+
+def test_failing_records_are_quarantined():
+    expectations = de.Expectations(set_of_expectations)
+    records = [{"id": 1}, {"id": 50}, {"name": "x"}, {"id": 5, "when": datetime.date(2000, 1, 2)}]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quarantine.jsonl")
+        with de.QuarantineSink(path) as sink:
+            passed = list(sink.filter(expectations, records))
+        assert passed == [records[0], records[3]]
+        assert _read(path) == [
+            {"violations": ["expect_column_values_to_be_between"], "record": {"id": 50}},
+            {"violations": ["expect_column_to_exist"], "record": {"name": "x"}},
+        ]
+
+        # the file is appended to, dates and other values are written as strings
+        with de.QuarantineSink(path) as sink:
+            try:
+                de.evaluate_record(expectations, {"id": 20, "when": datetime.date(2000, 1, 2)})
+            except de.errors.ExpectationNotMetError as err:
+                sink.put_error(err)
+        assert _read(path)[-1] == {
+            "violations": ["expect_column_values_to_be_between"],
+            "record": {"id": 20, "when": "2000-01-02"},
+        }
+
+
+def test_gzip_and_flushing():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quarantine.jsonl.gz")
+        sink = de.QuarantineSink(path, batch_size=100, flush_interval=60)
+        for i in range(250):
+            sink.put({"id": i}, ["expect_column_values_to_be_between"])
+        sink.flush()
+        assert sink.written == 250
+        assert [line["record"]["id"] for line in _read(path)] == list(range(250))
+        sink.put({"id": 250}, ["expect_column_to_exist"])
+        sink.close()
+        assert len(_read(path)) == 251
+
+        with pytest.raises(ValueError):
+            sink.put({"id": 1}, [])
+
+
+def test_many_threads():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quarantine.jsonl")
+        with de.QuarantineSink(path, batch_size=10) as sink:
+
+            def work(thread):
+                for i in range(500):
+                    sink.put({"thread": thread, "id": i}, ["expect_column_to_exist"])
+
+            threads = [threading.Thread(target=work, args=(t,)) for t in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert len(_read(path)) == 2000
+
+
+def test_queue_is_bounded():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quarantine.jsonl")
+        sink = de.QuarantineSink(path, batch_size=2, flush_interval=0.01, max_pending=3)
+        release = threading.Event()
+        write = sink._write
+
+        def slow_write(data):
+            release.wait()
+            write(data)
+
+        sink._write = slow_write
+        for i in range(3):
+            sink.put({"id": i}, [])
+        # the writer is stuck, the queue fills and put waits for room
+        blocked = threading.Thread(target=lambda: [sink.put({"id": i}, []) for i in range(3, 10)])
+        blocked.start()
+        time.sleep(0.2)
+        assert blocked.is_alive()
+        assert sink._pending.qsize() <= 3
+        release.set()
+        blocked.join(5)
+        assert not blocked.is_alive()
+        sink.close()
+        assert [line["record"]["id"] for line in _read(path)] == list(range(10))
+
+
+@dataclasses.dataclass
+class Reading:
+    id: int
+    when: datetime.date
+
+
+class Slotted:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+def test_object_records():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quarantine.jsonl")
+        with de.QuarantineSink(path) as sink:
+            sink.put(Reading(1, datetime.date(2000, 1, 2)), ["a"])
+            sink.put(Slotted(2, "x"), ["b"])
+            sink.put({"nested": Reading(3, datetime.date(2000, 1, 3))}, ["c"])
+        assert [line["record"] for line in _read(path)] == [
+            {"id": 1, "when": "2000-01-02"},
+            {"id": 2, "name": "x"},
+            {"nested": {"id": 3, "when": "2000-01-03"}},
+        ]
+
+
+def test_closed_at_exit():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quarantine.jsonl")
+        package = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        script = (
+            "import data_expectations as de; "
+            f"sink = de.QuarantineSink({path!r}, flush_interval=60); "
+            "[sink.put({'id': i}, []) for i in range(5)]"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=package, check=True)
+        assert len(_read(path)) == 5
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_failing_records_are_quarantined()
+    test_gzip_and_flushing()
+    test_many_threads()
+    test_queue_is_bounded()
+    test_object_records()
+    test_closed_at_exit()
+    print("✅ okay")
@@ -0,0 +1,98 @@
+import os
+import sys
+from collections import namedtuple
+from dataclasses import dataclass
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "name"},
+    {"expectation": "expect_column_values_to_not_be_null", "column": "name"},
+    {"expectation": "expect_column_values_to_be_between", "column": "age", "minimum": 0, "maximum": 120},
+    {"expectation": "expect_column_values_to_be_of_type", "column": "age", "expected_type": "int"},
+]
+# fmt:on
+
+Person = namedtuple("Person", ["name", "age"])
+
+
+@dataclass
+class PersonRecord:
+    name: str
+    age: int
+
+
+@dataclass(slots=True)
+class SlottedPerson:
+    name: str
+    age: int
+
+
+class LegacyPerson:
+    __slots__ = ("name", "age")
+
+    def __init__(self, name, age):
+        self.name = name
+        self.age = age
+
+
+def test_namedtuple_records():
+    expectations = de.Expectations(set_of_expectations)
+    assert de.evaluate_list(expectations, [Person("alice", 30), Person("bob", 40)])
+    assert not de.evaluate_record(expectations, Person("carol", 200), suppress_errors=True)
+    assert not de.evaluate_record(expectations, Person(None, 20), suppress_errors=True)
+
+
+def test_dataclass_records():
+    expectations = de.Expectations(set_of_expectations)
+    assert de.evaluate_record(expectations, PersonRecord("alice", 30))
+    assert de.evaluate_record(expectations, SlottedPerson("alice", 30))
+    assert not de.evaluate_record(expectations, SlottedPerson("alice", -1), suppress_errors=True)
+
+    with pytest.raises(ExpectationNotMetError):
+        de.evaluate_record(expectations, PersonRecord("alice", 300))
+
+
+def test_slotted_records():
+    expectations = de.Expectations(set_of_expectations)
+    assert de.evaluate_record(expectations, LegacyPerson("alice", 30))
+
+    # unset slots are missing columns
+    record = LegacyPerson("alice", 30)
+    del record.name
+    assert not de.evaluate_record(expectations, record, suppress_errors=True)
+
+
+def test_tuple_records_with_schema():
+    expectations = de.Expectations(set_of_expectations)
+    assert de.evaluate_list(expectations, [("alice", 30), ("bob", 40)], schema=["name", "age"])
+    # short tuples are missing their trailing columns, which are then nulls
+    assert de.evaluate_record(expectations, ("carol",), schema=["name", "age", "city"])
+    assert not de.evaluate_record(expectations, (None,), schema=["name", "age"], suppress_errors=True)
+    assert not de.evaluate_record(expectations, ("bob", 40), schema=["age", "name"], suppress_errors=True)
+
+
+def test_unsupported_records():
+    expectations = de.Expectations(set_of_expectations)
+
+    with pytest.raises(TypeError):
+        de.evaluate_record(expectations, ("alice", 30))
+    with pytest.raises(TypeError):
+        de.evaluate_record(expectations, "alice")
+    assert not de.evaluate_record(expectations, 30, suppress_errors=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_namedtuple_records()
+    test_dataclass_records()
+    test_slotted_records()
+    test_tuple_records_with_schema()
+    test_unsupported_records()
+    print("✅ okay")
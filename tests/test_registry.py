@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotUnderstoodError
+from data_expectations.internals import registry
+
+
+def test_builtins_are_registered():
+    available = de.Expectations.list_available_expectations()
+    assert "expect_column_to_exist" in available
+    assert "expect_column_values_to_be_increasing" in available
+    assert de.Expectations.get_expectation("expect_column_to_exist") is de.Expectations.expect_column_to_exist
+
+
+def test_import_is_light():
+    # the less often used parts of the package are imported when they are first used
+    package = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    script = (
+        "import sys; import data_expectations as de; "
+        "heavy = ['gzip', 'statistics', 'tempfile', 'data_expectations.internals.quarantine', "
+        "'data_expectations.internals.partial', 'data_expectations.internals.aggregates', "
+        "'data_expectations.internals.windows', 'data_expectations.internals.plan']; "
+        "print(','.join(name for name in heavy if name in sys.modules)); "
+        "de.QuarantineSink; de.FailureBudget; "
+        "print(de.Expectations.get_expectation('expect_column_mean_to_be_between') is not None)"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=package, capture_output=True, text=True, check=True)
+    assert output.stdout.split("\n")[:2] == ["", "True"], output.stdout
+    with pytest.raises(AttributeError):
+        de.not_a_name
+
+
+def test_register_expectation():
+    @de.register_expectation
+    def expect_column_values_to_be_even(*, row, column, ignore_nulls=True, **kwargs):
+        value = row.get(column)
+        if value is None:
+            return ignore_nulls
+        return value % 2 == 0
+
+    try:
+        expectations = de.Expectations([{"expectation": "expect_column_values_to_be_even", "column": "number"}])
+        assert de.evaluate_record(expectations, {"number": 2})
+        assert not de.evaluate_record(expectations, {"number": 3}, suppress_errors=True)
+
+        with pytest.raises(ValueError):
+            de.register_expectation(lambda **kwargs: True, name="expect_column_values_to_be_even")
+    finally:
+        registry._REGISTRY.pop("expect_column_values_to_be_even")
+
+
+class _FakeEntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+        return self.value
+
+
+def test_plugins_are_loaded_lazily():
+    entry_point = _FakeEntryPoint("expect_column_values_to_be_shouty", lambda *, row, column, **kwargs: row[column].isupper())
+    other = _FakeEntryPoint("expect_something_else", lambda **kwargs: True)
+    original = registry._ENTRY_POINTS
+    registry._ENTRY_POINTS = {entry_point.name: entry_point, other.name: other}
+    try:
+        expectations = de.Expectations([{"expectation": "expect_column_values_to_be_shouty", "column": "word"}])
+        assert not entry_point.loaded
+        assert de.evaluate_record(expectations, {"word": "HELLO"})
+        assert entry_point.loaded
+        assert not other.loaded
+
+        unknown = de.Expectations([{"expectation": "expect_nothing", "column": "word"}])
+        with pytest.raises(ExpectationNotUnderstoodError):
+            de.evaluate_record(unknown, {"word": "HELLO"})
+    finally:
+        registry._ENTRY_POINTS = original
+        registry._REGISTRY.pop("expect_column_values_to_be_shouty", None)
+
+
+def test_subclassed_expectations():
+    class MyExpectations(de.Expectations):
+        @staticmethod
+        def expect_column_values_to_be_positive(*, row, column, **kwargs):
+            return row.get(column, 0) > 0
+
+    assert "expect_column_values_to_be_positive" in MyExpectations.all_expectations()
+    assert "expect_column_values_to_be_positive" not in de.Expectations.all_expectations()
+
+    expectations = MyExpectations([{"expectation": "expect_column_values_to_be_positive", "column": "n"}])
+    assert de.evaluate_record(expectations, {"n": 1})
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_builtins_are_registered()
+    test_import_is_light()
+    test_register_expectation()
+    test_plugins_are_loaded_lazily()
+    test_subclassed_expectations()
+    print("✅ okay")
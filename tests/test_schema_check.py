@@ -0,0 +1,97 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "id"},
+    {"expectation": "expect_column_to_exist", "column": "name"},
+    {"expectation": "expect_column_values_to_not_be_null", "column": "id"},
+    {"expectation": "expect_column_values_to_be_of_type", "column": "id", "expected_type": "int"},
+    {"expectation": "expect_column_values_to_be_in_type_list", "column": "name", "type_list": ["str"]},
+    {"expectation": "expect_column_values_to_be_between", "column": "id", "minimum": 0, "maximum": 100},
+    {"expectation": "expect_column_values_to_be_of_type", "column": "score", "expected_type": "float", "ignore_nulls": False},
+]
+# fmt:on
+
+RECORDS = [
+    {"id": 1, "name": "a", "score": 1.0},
+    {"id": 2, "name": None, "score": 2.0},
+    {"id": 3, "score": 2.0},
+    {"id": None, "name": "b", "score": 2.0},
+    {"id": "4", "name": "c", "score": 2.0},
+    {"id": 5, "name": "d", "score": None},
+    {"id": 500, "name": "e", "score": 3.0},
+    {"id": 6, "name": 6, "score": 3.0},
+    {"id": 7, "name": "f", "score": 3},
+]
+
+
+def test_schema_check_is_built():
+    plan = de.Expectations(set_of_expectations).compile()
+    assert plan.schema is not None
+    assert plan.schema.required == {"id", "name"}
+    assert [step.name for step in plan.schema.remaining] == ["expect_column_values_to_be_between"]
+
+    # a single schema expectation isn't fused
+    assert de.Expectations(set_of_expectations[:1]).compile().schema is None
+    # nor are paths
+    paths = [{"expectation": "expect_column_to_exist", "column": f"a.{c}"} for c in "xyz"]
+    assert de.Expectations(paths).compile().schema is None
+
+
+def test_same_results_as_unfused():
+    fused = de.Expectations(set_of_expectations)
+    expected = []
+    for record in RECORDS:
+        failing = []
+        for definition in set_of_expectations:
+            config = {k: v for k, v in definition.items() if k != "expectation"}
+            try:
+                met = getattr(de.Expectations, definition["expectation"])(row=record, **config)
+            except TypeError:
+                met = False
+            if not met:
+                failing.append(definition["expectation"])
+        expected.append(failing)
+
+    assert [[v.expectation for v in de.find_violations(fused, record)] for record in RECORDS] == expected
+    assert [de.evaluate_record(fused, record, suppress_errors=True) for record in RECORDS] == [not f for f in expected]
+    mask = de.evaluate_list_mask(fused, RECORDS, by_expectation=True)
+    assert [mask[i] for i in range(len(RECORDS))] == [not f for f in expected]
+    unfused = [sum(not bitmap[i] for i in range(len(RECORDS))) for bitmap in mask.by_expectation]
+    assert sum(unfused) == sum(len(f) for f in expected)
+
+    partial = de.evaluate_shard(fused, RECORDS)
+    assert sum(partial.failed) == sum(len(f) for f in expected)
+
+
+def test_first_failure_is_reported():
+    fused = de.Expectations(set_of_expectations)
+    try:
+        de.evaluate_record(fused, {"id": "x", "score": 1.0})
+        assert False, "expected a failure"  # pragma: no cover
+    except ExpectationNotMetError as err:
+        assert err.expectation == "expect_column_to_exist"
+
+
+def test_signatures_are_remembered():
+    fused = de.Expectations(set_of_expectations)
+    plan = fused.compile()
+    for _ in range(3):
+        assert de.evaluate_record(fused, {"id": 1, "name": "a", "score": 1.0})
+        assert de.evaluate_record(fused, {"id": 1, "name": None, "score": 1.0})
+    assert len(plan.schema.passing) == 2
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_schema_check_is_built()
+    test_same_results_as_unfused()
+    test_first_failure_is_reported()
+    test_signatures_are_remembered()
+    print("✅ okay")
@@ -0,0 +1,87 @@
+import os
+import random
+import statistics
+import sys
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+from data_expectations.internals.sketches import KLL
+from data_expectations.internals.sketches import Extremes
+from data_expectations.internals.sketches import HyperLogLog
+from data_expectations.internals.sketches import Moments
+from data_expectations.internals.sketches import NullCounter
+from data_expectations.internals.sketches import stable_hash
+
+
+_RANDOM = random.Random(42)
+VALUES = [_RANDOM.gauss(100, 15) for _ in range(5000)]
+
+
+def _build(sketch, values):
+    for value in values:
+        sketch.update(value)
+    return sketch
+
+
+def test_moments_merge():
+    whole = _build(Moments(), VALUES)
+    merged = _build(Moments(), VALUES[:1234]).merge(_build(Moments(), VALUES[1234:]))
+
+    assert whole.mean == pytest.approx(statistics.mean(VALUES))
+    assert whole.stdev == pytest.approx(statistics.stdev(VALUES))
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.stdev == pytest.approx(whole.stdev)
+    assert Moments().stdev is None
+
+
+def test_extremes_and_nulls():
+    extremes = _build(Extremes(), [3, None, 1, 7]).merge(_build(Extremes(), [0, 5]))
+    assert (extremes.minimum, extremes.maximum) == (0, 7)
+
+    nulls = _build(NullCounter(), [1, None, 2, None]).merge(_build(NullCounter(), [None]))
+    assert nulls.ratio == pytest.approx(0.6)
+    assert NullCounter().ratio is None
+
+
+def test_hyperloglog():
+    values = [f"user-{i}" for i in range(20000)]
+    whole = _build(HyperLogLog(), values + values[:5000])
+    merged = _build(HyperLogLog(), values[:12000]).merge(_build(HyperLogLog(), values[8000:]))
+
+    assert whole.estimate == pytest.approx(20000, rel=0.05)
+    assert merged.registers == whole.registers
+    assert _build(HyperLogLog(), ["a", "b", "a"]).estimate == pytest.approx(2, abs=0.1)
+
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_kll_quantiles():
+    whole = _build(KLL(), VALUES)
+    merged = _build(KLL(), VALUES[:2500]).merge(_build(KLL(seed=1), VALUES[2500:]))
+    ordered = sorted(VALUES)
+
+    for sketch in (whole, merged):
+        assert sketch.count == len(VALUES)
+        for fraction in (0.1, 0.5, 0.9):
+            value = sketch.quantile(fraction)
+            rank = ordered.index(value) / len(ordered)
+            assert rank == pytest.approx(fraction, abs=0.03)
+    assert KLL().quantile(0.5) is None
+
+
+def test_stable_hash():
+    assert stable_hash("abc") == stable_hash("abc")
+    assert stable_hash("abc") != stable_hash(b"abd")
+    assert stable_hash(1) == stable_hash(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_moments_merge()
+    test_extremes_and_nulls()
+    test_hyperloglog()
+    test_kll_quantiles()
+    test_stable_hash()
+    print("✅ okay")
@@ -0,0 +1,145 @@
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.internals.plan import compile_plan
+from data_expectations.internals.proofs import proven_steps
+
+NAN = float("nan")
+
+RULES = [
+    {"expectation": "expect_column_values_to_not_be_null", "column": "id"},
+    {"expectation": "expect_column_values_to_be_between", "column": "score", "minimum": 0, "maximum": 100},
+    {"expectation": "expect_column_values_to_be_more_than", "column": "score", "threshold": -1},
+    {"expectation": "expect_column_values_to_be_less_than", "column": "score", "threshold": 101},
+    {"expectation": "expect_column_values_to_be_in_set", "column": "colour", "symbols": ["red", "green", "blue"]},
+]
+
+
+def _statistics(records, columns):
+    statistics = {}
+    for column in columns:
+        values = [record.get(column) for record in records]
+        present = [value for value in values if value is not None]
+        # as in Parquet, NaNs are left out of the minimum and maximum
+        numbers = [value for value in present if value == value]
+        statistics[column] = de.ColumnStatistics(
+            minimum=min(numbers) if numbers else None,
+            maximum=max(numbers) if numbers else None,
+            null_count=len(values) - len(present),
+            count=len(values),
+            distinct_values=set(present),
+            nan_count=len(present) - len(numbers),
+        )
+    return statistics
+
+
+def _proven(rules, statistics):
+    return proven_steps(compile_plan(de.Expectations(rules)).steps, statistics)
+
+
+def test_clean_batch_is_proven():
+    records = [{"id": index, "score": index % 50, "colour": "red"} for index in range(100)]
+    statistics = _statistics(records, ["id", "score", "colour"])
+    assert _proven(RULES, statistics) == {0, 1, 2, 3, 4}
+
+
+def test_statistics_which_dont_settle_it():
+    assert _proven(RULES, {"score": de.ColumnStatistics(minimum=-5, maximum=50, nan_count=0)}) == {3}
+    assert _proven(RULES, {"score": de.ColumnStatistics(minimum=0, maximum=50, nan_count=0)}) == {1, 2, 3}
+    # nulls are ignored unless ignore_nulls is false, then there have to be none
+    strict = [dict(rule, ignore_nulls=False) for rule in RULES[1:4]]
+    assert not _proven(strict, {"score": de.ColumnStatistics(minimum=0, maximum=50, nan_count=0)})
+    assert not _proven(strict, {"score": de.ColumnStatistics(minimum=0, maximum=50, null_count=2, nan_count=0)})
+    assert _proven(strict, {"score": de.ColumnStatistics(minimum=0, maximum=50, null_count=0, nan_count=0)}) == {0, 1, 2}
+    # every value null
+    assert _proven(RULES, {"score": de.ColumnStatistics(null_count=5, count=5)}) == {1, 2, 3}
+    assert not _proven(RULES, {"id": de.ColumnStatistics(null_count=5, count=5)})
+    # sets are proven by the distinct values, or a single value
+    assert not _proven(RULES, {"colour": de.ColumnStatistics(distinct_values={"red", "pink"})})
+    assert _proven(RULES, {"colour": de.ColumnStatistics(minimum="blue", maximum="blue", nan_count=0)}) == {4}
+    assert not _proven(RULES, {"colour": de.ColumnStatistics(minimum="blue", maximum="red", nan_count=0)})
+    # statistics which can't be compared are left to the values
+    assert not _proven(RULES, {"score": de.ColumnStatistics(minimum="a", maximum="z", nan_count=0)})
+
+
+def test_mask_matches_testing_values():
+    generator = random.Random(11)
+    for _ in range(20):
+        records = [
+            {
+                "id": generator.choice([1, 2, None]) if generator.random() < 0.1 else 1,
+                "score": generator.choice([None, -3, 5, 50, 99, 150, NAN]) if generator.random() < 0.2 else 42,
+                "colour": generator.choice(["red", "pink"]) if generator.random() < 0.1 else "blue",
+            }
+            for _ in range(generator.randint(1, 40))
+        ]
+        expectations = de.Expectations(RULES)
+        statistics = _statistics(records, ["id", "score", "colour"])
+        with_statistics = de.evaluate_list_mask(expectations, records, by_expectation=True, statistics=statistics)
+        without = de.evaluate_list_mask(expectations, records, by_expectation=True)
+        assert with_statistics.to_bytes() == without.to_bytes()
+        for proven, tested in zip(with_statistics.by_expectation, without.by_expectation):
+            assert proven.to_bytes() == tested.to_bytes()
+
+
+def test_proven_steps_are_not_tested():
+    # the statistics are trusted, so statistics which are wrong show the values weren't tested
+    records = [{"score": 500}, {"score": 7}]
+    expectations = de.Expectations(RULES[1:2])
+    assert de.evaluate_list_mask(expectations, records).count_unset() == 1
+    statistics = {"score": de.ColumnStatistics(minimum=1, maximum=10, null_count=0, nan_count=0)}
+    assert de.evaluate_list_mask(expectations, records, statistics=statistics).count_unset() == 0
+
+
+def test_nans_are_tested():
+    # the minimum and maximum leave out NaNs, so they don't prove anything unless there are none
+    records = [{"score": 5}, {"score": NAN}, {"score": 7}]
+    expectations = de.Expectations(RULES[1:4])
+    for nan_count in (None, 1):
+        statistics = {"score": de.ColumnStatistics(minimum=5, maximum=7, null_count=0, nan_count=nan_count)}
+        assert not _proven(RULES, statistics)
+        mask = de.evaluate_list_mask(expectations, records, statistics=statistics)
+        assert list(mask.failures()) == [1]
+    # in a set, by its only value
+    statistics = {"colour": de.ColumnStatistics(minimum="red", maximum="red", nan_count=None)}
+    assert not _proven(RULES, statistics)
+
+
+def test_overridden_expectations_are_tested():
+    class Strict(de.Expectations):
+        @staticmethod
+        def expect_column_values_to_be_between(*, row, column, **kwargs):
+            return False
+
+    expectations = Strict(RULES[1:2])
+    statistics = {"score": de.ColumnStatistics(minimum=1, maximum=10, null_count=0, nan_count=0)}
+    assert de.evaluate_list_mask(expectations, [{"score": 5}], statistics=statistics).count_unset() == 1
+
+
+def test_from_parquet():
+    parquet = SimpleNamespace(has_min_max=True, min=3, max=9, has_null_count=True, null_count=0, physical_type="INT64")
+    statistics = de.ColumnStatistics.from_parquet(parquet, count=10)
+    assert (statistics.minimum, statistics.maximum, statistics.null_count, statistics.count) == (3, 9, 0, 10)
+    assert statistics.nan_count == 0
+    # floating point columns can hold NaNs, which Parquet doesn't count
+    parquet = SimpleNamespace(has_min_max=True, min=3.0, max=9.0, has_null_count=True, null_count=0, physical_type="DOUBLE")
+    assert de.ColumnStatistics.from_parquet(parquet, count=10).nan_count is None
+    statistics = de.ColumnStatistics.from_parquet(SimpleNamespace(has_min_max=False, has_null_count=False))
+    assert statistics.minimum is None and statistics.null_count is None
+    assert de.ColumnStatistics.from_parquet(None, count=4).count == 4
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_clean_batch_is_proven()
+    test_statistics_which_dont_settle_it()
+    test_mask_matches_testing_values()
+    test_proven_steps_are_not_tested()
+    test_nans_are_tested()
+    test_overridden_expectations_are_tested()
+    test_from_parquet()
+    print("✅ okay")
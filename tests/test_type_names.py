@@ -0,0 +1,90 @@
+import datetime
+import decimal
+import os
+import sys
+from collections import OrderedDict
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.internals.type_names import resolve_type
+from data_expectations.internals.type_names import type_checker
+
+
+class Money(decimal.Decimal):
+    pass
+
+
+def _evaluate(record, **config):
+    expectations = de.Expectations([{"expectation": "expect_column_values_to_be_of_type", "column": "value", **config}])
+    return de.evaluate_record(expectations, record, suppress_errors=True)
+
+
+def test_resolve_type():
+    assert resolve_type("int") is int
+    assert resolve_type("integer") is int
+    assert resolve_type("String") is str
+    assert resolve_type("datetime") is datetime.datetime
+    assert resolve_type("Decimal") is decimal.Decimal
+    assert resolve_type(OrderedDict) is OrderedDict
+    assert resolve_type("Unknown") is None
+
+
+def test_type_checker():
+    check = type_checker(["int", "string"])
+    assert check(int) and check(str)
+    assert not check(bool) and not check(float)
+    assert type_checker("int", subclasses=True)(bool)
+    # names which don't resolve still match by name
+    assert type_checker(["Money"])(Money)
+    assert not type_checker(["Decimal"])(Money)
+    assert type_checker(["Decimal"], subclasses=True)(Money)
+    assert type_checker([dict])(dict)
+
+
+def test_compiled_type_expectations():
+    assert _evaluate({"value": 1}, expected_type="int")
+    assert _evaluate({"value": 1}, expected_type="integer")
+    assert not _evaluate({"value": True}, expected_type="int")
+    assert _evaluate({"value": True}, expected_type="int", subclasses=True)
+    assert _evaluate({"value": None}, expected_type="int")
+    assert not _evaluate({"value": None}, expected_type="int", ignore_nulls=False)
+    assert _evaluate({"value": datetime.date.today()}, expected_type="date")
+    assert not _evaluate({"value": datetime.datetime.now()}, expected_type="date")
+    assert _evaluate({"value": datetime.datetime.now()}, expected_type="date", subclasses=True)
+
+    expectations = de.Expectations(
+        [{"expectation": "expect_column_values_to_be_in_type_list", "column": "value", "type_list": ["str", "float"]}]
+    )
+    records = [{"value": "a"}, {"value": 1.5}, {"value": 1}, {"value": None}, {}]
+    assert [de.evaluate_record(expectations, r, suppress_errors=True) for r in records] == [True, True, False, True, True]
+    assert list(de.evaluate_list_mask(expectations, records).failures()) == [2]
+
+
+def test_compiled_matches_uncompiled():
+    method = de.Expectations.expect_column_values_to_be_in_type_list
+    values = [1, "a", 1.5, True, None, Money(1), b"x"]
+    for type_list in (["int"], ["str", "bool"], ["Decimal"], ["Money", "bytes"]):
+        for subclasses in (False, True):
+            expectations = de.Expectations(
+                [
+                    {
+                        "expectation": "expect_column_values_to_be_in_type_list",
+                        "column": "value",
+                        "type_list": type_list,
+                        "subclasses": subclasses,
+                    }
+                ]
+            )
+            for value in values:
+                record = {"value": value}
+                expected = method(row=record, column="value", type_list=type_list, subclasses=subclasses)
+                assert de.evaluate_record(expectations, record, suppress_errors=True) == expected
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_resolve_type()
+    test_type_checker()
+    test_compiled_type_expectations()
+    test_compiled_matches_uncompiled()
+    print("✅ okay")
@@ -0,0 +1,153 @@
+import copy
+import os
+import pickle
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+from data_expectations.internals.uniqueness import BloomSeen
+from data_expectations.internals.uniqueness import ExactSeen
+from data_expectations.internals.uniqueness import digest
+
+
+def _expectations(**config):
+    return de.Expectations([{"expectation": "expect_column_values_to_be_unique", "column": "id", **config}])
+
+
+def test_repeats_fail_as_they_are_seen():
+    de.Expectations.reset()
+    expectations = _expectations()
+    assert de.evaluate_record(expectations, {"id": 1})
+    assert de.evaluate_record(expectations, {"id": 2})
+    assert de.evaluate_record(expectations, {"id": None})
+    assert de.evaluate_record(expectations, {"id": None})
+    assert not de.evaluate_record(expectations, {"id": 1}, suppress_errors=True)
+    assert not de.evaluate_aggregates(expectations, suppress_errors=True)
+
+    de.Expectations.reset()
+    assert de.evaluate_list(expectations, [{"id": i} for i in range(100)])
+    de.Expectations.reset()
+    with pytest.raises(ExpectationNotMetError):
+        de.evaluate_list(expectations, [{"id": "a"}, {"id": "b"}, {"id": "a"}])
+
+
+def test_values_of_different_types():
+    # values which look the same but are of different types are different values
+    de.Expectations.reset()
+    expectations = _expectations()
+    assert de.evaluate_list(expectations, [{"id": "1"}, {"id": 1}, {"id": b"x"}, {"id": "x"}, {"id": 1.5}, {"id": "1.5"}])
+    assert not de.evaluate_record(expectations, {"id": b"x"}, suppress_errors=True)
+    assert digest("1") != digest(1) and digest(b"x") != digest("x")
+    de.Expectations.reset()
+
+
+def test_nulls_not_ignored():
+    de.Expectations.reset()
+    expectations = _expectations(ignore_nulls=False)
+    assert not de.evaluate_record(expectations, {"id": None}, suppress_errors=True)
+
+
+def test_spilled_repeats_found_at_the_end():
+    with tempfile.TemporaryDirectory() as directory:
+        de.Expectations.reset()
+        expectations = _expectations(max_keys_in_memory=10, partitions=4, spill_directory=directory)
+        records = [{"id": i} for i in range(50)]
+        assert de.evaluate_list(expectations, records)
+        assert os.listdir(directory)
+
+        # the repeats were spilled before they were seen again
+        assert all(de.evaluate_record(expectations, record) for record in records[:5])
+        assert not de.evaluate_aggregates(expectations, suppress_errors=True)
+
+        with pytest.raises(ExpectationNotMetError) as err:
+            de.evaluate_aggregates(expectations)
+        assert "statistic was 5" in str(err.value)
+
+
+def test_exact_seen_counts_every_repeat():
+    seen = ExactSeen(max_keys_in_memory=3, partitions=2)
+    values = ["a", "b", "c", "a", "d", "e", "a", "b"]
+    found = sum(not seen.update(digest(value)) for value in values)
+    assert found + seen.finish() == 3
+    assert ExactSeen().finish() == 0
+
+
+def test_spill_directories_are_reused():
+    # each run spills into a directory of its own, which is removed on reset
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(2):
+            de.Expectations.reset()
+            expectations = _expectations(max_keys_in_memory=10, partitions=4, spill_directory=directory)
+            assert de.evaluate_list(expectations, [{"id": i} for i in range(50)])
+            assert len(os.listdir(directory)) == 1
+        de.Expectations.reset()
+        assert not os.listdir(directory)
+
+
+def test_large_partitions_are_split(monkeypatch):
+    # the partitions hold more distinct digests than fit in memory, so they're split again
+    depths = []
+    repeats = ExactSeen._repeats
+
+    def counted(self, path, depth):
+        depths.append(depth)
+        return repeats(self, path, depth)
+
+    monkeypatch.setattr(ExactSeen, "_repeats", counted)
+    seen = ExactSeen(max_keys_in_memory=10, partitions=2)
+    values = list(range(300)) + list(range(0, 300, 7))
+    found = sum(not seen.update(digest(value)) for value in values)
+    assert found + seen.finish() == len(range(0, 300, 7))
+    assert max(depths) > 2
+    assert sorted(os.listdir(seen.directory)) == ["partition-0000.bin", "partition-0001.bin"]
+
+
+def test_copies_dont_share_spills():
+    seen = ExactSeen(max_keys_in_memory=4, partitions=2)
+    for value in range(20):
+        seen.update(digest(value))
+    copied = copy.deepcopy(seen)
+    assert copied.directory != seen.directory
+    assert copied.update(digest(100)) and copied.update(digest(1)) is True
+    assert copied.finish() == 1
+    assert seen.finish() == 0
+    assert pickle.loads(pickle.dumps(seen)).finish() == 0
+
+
+def test_approximate_mode():
+    de.Expectations.reset()
+    expectations = _expectations(mode="approximate", capacity=1000, false_positive_rate=0.01)
+    assert de.evaluate_list(expectations, [{"id": f"key-{i}"} for i in range(500)])
+    assert not de.evaluate_record(expectations, {"id": "key-1"}, suppress_errors=True)
+
+    bloom = BloomSeen(capacity=10_000, false_positive_rate=0.01)
+    assert len(bloom.bits) < 16_000
+    false_positives = sum(not bloom.update(digest(i)) for i in range(10_000))
+    assert false_positives < 200
+
+    with pytest.raises(ValueError):
+        BloomSeen(false_positive_rate=1.5)
+
+
+def test_unknown_mode():
+    de.Expectations.reset()
+    with pytest.raises(ValueError):
+        de.evaluate_record(_expectations(mode="guess"), {"id": 1})
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_repeats_fail_as_they_are_seen()
+    test_values_of_different_types()
+    test_nulls_not_ignored()
+    test_spilled_repeats_found_at_the_end()
+    test_exact_seen_counts_every_repeat()
+    test_spill_directories_are_reused()
+    test_copies_dont_share_spills()
+    test_approximate_mode()
+    test_unknown_mode()
+    print("✅ okay")
@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import data_expectations as de
+from data_expectations.errors import ExpectationNotMetError
+
+
+# fmt:off
+set_of_expectations = [
+    {"expectation": "expect_column_to_exist", "column": "name"},
+    {"expectation": "expect_column_values_to_be_between", "column": "age", "minimum": 0, "maximum": 120},
+    {"expectation": "expect_column_values_to_be_more_than", "column": "age", "threshold": 10},
+]
+# fmt:on
+
+
+def test_no_violations():
+    expectations = de.Expectations(set_of_expectations)
+    assert de.find_violations(expectations, {"name": "alice", "age": 30}) == ()
+
+
+def test_violations():
+    expectations = de.Expectations(set_of_expectations)
+
+    violations = de.find_violations(expectations, {"age": 200})
+    assert [v.expectation for v in violations] == ["expect_column_to_exist", "expect_column_values_to_be_between"]
+    assert violations[0].column == "name"
+    assert violations[0]._message is None
+    assert "expect_column_to_exist" in violations[0].message
+    assert str(violations[0]) == violations[0].message
+
+    # errors raised by the test are reported as details of the violation
+    violations = de.find_violations(expectations, {"name": "bob", "age": "old"})
+    assert len(violations) == 2
+    assert violations[0].details is not None
+
+    error = violations[0].to_error()
+    assert isinstance(error, ExpectationNotMetError)
+    assert error.expectation == "expect_column_values_to_be_between"
+
+
+def test_error_message_is_lazy():
+    class Unprintable(dict):
+        def __str__(self):
+            raise AssertionError("record was formatted")
+
+    error = ExpectationNotMetError("expect_column_to_exist", Unprintable(), "details")
+    assert error.expectation == "expect_column_to_exist"
+
+    error = ExpectationNotMetError("expect_column_to_exist", {"name": "x" * 500})
+    assert str(error).endswith("...")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_no_violations()
+    test_violations()
+    test_error_message_is_lazy()
+    print("✅ okay")
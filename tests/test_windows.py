@@ -0,0 +1,229 @@
+import datetime
+import decimal
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+import pytest
+
+import data_expectations as de
+from data_expectations.internals.windows import Window
+
+
+def _results(set_of_expectations, records):
+    de.Expectations.reset()
+    expectations = de.Expectations(set_of_expectations)
+    results = [not de.find_violations(expectations, record) for record in records]
+    de.Expectations.reset()
+    return results
+
+
+def test_null_ratio_in_last_records():
+    rules = [
+        {
+            "expectation": "expect_column_null_ratio_in_window_to_be_less_than",
+            "column": "value",
+            "threshold": 0.5,
+            "window": 4,
+        }
+    ]
+    values = [1, None, 2, None, None, 3, 4, 5, None, None]
+    # ratios of the last four: 0, .5, .33, .5, .75, .5, .5, .25, .25, .5
+    expected = [True, False, True, False, False, False, False, True, True, False]
+    assert _results(rules, [{"value": value} for value in values]) == expected
+    # missing values are nulls too
+    assert _results(rules, [{"value": 1}, {}]) == [True, False]
+
+
+def test_min_records():
+    rules = [
+        {
+            "expectation": "expect_column_null_ratio_in_window_to_be_less_than",
+            "column": "value",
+            "threshold": 0.5,
+            "window": 4,
+            "min_records": 3,
+        }
+    ]
+    assert _results(rules, [{"value": None}, {"value": None}, {"value": 1}, {"value": 1}, {"value": 1}]) == [True, True, False, False, True]
+
+
+def test_mean_in_last_records():
+    rules = [
+        {
+            "expectation": "expect_column_mean_in_window_to_be_between",
+            "column": "value",
+            "minimum": 4,
+            "maximum": 6,
+            "window": 3,
+        }
+    ]
+    values = [5, 5, 8, 2, 10, None, 0]
+    # means of the last three non-null values: 5, 5, 6, 5, 6.67, 6, 5
+    assert _results(rules, [{"value": value} for value in values]) == [True, True, True, True, False, True, True]
+
+
+def test_windows_by_time():
+    start = datetime.datetime(2024, 1, 1)
+    rules = [
+        {
+            "expectation": "expect_column_mean_in_window_to_be_between",
+            "column": "value",
+            "minimum": 0,
+            "maximum": 10,
+            "time_column": "at",
+            "window_seconds": 60,
+        }
+    ]
+    records = [
+        {"at": start, "value": 10},
+        {"at": start + datetime.timedelta(seconds=30), "value": 20},  # mean 15
+        {"at": start + datetime.timedelta(seconds=70), "value": 0},  # 20 and 0, mean 10
+        {"at": start + datetime.timedelta(seconds=200), "value": 5},  # only 5
+    ]
+    assert _results(rules, records) == [True, False, True, True]
+
+    # numeric times are seconds
+    rules[0]["time_column"] = "seconds"
+    records = [{"seconds": s, "value": v} for s, v in [(0, 10), (30, 20), (100, 0)]]
+    assert _results(rules, records) == [True, False, True]
+
+
+def test_mean_of_other_numbers():
+    rules = [
+        {
+            "expectation": "expect_column_mean_in_window_to_be_between",
+            "column": "value",
+            "minimum": 4,
+            "maximum": 6,
+            "window": 3,
+        }
+    ]
+    values = [decimal.Decimal(5), decimal.Decimal("5.5"), decimal.Decimal(20)]
+    assert _results(rules, [{"value": value} for value in values]) == [True, True, False]
+    # values which aren't numbers fail rather than being left out of the mean
+    assert _results(rules, [{"value": 5}, {"value": "20"}, {"value": True}]) == [True, False, False]
+
+    numpy = pytest.importorskip("numpy")
+    values = [numpy.int64(5), numpy.float32(5.5), numpy.float64(20)]
+    assert _results(rules, [{"value": value} for value in values]) == [True, True, False]
+
+
+def test_records_without_times():
+    rules = [
+        {
+            "expectation": "expect_column_mean_in_window_to_be_between",
+            "column": "value",
+            "minimum": 0,
+            "maximum": 10,
+            "time_column": "seconds",
+            "window_seconds": 60,
+        },
+        {
+            "expectation": "expect_column_values_to_be_unique_within_window",
+            "column": "value",
+            "time_column": "seconds",
+            "window_seconds": 60,
+        },
+    ]
+    for rule in rules:
+        records = [{"seconds": 0, "value": 20}, {"value": 1}, {"seconds": 100, "value": 5}, {"seconds": 110, "value": 5}]
+        # the record without a time fails, and doesn't stop the first leaving the window
+        expected = [rule is rules[1], False, True, rule is rules[0]]
+        assert _results([rule], records) == expected
+
+
+def test_running_sums_match_a_rescan():
+    window = Window(size=7)
+    values = [0.1 * i for i in range(1000)]
+    for i, value in enumerate(values):
+        window.add(value)
+        recent = values[max(0, i - 6) : i + 1]
+        assert window.mean == pytest.approx(sum(recent) / len(recent))
+
+
+def test_gaps():
+    rules = [{"expectation": "expect_column_gaps_to_be_at_most", "column": "at", "max_gap": 60}]
+    start = datetime.datetime(2024, 1, 1)
+    times = [0, 30, 90, 200, 150, 220, None, 230]
+    records = [{"at": None if t is None else start + datetime.timedelta(seconds=t)} for t in times]
+    # 200 follows a 110 second gap, 150 is late, not a gap
+    assert _results(rules, records) == [True, True, True, False, True, True, True, True]
+
+    rules[0]["max_gap"] = 5
+    assert _results(rules, [{"at": t} for t in [1, 3, 9, 12]]) == [True, True, False, True]
+
+
+def test_unique_within_last_records():
+    rules = [{"expectation": "expect_column_values_to_be_unique_within_window", "column": "id", "window": 3}]
+    ids = ["a", "b", "a", "c", "d", "a", None, None, "d"]
+    # a repeats within three records, then is out of the window; nulls aren't repeats
+    assert _results(rules, [{"id": i} for i in ids]) == [True, True, False, True, True, True, True, True, True]
+
+
+def test_unique_within_time():
+    start = datetime.datetime(2024, 1, 1)
+    rules = [
+        {
+            "expectation": "expect_column_values_to_be_unique_within_window",
+            "column": "id",
+            "time_column": "at",
+            "window_seconds": 300,
+            "max_records": 3,
+        }
+    ]
+    events = [(0, "a"), (60, "b"), (120, "a"), (500, "a"), (510, "x"), (520, "y"), (530, "z"), (540, "a")]
+    records = [{"id": i, "at": start + datetime.timedelta(seconds=t)} for t, i in events]
+    # at 500 the earlier a's are more than five minutes old, at 540 the cap of three has pushed it out
+    assert _results(rules, records) == [True, True, False, True, True, True, True, True]
+
+
+def test_recent_values_stay_bounded():
+    from data_expectations.internals.windows import RecentValues
+
+    recent = RecentValues(size=100)
+    for i in range(10_000):
+        assert recent.add(i % 150)
+    assert len(recent) == 100
+    assert len(recent.counts) == 100
+
+
+def test_uncompiled_forms():
+    de.Expectations.reset()
+    for value, expected in [(None, False), (1, True)]:
+        met = de.Expectations.get_expectation("expect_column_null_ratio_in_window_to_be_less_than")(
+            row={"value": value}, column="value", threshold=0.6, window=2
+        )
+        assert met is expected
+    de.Expectations.reset()
+
+
+def test_misconfiguration():
+    with pytest.raises(ValueError):
+        de.Expectations(
+            [{"expectation": "expect_column_mean_in_window_to_be_between", "column": "value", "window": 0, "minimum": 0, "maximum": 1}]
+        ).compile()
+    with pytest.raises(ValueError):
+        de.Expectations(
+            [{"expectation": "expect_column_mean_in_window_to_be_between", "column": "value", "window_seconds": 10, "minimum": 0, "maximum": 1}]
+        ).compile()
+    with pytest.raises(ValueError):
+        de.Expectations([{"expectation": "expect_column_mean_in_window_to_be_between", "column": "value"}]).compile()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_null_ratio_in_last_records()
+    test_min_records()
+    test_mean_in_last_records()
+    test_windows_by_time()
+    test_mean_of_other_numbers()
+    test_records_without_times()
+    test_running_sums_match_a_rescan()
+    test_gaps()
+    test_unique_within_last_records()
+    test_unique_within_time()
+    test_recent_values_stay_bounded()
+    test_uncompiled_forms()
+    test_misconfiguration()
+    print("✅ okay")